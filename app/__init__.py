@@ -19,6 +19,18 @@ def create_app(config_class=Config):
     # Import models to ensure they are registered with SQLAlchemy
     from app import models
 
+    # Query counts and timings per request, Server-Timing header and /metrics
+    from app.utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Thread pool for heavy read paths (matching, reports)
+    from app.utils.offload import init_offload
+    init_offload(app)
+
+    # Dashboard stats cache, invalidated by the write paths
+    from app.utils.cache import TTLCache
+    app.extensions['stats_cache'] = TTLCache(ttl=app.config.get('STATS_CACHE_TTL', 30))
+
     # Register Blueprints
     from app.routes.auth_routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -37,20 +49,21 @@ def create_app(config_class=Config):
 
     from app.routes.bench_routes import bench_bp
     app.register_blueprint(bench_bp)
+
+    from app.routes.api_routes import api_bp
+    app.register_blueprint(api_bp)
+
+    # CLI commands (flask sweep-status, ...)
+    from app.cli import register_commands
+    register_commands(app)
     
-    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-    from app.models import User
+    # Current user is decoded and loaded once per request
+    from app.utils.auth import reset_current_user, lookup_user, load_current_user
+    app.before_request(reset_current_user)
+    jwt.user_lookup_loader(lookup_user)
 
     @app.context_processor
     def inject_user():
-        try:
-            verify_jwt_in_request(optional=True)
-            user_id = get_jwt_identity()
-            if user_id:
-                user = User.query.get(user_id)
-                return dict(current_user=user)
-        except Exception:
-            pass
-        return dict(current_user=None)
+        return dict(current_user=load_current_user())
     
     return app
@@ -0,0 +1,121 @@
+import sys
+import click
+from datetime import date
+
+def register_commands(app):
+
+    @app.cli.command('sweep-status')
+    @click.option('--full', is_flag=True, help='Rebuild every employee from the allocations table.')
+    @click.option('--today', default=None, help='Run as of this date (YYYY-MM-DD).')
+    def sweep_status(full, today):
+        """Adjust employees whose allocations started or ended since the last sweep."""
+        from app.utils.status import sweep_allocation_boundaries
+        touched = sweep_allocation_boundaries(today=date.fromisoformat(today) if today else None, full=full)
+        click.echo(f'Status sweep done, {touched} employee(s) adjusted.')
+
+    @app.cli.command('snapshot')
+    @click.option('--start', default=None, help='Rewrite snapshots from this date (YYYY-MM-DD); default continues after the last one.')
+    @click.option('--end', default=None, help='Last date to write (YYYY-MM-DD); default today.')
+    def snapshot(start, end):
+        """Write daily employee and project utilization snapshots, backfilling from the allocations table."""
+        from app.utils.snapshots import take_snapshots
+        days = take_snapshots(start=date.fromisoformat(start) if start else None,
+                              end=date.fromisoformat(end) if end else None, log=click.echo)
+        click.echo(f'Snapshots written for {days} day(s).')
+
+    @app.cli.command('import-data')
+    @click.argument('entity', type=click.Choice(['employees', 'projects', 'allocations']))
+    @click.argument('path', type=click.Path(allow_dash=True))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None, help='Defaults from the file extension.')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Rows per transaction.')
+    @click.option('--mode', type=click.Choice(['upsert', 'create']), default='upsert', help='Employees only.')
+    def import_data(entity, path, fmt, chunk_size, mode):
+        """Upsert employees, projects or allocations from a CSV/NDJSON file ('-' for stdin)."""
+        from app.utils.transfer import guess_format, import_rows, read_rows
+        fmt = fmt or guess_format(path)
+        options = {'mode': mode} if entity == 'employees' else {}
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            summary = import_rows(entity, read_rows(stream, fmt), chunk_size=chunk_size, **options)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        click.echo(f"{summary['rows']} row(s): {summary['created']} created, "
+                   f"{summary['updated']} updated, {summary['error']} error(s).")
+        for error in summary['errors']:
+            click.echo(f"  row {error['index']}: {'; '.join(error['errors'])}", err=True)
+
+    @app.cli.command('export-data')
+    @click.argument('entity', type=click.Choice(['employees', 'projects', 'allocations']))
+    @click.argument('path', type=click.Path(allow_dash=True), default='-')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None, help='Defaults from the file extension.')
+    def export_data(entity, path, fmt):
+        """Stream employees, projects or allocations to a CSV/NDJSON file ('-' for stdout)."""
+        from app.utils.transfer import export_chunks, guess_format
+        fmt = fmt or guess_format(path)
+        with click.open_file(path, 'w', encoding='utf-8') as out:
+            for chunk in export_chunks(entity, fmt):
+                out.write(chunk)
+
+    @app.cli.command('export-analytics')
+    @click.argument('out_dir', type=click.Path(file_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['parquet', 'arrow']), default='parquet', show_default=True)
+    @click.option('--table', 'tables', multiple=True,
+                  type=click.Choice(['employees', 'projects', 'allocations', 'employee_snapshots',
+                                     'project_snapshots', 'utilization_snapshots']),
+                  help='Repeat to pick tables (default: all).')
+    @click.option('--full', is_flag=True, help='Re-export everything instead of continuing from the last run.')
+    def export_analytics(out_dir, fmt, tables, full):
+        """Write tables and utilization snapshots as a partitioned Parquet/Arrow dataset for BI."""
+        from app.utils.analytics import TABLES, export_analytics
+        try:
+            written = export_analytics(out_dir, fmt=fmt, tables=tables or TABLES, full=full, log=click.echo)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        click.echo(f'Exported {sum(written.values())} row(s) to {out_dir}.')
+
+    @app.cli.command('skill-alias')
+    @click.argument('alias', required=False)
+    @click.argument('canonical', required=False)
+    def skill_alias(alias, canonical):
+        """Map an alternate skill spelling to its canonical name, or list the aliases."""
+        from app import db
+        from app.models import SkillAlias
+        from app.utils.skills import add_skill_alias
+        if not alias:
+            for row in SkillAlias.query.order_by(SkillAlias.canonical, SkillAlias.alias):
+                click.echo(f'{row.alias} -> {row.canonical}')
+            return
+        if not canonical:
+            raise click.UsageError('CANONICAL is required when ALIAS is given.')
+        try:
+            add_skill_alias(alias, canonical)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        db.session.commit()
+        click.echo(f'{alias} -> {canonical}')
+
+    @app.cli.command('worker')
+    @click.option('--processes', type=int, default=None, help='Worker processes (default: CPU count, 0 = run inline).')
+    @click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+    @click.option('--poll-interval', default=1.0, show_default=True, help='Seconds between queue polls when idle.')
+    def worker(processes, burst, poll_interval):
+        """Run queued background jobs until stopped."""
+        from app.utils.jobs import work
+        processed = work(processes=processes, burst=burst, poll_interval=poll_interval, log=click.echo)
+        click.echo(f'Worker stopped, {processed} job(s) processed.')
+
+    @app.cli.command('enqueue')
+    @click.argument('kind')
+    @click.option('--payload', default='{}', help='JSON object of job arguments.')
+    def enqueue_job(kind, payload):
+        """Queue a background job (recompute_status, sweep_status, snapshot, staffing_matrix, export)."""
+        import json
+        from app import db
+        from app.utils.jobs import enqueue
+        try:
+            job = enqueue(kind, json.loads(payload))
+        except (ValueError, TypeError) as e:
+            raise click.UsageError(str(e))
+        db.session.commit()
+        click.echo(f'Queued job {job.id} ({kind}).')
@@ -1,7 +1,24 @@
+import json
 from app import db
 from datetime import datetime
+from sqlalchemy import func, case
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Marks a to_dict() argument the caller did not precompute
+_NOT_LOADED = object()
+
+# Skill index: posting lists keyed by skill so matching only touches
+# employees/projects that share at least one skill.
+employee_skills = db.Table('workforce_employee_skills',
+    db.Column('skill_id', db.Integer, db.ForeignKey('workforce_skills.id'), primary_key=True),
+    db.Column('employee_id', db.Integer, db.ForeignKey('workforce_employees.id'), primary_key=True, index=True)
+)
+
+project_skills = db.Table('workforce_project_skills',
+    db.Column('skill_id', db.Integer, db.ForeignKey('workforce_skills.id'), primary_key=True),
+    db.Column('project_id', db.Integer, db.ForeignKey('workforce_projects.id'), primary_key=True, index=True)
+)
+
 class User(db.Model):
     __tablename__ = 'workforce_users'
     id = db.Column(db.Integer, primary_key=True)
@@ -30,6 +47,10 @@ class User(db.Model):
 
 class Employee(db.Model):
     __tablename__ = 'workforce_employees'
+    __table_args__ = (
+        # Timeline lanes, keyset-paged in name order
+        db.Index('ix_workforce_employees_name_id', 'name', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -37,34 +58,59 @@ class Employee(db.Model):
     designation = db.Column(db.String(64))
     skills = db.Column(db.Text) # Stored as comma-separated string for simplicity
     # Status: 'Bench', 'Active', 'Partially Utilized'
-    availability_status = db.Column(db.String(20), default='Bench') 
+    availability_status = db.Column(db.String(20), default='Bench', index=True)
+    # Weekly hours of allocations running today; maintained by app.utils.status
+    current_hours = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Sorted canonical skill ids packed as uint32; written by app.utils.skills
+    skill_ids = db.Column(db.LargeBinary)
+    # Set on every insert/update (ORM or Core); incremental analytics exports
+    # pick up rows changed since their last run with it
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # When the row was inserted; snapshot backfills leave the employee out of
+    # earlier days. NULL for employees from before the column existed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     user = db.relationship('User', backref='employee_profile', uselist=False)
     allocations = db.relationship('Allocation', backref='employee', lazy='dynamic')
+    indexed_skills = db.relationship('Skill', secondary=employee_skills)
 
     @property
     def last_allocation_end_date(self):
         # Get the latest end date from allocations
-        last_alloc = self.allocations.order_by(Allocation.end_date.desc()).first()
-        if last_alloc:
-            return last_alloc.end_date
-        return None
+        return db.session.query(func.max(Allocation.end_date)).filter(Allocation.employee_id == self.id).scalar()
 
     @property
     def bench_days(self):
+        return self.bench_days_since(self.last_allocation_end_date)
+
+    def bench_days_since(self, last_end):
+        # Same rule as bench_days, for callers that already have the last end date
         if self.availability_status != 'Bench':
             return 0
-        
-        last_end = self.last_allocation_end_date
+
         if last_end:
             delta = datetime.today().date() - last_end
             return max(0, delta.days)
-        # If never allocated but on bench, assume since creation? 
+        # If never allocated but on bench, assume since creation?
         # For now, return 0 or handle separately.
         return 0
 
-    def to_dict(self):
+    @classmethod
+    def with_last_allocation_end(cls, query=None, order_by_bench_days=False):
+        # One GROUP BY employee_id MAX(end_date) subquery joined into the query,
+        # rows come back as (employee, last_end)
+        sub = last_allocation_end_subquery()
+        query = query if query is not None else cls.query
+        query = query.outerjoin(sub, sub.c.employee_id == cls.id).add_columns(sub.c.last_end)
+        if order_by_bench_days:
+            # Longest on bench first: oldest last end date first, never allocated last
+            query = query.order_by(case((sub.c.last_end.is_(None), 1), else_=0), sub.c.last_end.asc(), cls.id)
+        return query
+
+    def to_dict(self, last_allocation_end_date=_NOT_LOADED):
+        if last_allocation_end_date is _NOT_LOADED:
+            last_allocation_end_date = self.last_allocation_end_date
         return {
             'id': self.id,
             'name': self.name,
@@ -72,20 +118,27 @@ class Employee(db.Model):
             'designation': self.designation,
             'skills': self.skills,
             'availability_status': self.availability_status,
-            'bench_days': self.bench_days
+            'bench_days': self.bench_days_since(last_allocation_end_date)
         }
 
 class Project(db.Model):
     __tablename__ = 'workforce_projects'
+    __table_args__ = (
+        # Timeline lanes, keyset-paged in name order
+        db.Index('ix_workforce_projects_name_id', 'name', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
     client_name = db.Column(db.String(64), nullable=False)
     required_skills = db.Column(db.Text)
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
-    status = db.Column(db.String(20), default='Active') # Active, Completed
+    status = db.Column(db.String(20), default='Active', index=True) # Active, Completed
+    skill_ids = db.Column(db.LargeBinary) # Packed canonical skill ids, see Employee.skill_ids
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     allocations = db.relationship('Allocation', backref='project', lazy='dynamic')
+    indexed_skills = db.relationship('Skill', secondary=project_skills)
 
     def to_dict(self):
         return {
@@ -100,12 +153,20 @@ class Project(db.Model):
 
 class Allocation(db.Model):
     __tablename__ = 'workforce_allocations'
+    __table_args__ = (
+        # Per-employee lookups ordered/bounded by end date: capacity checks,
+        # last allocation end, bench days
+        db.Index('ix_workforce_allocations_employee_id_end_date', 'employee_id', 'end_date'),
+        # The same for project lanes of the timeline (and project lookups)
+        db.Index('ix_workforce_allocations_project_id_end_date', 'project_id', 'end_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('workforce_employees.id'), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey('workforce_projects.id'), nullable=False)
     allocated_hours = db.Column(db.Integer, default=40) # Hours per week
-    start_date = db.Column(db.Date)
-    end_date = db.Column(db.Date)
+    start_date = db.Column(db.Date, index=True)
+    end_date = db.Column(db.Date, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def to_dict(self):
         return {
@@ -116,3 +177,112 @@ class Allocation(db.Model):
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None
         }
+
+def last_allocation_end_subquery():
+    return db.session.query(
+        Allocation.employee_id,
+        func.max(Allocation.end_date).label('last_end')
+    ).group_by(Allocation.employee_id).subquery()
+
+class Skill(db.Model):
+    __tablename__ = 'workforce_skills'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), unique=True, nullable=False) # Normalized (stripped, lowercase)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
+
+class SkillAlias(db.Model):
+    # Alternate spelling -> canonical skill name, both normalized
+    __tablename__ = 'workforce_skill_aliases'
+    alias = db.Column(db.String(64), primary_key=True)
+    canonical = db.Column(db.String(64), nullable=False)
+
+class AppState(db.Model):
+    # Small key/value store for bookkeeping such as the last status sweep date
+    __tablename__ = 'workforce_app_state'
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(255))
+
+class Job(db.Model):
+    # Background job queue, drained by `flask worker` (see app/utils/jobs.py)
+    __tablename__ = 'workforce_jobs'
+    __table_args__ = (
+        # Workers poll for the oldest runnable job of a status
+        db.Index('ix_workforce_jobs_status_run_after', 'status', 'run_after'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text) # JSON arguments
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    result = db.Column(db.Text) # JSON
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+class JobOutputChunk(db.Model):
+    # A job's file (e.g. an export) as one gzip stream split over rows in
+    # `seq` order, so neither writing nor serving it holds the whole file.
+    # Kept in the database because the worker and the web service need not
+    # share a disk.
+    __tablename__ = 'workforce_job_output_chunks'
+    job_id = db.Column(db.Integer, db.ForeignKey('workforce_jobs.id', ondelete='CASCADE'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class EmployeeSnapshot(db.Model):
+    # One row per employee per day, written by `flask snapshot` (see
+    # app/utils/snapshots.py). No foreign key: history outlives deletions.
+    __tablename__ = 'workforce_employee_snapshots'
+    __table_args__ = (
+        # One employee's history over a date range
+        db.Index('ix_workforce_employee_snapshots_employee_id_day', 'employee_id', 'day'),
+    )
+    day = db.Column(db.Date, primary_key=True)
+    employee_id = db.Column(db.Integer, primary_key=True)
+    hours = db.Column(db.Integer, nullable=False) # Weekly hours booked that day
+    status = db.Column(db.String(20), nullable=False)
+    bench_days = db.Column(db.Integer, nullable=False) # Consecutive days on bench, 0 when not
+
+class ProjectSnapshot(db.Model):
+    # One row per project with anything booked, per day
+    __tablename__ = 'workforce_project_snapshots'
+    __table_args__ = (
+        db.Index('ix_workforce_project_snapshots_project_id_day', 'project_id', 'day'),
+    )
+    day = db.Column(db.Date, primary_key=True)
+    project_id = db.Column(db.Integer, primary_key=True)
+    hours = db.Column(db.Integer, nullable=False)
+    allocations = db.Column(db.Integer, nullable=False) # Allocations running that day
+
+class UtilizationSnapshot(db.Model):
+    # Per day and designation rollup of EmployeeSnapshot, so org-wide trends
+    # read a few rows per day. Employees without a designation use ''.
+    __tablename__ = 'workforce_utilization_snapshots'
+    day = db.Column(db.Date, primary_key=True)
+    designation = db.Column(db.String(64), primary_key=True)
+    employees = db.Column(db.Integer, nullable=False)
+    hours = db.Column(db.Integer, nullable=False)
+    bench = db.Column(db.Integer, nullable=False)
+    fully_utilized = db.Column(db.Integer, nullable=False)
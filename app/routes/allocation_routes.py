@@ -2,43 +2,55 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_jwt_extended import jwt_required
 from app import db
 from app.models import Allocation, Employee, Project
-from datetime import datetime
+from app.utils.capacity import check_capacity, find_overbooked_employees, WEEKLY_CAPACITY
+from app.utils.offload import gather, offload_shared
+from app.utils.pagination import keyset_page, parse_per_page
+from app.utils.status import allocation_snapshot, apply_allocation_change
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timedelta
 
 allocation_bp = Blueprint('allocation', __name__, url_prefix='/allocations')
 
-def update_employee_status(employee_id):
-    employee = Employee.query.get(employee_id)
-    if not employee:
-        return
-        
-    # seamless calc
-    total_hours = 0
-    # Filter for active allocations only? Prompt implies current status. 
-    # Let's assume all allocations in table are "current" or filter by date.
-    # For simplicity, let's sum all "active" allocations (where end_date >= today).
-    today = datetime.today().date()
-    
-    active_allocs = Allocation.query.filter(Allocation.employee_id == employee_id, Allocation.end_date >= today).all()
-    
-    for alloc in active_allocs:
-        total_hours += alloc.allocated_hours
-        
-    utilization = (total_hours / 40) * 100
-    
-    if utilization >= 80:
-        employee.availability_status = 'Fully Utilized'
-    elif utilization >= 40:
-        employee.availability_status = 'Partially Utilized'
-    else:
-        employee.availability_status = 'Bench'
-        
-    db.session.commit()
-
 @allocation_bp.route('/')
 @jwt_required()
 def list_allocations():
-    allocations = Allocation.query.all()
-    return render_template('allocations/list.html', allocations=allocations)
+    employee_id = request.args.get('employee_id', type=int)
+    project_id = request.args.get('project_id', type=int)
+    window_start = _parse_date(request.args.get('start'))
+    window_end = _parse_date(request.args.get('end'))
+
+    # Employee and project come back in the same SELECT, so a page is a single
+    # query however large the table grows.
+    query = Allocation.query.options(joinedload(Allocation.employee), joinedload(Allocation.project))
+    if employee_id:
+        query = query.filter(Allocation.employee_id == employee_id)
+    if project_id:
+        query = query.filter(Allocation.project_id == project_id)
+    # Date window: allocations overlapping [start, end]
+    if window_start:
+        query = query.filter(Allocation.end_date >= window_start)
+    if window_end:
+        query = query.filter(Allocation.start_date <= window_end)
+
+    page = keyset_page(query, Allocation.id,
+                       before=request.args.get('before', type=int),
+                       after=request.args.get('after', type=int),
+                       per_page=parse_per_page(request.args.get('per_page')))
+
+    filters = {
+        'employee_id': employee_id,
+        'project_id': project_id,
+        'start': window_start.isoformat() if window_start else None,
+        'end': window_end.isoformat() if window_end else None,
+    }
+    filters = {k: v for k, v in filters.items() if v}
+    return render_template('allocations/list.html', allocations=page['items'], page=page, filters=filters)
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
 
 @allocation_bp.route('/add', methods=['GET', 'POST'])
 @jwt_required()
@@ -52,15 +64,20 @@ def add_allocation():
         
         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+
+        fits, peak = check_capacity(employee_id, start_date, end_date, allocated_hours)
+        if not fits:
+            flash(f'Over-allocation: this would book {peak}h/week (capacity {WEEKLY_CAPACITY}h) '
+                  f'between {start_date} and {end_date}', 'danger')
+            return redirect(url_for('allocation.add_allocation'))
         
         new_alloc = Allocation(employee_id=employee_id, project_id=project_id, 
                                allocated_hours=allocated_hours, start_date=start_date, end_date=end_date)
         db.session.add(new_alloc)
+        # Update Status (same transaction)
+        apply_allocation_change(after=allocation_snapshot(new_alloc))
         db.session.commit()
         
-        # Update Status
-        update_employee_status(employee_id)
-        
         flash('Allocation added successfully', 'success')
         return redirect(url_for('allocation.list_allocations'))
         
@@ -74,20 +91,32 @@ def edit_allocation(allocation_id):
     alloc = Allocation.query.get_or_404(allocation_id)
     
     if request.method == 'POST':
-        alloc.employee_id = request.form.get('employee_id')
-        alloc.project_id = request.form.get('project_id')
-        alloc.allocated_hours = int(request.form.get('allocated_hours'))
+        employee_id = request.form.get('employee_id')
+        allocated_hours = int(request.form.get('allocated_hours'))
         start_date_str = request.form.get('start_date')
         end_date_str = request.form.get('end_date')
-        
-        alloc.start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        alloc.end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-        
+
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+
+        fits, peak = check_capacity(employee_id, start_date, end_date, allocated_hours,
+                                    exclude_allocation_id=alloc.id)
+        if not fits:
+            flash(f'Over-allocation: this would book {peak}h/week (capacity {WEEKLY_CAPACITY}h) '
+                  f'between {start_date} and {end_date}', 'danger')
+            return redirect(url_for('allocation.edit_allocation', allocation_id=alloc.id))
+
+        before = allocation_snapshot(alloc)
+        alloc.employee_id = employee_id
+        alloc.project_id = request.form.get('project_id')
+        alloc.allocated_hours = allocated_hours
+        alloc.start_date = start_date
+        alloc.end_date = end_date
+
+        # Update Status (same transaction)
+        apply_allocation_change(before, allocation_snapshot(alloc))
         db.session.commit()
         
-        # Update Status
-        update_employee_status(alloc.employee_id)
-        
         flash('Allocation updated successfully', 'success')
         return redirect(url_for('allocation.list_allocations'))
         
@@ -95,17 +124,32 @@ def edit_allocation(allocation_id):
     projects = Project.query.filter_by(status='Active').all()
     return render_template('allocations/edit.html', allocation=alloc, employees=employees, projects=projects)
 
+@allocation_bp.route('/overbooked')
+@jwt_required()
+def overbooked():
+    today = datetime.today().date()
+    [report] = gather(offload_shared(('find_overbooked_employees', today), find_overbooked_employees, since=today))
+    return render_template('allocations/overbooked.html', report=report, capacity=WEEKLY_CAPACITY)
+
+@allocation_bp.route('/timeline')
+@jwt_required()
+def timeline_view():
+    # Gantt chart; the page pulls lanes from /api/v1/timeline as they scroll into view
+    group = request.args.get('group') if request.args.get('group') in ('employee', 'project') else 'employee'
+    start = _parse_date(request.args.get('start')) or datetime.today().date() - timedelta(days=14)
+    weeks = max(1, min(request.args.get('weeks', 15, type=int), 104))
+    return render_template('allocations/timeline.html', group=group, start=start.isoformat(), weeks=weeks)
+
 @allocation_bp.route('/delete/<int:allocation_id>', methods=['POST'])
 @jwt_required()
 def delete_allocation(allocation_id):
     alloc = Allocation.query.get_or_404(allocation_id)
-    emp_id = alloc.employee_id
+    before = allocation_snapshot(alloc)
     
     db.session.delete(alloc)
+    # Update Status (same transaction)
+    apply_allocation_change(before=before)
     db.session.commit()
     
-    # Update Status
-    update_employee_status(emp_id)
-    
     flash('Allocation deleted successfully', 'success')
     return redirect(url_for('allocation.list_allocations'))
@@ -0,0 +1,353 @@
+import json
+from datetime import date, datetime, timedelta
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, url_for
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models import Employee, Project, Allocation, Job
+from app.utils.bench import BUCKET_LABELS, DEFAULT_LIMIT, MAX_LIMIT, bench_aging
+from app.utils.bulk import upsert_employees, upsert_projects, upsert_allocations
+from app.utils.assignment import propose_assignments, proposal_rows
+from app.utils.matching import find_matching_employees, find_available_employees
+from app.utils.forecast import MAX_WEEKS, forecast_summary
+from app.utils.jobs import JOBS, enqueue, has_output, output_chunks
+from app.utils.matrix import staffing_matrix, staffing_matrix_json
+from app.utils.offload import gather, offload_shared
+from app.utils.pagination import keyset_page, parse_per_page
+from app.utils.search import SEARCH_SPECS, search
+from app.utils.snapshots import employee_history, project_history, utilization_history
+from app.utils.timeline import DEFAULT_LANES, GROUPS, MAX_LANES, MAX_WINDOW_DAYS, parse_cursor, timeline
+from app.utils.transfer import FORMATS, EXPORT_COLUMNS, export_chunks, import_rows, read_rows
+
+# Versioned JSON API. Accepts a Bearer header as well as the session cookie
+# so scripts and HR integrations can call it.
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+API_LOCATIONS = ['headers', 'cookies']
+
+def _page_response(page, serialize):
+    return jsonify({
+        'items': [serialize(item) for item in page['items']],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+    })
+
+def _bulk_rows(key):
+    # Body: {"<key>": [ {...}, ... ]}
+    data = request.get_json(silent=True)
+    rows = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(rows, list):
+        return None, (jsonify({'msg': f'Body must be a JSON object with a "{key}" list'}), 400)
+    max_rows = current_app.config.get('API_MAX_BATCH', 5000)
+    if len(rows) > max_rows:
+        return None, (jsonify({'msg': f'At most {max_rows} rows per request'}), 413)
+    return rows, None
+
+def _bulk_response(results, **extra):
+    # All valid rows are written in one transaction; invalid rows are
+    # reported and skipped
+    db.session.commit()
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return jsonify({'summary': summary, 'results': results, **extra})
+
+@api_bp.route('/employees')
+@jwt_required(locations=API_LOCATIONS)
+def list_employees():
+    page = keyset_page(Employee.with_last_allocation_end(), Employee.id,
+                       before=request.args.get('before', type=int),
+                       after=request.args.get('after', type=int),
+                       per_page=parse_per_page(request.args.get('per_page')),
+                       cursor_of=lambda row: row[0].id)
+    # Rows are (employee, last_end), so bench days cost no extra query
+    return _page_response(page, lambda row: row[0].to_dict(row[1]))
+
+@api_bp.route('/employees/bulk', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def bulk_employees():
+    rows, error = _bulk_rows('employees')
+    if error:
+        return error
+    mode = request.args.get('mode', 'upsert')
+    if mode not in ('create', 'upsert'):
+        return jsonify({'msg': 'mode must be create or upsert'}), 400
+    return _bulk_response(upsert_employees(rows, mode=mode))
+
+@api_bp.route('/projects')
+@jwt_required(locations=API_LOCATIONS)
+def list_projects():
+    page = keyset_page(Project.query, Project.id,
+                       before=request.args.get('before', type=int),
+                       after=request.args.get('after', type=int),
+                       per_page=parse_per_page(request.args.get('per_page')))
+    return _page_response(page, Project.to_dict)
+
+@api_bp.route('/projects/<int:project_id>/matches')
+@jwt_required(locations=API_LOCATIONS)
+def project_matches(project_id):
+    # mode=window (default) ranks by skill match plus free hours over the
+    # project dates; mode=status uses today's availability status
+    min_match = request.args.get('min_match', 50, type=int)
+    match = find_matching_employees if request.args.get('mode', 'window') == 'status' else find_available_employees
+    [matches] = gather(offload_shared((match.__name__, project_id, min_match), match, project_id,
+                                      min_match_percent=min_match))
+    return jsonify([dict({k: v for k, v in m.items() if k != 'employee'},
+                         employee_id=m['employee'].id, name=m['employee'].name,
+                         availability_status=m['employee'].availability_status) for m in matches])
+
+@api_bp.route('/projects/bulk', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def bulk_projects():
+    rows, error = _bulk_rows('projects')
+    if error:
+        return error
+    return _bulk_response(upsert_projects(rows))
+
+@api_bp.route('/allocations')
+@jwt_required(locations=API_LOCATIONS)
+def list_allocations():
+    query = Allocation.query
+    employee_id = request.args.get('employee_id', type=int)
+    project_id = request.args.get('project_id', type=int)
+    if employee_id:
+        query = query.filter(Allocation.employee_id == employee_id)
+    if project_id:
+        query = query.filter(Allocation.project_id == project_id)
+    page = keyset_page(query, Allocation.id,
+                       before=request.args.get('before', type=int),
+                       after=request.args.get('after', type=int),
+                       per_page=parse_per_page(request.args.get('per_page')))
+    return _page_response(page, Allocation.to_dict)
+
+@api_bp.route('/allocations/bulk', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def bulk_allocations():
+    rows, error = _bulk_rows('allocations')
+    if error:
+        return error
+    return _bulk_response(upsert_allocations(rows))
+
+@api_bp.route('/staffing-matrix')
+@jwt_required(locations=API_LOCATIONS)
+def get_staffing_matrix():
+    top_k = max(1, min(request.args.get('top_k', 5, type=int), 50))
+    min_match = request.args.get('min_match', 50, type=int)
+    if request.args.get('async'):
+        return _job_accepted(enqueue('staffing_matrix', {'top_k': top_k, 'min_match_percent': min_match}))
+    [rows] = gather(offload_shared(('staffing_matrix', top_k, min_match), staffing_matrix,
+                                   top_k=top_k, min_match_percent=min_match))
+    return jsonify(staffing_matrix_json(rows))
+
+@api_bp.route('/forecast')
+@jwt_required(locations=API_LOCATIONS)
+def utilization_forecast():
+    # Weekly org, designation and (unless projects=0) project curves
+    weeks = max(1, min(request.args.get('weeks', 12, type=int), MAX_WEEKS))
+    projects = request.args.get('projects', '1') != '0'
+    [data] = gather(offload_shared(('forecast', weeks, projects), forecast_summary, weeks, projects))
+    return jsonify(data)
+
+@api_bp.route('/bench/aging')
+@jwt_required(locations=API_LOCATIONS)
+def get_bench_aging():
+    # Aging buckets and skill counts for the whole bench, plus a page
+    # (?limit=&offset=, optionally one ?bucket=) of the longest idle
+    bucket = request.args.get('bucket') or None
+    if bucket is not None and bucket not in BUCKET_LABELS:
+        return jsonify({'msg': f'bucket must be one of {", ".join(BUCKET_LABELS)}'}), 400
+    options = {
+        'bucket': bucket,
+        'limit': max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT)),
+        'offset': max(0, request.args.get('offset', 0, type=int)),
+        'skills': max(0, min(request.args.get('skills', 20, type=int), 100)),
+    }
+    return jsonify(bench_aging(**options))
+
+def _history_range():
+    # ?start=&end= (YYYY-MM-DD); the last 90 days by default, at most 3 years
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else datetime.today().date()
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else end - timedelta(days=89)
+    except ValueError:
+        start = end = None
+    if start is None or start > end or (end - start).days > 3 * 366:
+        return None, (jsonify({'msg': 'start and end must be dates (YYYY-MM-DD), start <= end, '
+                                      'at most 3 years apart'}), 400)
+    return (start, end), None
+
+@api_bp.route('/history/utilization')
+@jwt_required(locations=API_LOCATIONS)
+def get_utilization_history():
+    # Daily org (or ?designation=) series from the snapshot tables
+    dates, error = _history_range()
+    if error:
+        return error
+    return jsonify(utilization_history(*dates, designation=request.args.get('designation')))
+
+@api_bp.route('/history/employees/<int:employee_id>')
+@jwt_required(locations=API_LOCATIONS)
+def get_employee_history(employee_id):
+    dates, error = _history_range()
+    if error:
+        return error
+    return jsonify(employee_history(employee_id, *dates))
+
+@api_bp.route('/history/projects/<int:project_id>')
+@jwt_required(locations=API_LOCATIONS)
+def get_project_history(project_id):
+    dates, error = _history_range()
+    if error:
+        return error
+    return jsonify(project_history(project_id, *dates))
+
+@api_bp.route('/timeline')
+@jwt_required(locations=API_LOCATIONS)
+def get_timeline():
+    # Gantt viewport: ?group=employee|project, ?start=&end= (two weeks back to
+    # thirteen ahead by default), lanes by ?limit= and ?cursor= (the previous
+    # page's next_cursor) or ?ids=1,2,3
+    group = request.args.get('group', 'employee')
+    try:
+        today = datetime.today().date()
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else today - timedelta(days=14)
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else start + timedelta(days=104)
+        ids = [int(i) for i in request.args['ids'].split(',')] if request.args.get('ids') else None
+        cursor = parse_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        start = end = None
+    if group not in GROUPS or start is None or start > end or (end - start).days >= MAX_WINDOW_DAYS \
+            or (ids is not None and len(ids) > MAX_LANES):
+        return jsonify({'msg': f'group must be one of {", ".join(GROUPS)}; start and end must be dates '
+                               f'(YYYY-MM-DD), start <= end, at most {MAX_WINDOW_DAYS} days; '
+                               f'ids a comma-separated list of at most {MAX_LANES}; '
+                               f'cursor a next_cursor from an earlier page'}), 400
+    return jsonify(timeline(start, end, group=group, ids=ids, cursor=cursor,
+                            limit=max(1, min(request.args.get('limit', DEFAULT_LANES, type=int), MAX_LANES))))
+
+@api_bp.route('/assignments', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def assignments():
+    # Body (all optional): {"project_ids": [...], "hours": 40, "slots": 1,
+    # "min_match": 50, "commit": false}. With commit the proposal is booked
+    # through the allocation bulk writer in one transaction.
+    data = request.get_json(silent=True) or {}
+    try:
+        options = {
+            'hours': max(1, min(int(data.get('hours', 40)), 40)),
+            'slots': max(1, min(int(data.get('slots', 1)), 20)),
+            'min_match_percent': int(data.get('min_match', 50)),
+        }
+        if data.get('project_ids') is not None:
+            options['project_ids'] = [int(p) for p in data['project_ids']]
+    except (TypeError, ValueError):
+        return jsonify({'msg': 'hours, slots, min_match and project_ids must be integers'}), 400
+
+    proposals = propose_assignments(**options)
+    rows = proposal_rows(proposals)
+    for row, proposal in zip(rows, proposals):
+        row['start_date'] = row['start_date'].isoformat()
+        row['end_date'] = row['end_date'].isoformat()
+        row['match_percent'] = proposal['match_percent']
+    if not data.get('commit'):
+        return jsonify({'proposals': rows})
+    return _bulk_response(upsert_allocations(rows), proposals=rows)
+
+@api_bp.route('/search/<entity>')
+@jwt_required(locations=API_LOCATIONS)
+def search_entities(entity):
+    # ?q= prefix words, plus facet filters (skill, status, designation for
+    # employees, client for projects) and the usual cursor arguments
+    if entity not in SEARCH_SPECS:
+        return jsonify({'msg': f'Unknown entity {entity}'}), 404
+    facets = ['skill', *SEARCH_SPECS[entity]['facets']]
+    page = search(entity, q=request.args.get('q'),
+                  filters={f: request.args.get(f) for f in facets if request.args.get(f)},
+                  before=request.args.get('before', type=int),
+                  after=request.args.get('after', type=int),
+                  per_page=parse_per_page(request.args.get('per_page')))
+    columns = ['id', *SEARCH_SPECS[entity]['columns'], *(c.key for c in SEARCH_SPECS[entity]['facets'].values())]
+    return jsonify({
+        'items': [{c: getattr(item, c) for c in dict.fromkeys(columns)} for item in page['items']],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'total': page['total'],
+        'facets': {f: [{'value': v, 'count': n} for v, n in counts] for f, counts in page['facets'].items()},
+    })
+
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+@api_bp.route('/export/<entity>')
+@jwt_required(locations=API_LOCATIONS)
+def export_data(entity):
+    # Streamed chunk by chunk; the full export is never held in memory
+    fmt = request.args.get('format', 'csv')
+    if entity not in EXPORT_COLUMNS:
+        return jsonify({'msg': f'Unknown entity {entity}'}), 404
+    if fmt not in FORMATS:
+        return jsonify({'msg': f'format must be one of {", ".join(FORMATS)}'}), 400
+    if request.args.get('async'):
+        # Written by a worker; fetch it from the job's download URL
+        return _job_accepted(enqueue('export', {'entity': entity, 'fmt': fmt}))
+    return Response(stream_with_context(export_chunks(entity, fmt)),
+                    mimetype=EXPORT_MIMETYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={entity}.{fmt}'})
+
+@api_bp.route('/import/<entity>', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def import_data(entity):
+    # Raw CSV/NDJSON body, read from the request stream in chunks and
+    # committed chunk by chunk. ?format= defaults from the Content-Type.
+    default_format = 'ndjson' if request.mimetype in ('application/x-ndjson', 'application/jsonl') else 'csv'
+    fmt = request.args.get('format', default_format)
+    if entity not in EXPORT_COLUMNS:
+        return jsonify({'msg': f'Unknown entity {entity}'}), 404
+    if fmt not in FORMATS:
+        return jsonify({'msg': f'format must be one of {", ".join(FORMATS)}'}), 400
+    options = {}
+    if entity == 'employees':
+        options['mode'] = request.args.get('mode', 'upsert')
+        if options['mode'] not in ('create', 'upsert'):
+            return jsonify({'msg': 'mode must be create or upsert'}), 400
+    return jsonify(import_rows(entity, read_rows(request.stream, fmt), **options))
+
+def _job_accepted(job):
+    db.session.commit()
+    body = dict(job.to_dict(), status_url=url_for('api.get_job', job_id=job.id))
+    return jsonify(body), 202, {'Location': body['status_url']}
+
+@api_bp.route('/jobs', methods=['POST'])
+@jwt_required(locations=API_LOCATIONS)
+def create_job():
+    # {"kind": "recompute_status", "payload": {...}}; poll the returned status_url
+    data = request.get_json(silent=True) or {}
+    if data.get('kind') not in JOBS:
+        return jsonify({'msg': f'kind must be one of {", ".join(sorted(JOBS))}'}), 400
+    if not isinstance(data.get('payload', {}), dict):
+        return jsonify({'msg': 'payload must be an object'}), 400
+    try:
+        queued = enqueue(data['kind'], data.get('payload'))
+    except ValueError as e:
+        return jsonify({'msg': str(e)}), 400
+    return _job_accepted(queued)
+
+@api_bp.route('/jobs/<int:job_id>')
+@jwt_required(locations=API_LOCATIONS)
+def get_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    body = job.to_dict()
+    if job.kind == 'export' and job.status == 'done':
+        body['download_url'] = url_for('api.download_job', job_id=job.id)
+    return jsonify(body)
+
+@api_bp.route('/jobs/<int:job_id>/download')
+@jwt_required(locations=API_LOCATIONS)
+def download_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    if job.kind != 'export' or job.status != 'done':
+        return jsonify({'msg': 'Job has no file to download'}), 409
+    if not has_output(job.id):
+        return jsonify({'msg': 'Export file is no longer available'}), 410
+    result = json.loads(job.result)
+    # Read back one stored chunk at a time while streaming
+    return Response(stream_with_context(output_chunks(job.id)), mimetype=EXPORT_MIMETYPES[result['format']],
+                    headers={'Content-Disposition': f"attachment; filename={result['entity']}.{result['format']}"})
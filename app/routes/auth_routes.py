@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 from app import db
 from app.models import User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, set_access_cookies, unset_jwt_cookies
+from app.utils.cache import invalidate_stats
+from flask_jwt_extended import create_access_token, jwt_required, current_user, set_access_cookies, unset_jwt_cookies
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -52,6 +53,7 @@ def register():
         new_user = User(username=username, email=email, is_verified=False)
         new_user.set_password(password)
         db.session.add(new_user)
+        invalidate_stats()
         db.session.commit()
         
         flash('Registration successful! Please wait for Manager approval.', 'info')
@@ -71,9 +73,7 @@ def forgot_password():
 @auth_bp.route('/profile')
 @jwt_required()
 def profile():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    return render_template('auth/profile.html', user=user)
+    return render_template('auth/profile.html', user=current_user)
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
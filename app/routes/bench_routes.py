@@ -1,7 +1,13 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from flask_jwt_extended import jwt_required
 from app.models import Employee, Allocation
+from app.utils.bench import BUCKET_LABELS, DEFAULT_LIMIT, MAX_LIMIT, bench_aging
 from app.utils.matching import find_projects_for_employee
+from app.utils.matrix import staffing_matrix
+from app.utils.assignment import propose_assignments, proposal_rows
+from app.utils.bulk import upsert_allocations
+from app.utils.offload import gather, offload, offload_shared
+from app import db
 from datetime import datetime
 
 bench_bp = Blueprint('bench', __name__, url_prefix='/bench')
@@ -9,16 +15,69 @@ bench_bp = Blueprint('bench', __name__, url_prefix='/bench')
 @bench_bp.route('/')
 @jwt_required()
 def list_bench():
-    # Sort by bench days descending
-    bench_employees = Employee.query.filter_by(availability_status='Bench').all()
-    # Python sort as bench_days is a property
-    bench_employees.sort(key=lambda x: x.bench_days, reverse=True)
-    
-    return render_template('bench/list.html', bench_employees=bench_employees)
+    # Aging summary plus one page of the longest idle (optionally one bucket);
+    # the same three statements however large the bench is
+    bucket = request.args.get('bucket')
+    if bucket not in BUCKET_LABELS:
+        bucket = None
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    report = bench_aging(bucket=bucket, limit=limit, offset=offset, skills=10)
+    columns = report['longest_idle']
+    bench_employees = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    skills = [dict(zip(report['skills'], values)) for values in zip(*report['skills'].values())]
+
+    return render_template('bench/list.html', report=report, bench_employees=bench_employees, skills=skills,
+                           bucket=bucket, buckets=list(zip(report['buckets']['labels'], report['buckets']['counts'])))
 
 @bench_bp.route('/match/<int:employee_id>')
 @jwt_required()
 def match_employee(employee_id):
-    employee = Employee.query.get_or_404(employee_id)
-    matches = find_projects_for_employee(employee_id)
+    # Employee and matches load side by side on the offload pool. db.get_or_404
+    # looks up the session inside the task; Employee.query would bind the
+    # request thread's session here, before the task runs.
+    employee, matches = gather(
+        offload(db.get_or_404, Employee, employee_id),
+        offload_shared(('find_projects_for_employee', employee_id), find_projects_for_employee, employee_id),
+    )
     return render_template('bench/matches.html', employee=employee, matches=matches)
+
+@bench_bp.route('/staffing')
+@jwt_required()
+def staffing():
+    # Every active project against every available employee, top matches each
+    top_k = max(1, min(request.args.get('top_k', 5, type=int), 50))
+    min_match = request.args.get('min_match', 50, type=int)
+    [rows] = gather(offload_shared(('staffing_matrix', top_k, min_match), staffing_matrix,
+                                   top_k=top_k, min_match_percent=min_match))
+    return render_template('bench/staffing.html', rows=rows, top_k=top_k, min_match=min_match)
+
+def _assignment_options(values):
+    return {
+        'hours': max(1, min(values.get('hours', 40, type=int), 40)),
+        'slots': max(1, min(values.get('slots', 1, type=int), 20)),
+        'min_match_percent': values.get('min_match', 50, type=int),
+    }
+
+@bench_bp.route('/assign', methods=['GET', 'POST'])
+@jwt_required()
+def assign():
+    # Global assignment of available employees to open project slots.
+    # GET previews the proposal, POST books it in one batch.
+    options = _assignment_options(request.form if request.method == 'POST' else request.args)
+
+    if request.method == 'POST':
+        proposals = propose_assignments(**options)
+        results = upsert_allocations(proposal_rows(proposals))
+        db.session.commit()
+        created = sum(1 for r in results if r['status'] == 'created')
+        flash(f'{created} allocation(s) created.', 'success')
+        skipped = len(results) - created
+        if skipped:
+            flash(f'{skipped} proposal(s) skipped because they no longer fit.', 'warning')
+        return redirect(url_for('allocation.list_allocations'))
+
+    [proposals] = gather(offload_shared(('propose_assignments', *sorted(options.items())),
+                                        propose_assignments, **options))
+    return render_template('bench/assign.html', proposals=proposals,
+                           hours=options['hours'], slots=options['slots'], min_match=options['min_match_percent'])
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from app import db
 from app.models import User, Employee, Allocation
-from sqlalchemy import func
+from app.utils.cache import cached_stats, invalidate_stats
+from app.utils.forecast import build_forecast
+from sqlalchemy import func, case
 from datetime import datetime
 
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -10,8 +12,7 @@ dashboard_bp = Blueprint('dashboard', __name__)
 @dashboard_bp.route('/dashboard')
 @jwt_required()
 def index():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_user
     
     # Role Based Redirect/Render
     if user.role == 'Admin':
@@ -22,31 +23,38 @@ def index():
         return render_template('dashboard/index.html', user=user, stats={})
 
 def admin_dashboard(user):
-    # Stats Calculation
-    total_employees = Employee.query.count()
-    bench_count = Employee.query.filter_by(availability_status='Bench').count()
-    
-    # Pending Approvals
-    pending_users = User.query.filter_by(is_verified=False).all()
-    # Customers (Active Projects details)
-    active_projects = db.session.query(Allocation.project_id).distinct().all() 
-    # This is rough, normally we need a Customer model, but let's list Projects for now as "Customers/Projects"
-    
     today = datetime.today().date()
-    total_allocated_hours = db.session.query(func.sum(Allocation.allocated_hours)).filter(Allocation.end_date >= today).scalar() or 0
-    
+    stats = cached_stats('admin_stats', today.isoformat(), lambda: compute_admin_stats(today))
+    # Pending Approvals
+    pending_users = cached_stats('pending_users', None, compute_pending_users)
+
+    return render_template('dashboard/admin.html', user=user, stats=stats, pending_users=pending_users)
+
+def compute_admin_stats(today):
+    # Counts and booked hours in one pass over the employees table
+    total_employees, bench_count, total_allocated_hours = db.session.query(
+        func.count(Employee.id),
+        func.coalesce(func.sum(case((Employee.availability_status == 'Bench', 1), else_=0)), 0),
+        func.coalesce(func.sum(Employee.current_hours), 0)
+    ).one()
+
     total_capacity = total_employees * 40
     utilization_rate = 0
     if total_capacity > 0:
         utilization_rate = (total_allocated_hours / total_capacity) * 100
-    
-    stats = {
+
+    return {
         'total_employees': total_employees,
         'bench_count': bench_count,
-        'utilization_rate': round(utilization_rate, 1)
+        'utilization_rate': round(utilization_rate, 1),
+        # Booked utilization and projected bench for the weeks ahead
+        'forecast': build_forecast(weeks=12, today=today).to_dict(projects=False),
     }
-    
-    return render_template('dashboard/admin.html', user=user, stats=stats, pending_users=pending_users)
+
+def compute_pending_users():
+    # Plain dicts so cached values never hold session-bound objects
+    rows = db.session.query(User.id, User.username, User.email).filter_by(is_verified=False).all()
+    return [{'id': r.id, 'username': r.username, 'email': r.email} for r in rows]
 
 def employee_dashboard(user):
     # Get my allocations
@@ -63,8 +71,7 @@ def employee_dashboard(user):
 @dashboard_bp.route('/link_profile', methods=['POST'])
 @jwt_required()
 def link_profile():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = current_user
     
     email = request.form.get('email')
     
@@ -86,8 +93,6 @@ def link_profile():
 @dashboard_bp.route('/approve_user/<int:user_id>')
 @jwt_required()
 def approve_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
     if current_user.role != 'Admin':
         return redirect(url_for('dashboard.index'))
         
@@ -102,7 +107,8 @@ def approve_user(user_id):
             flash(f"User approved and linked to Employee: {matching_employee.name}", "success")
         else:
             flash(f"User approved. No matching employee profile found for {user_to_verify.email}", "warning")
-            
+
+        invalidate_stats()
         db.session.commit()
     return redirect(url_for('dashboard.index'))
 
@@ -1,15 +1,25 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Employee, User
+from sqlalchemy.orm import joinedload
+from app.models import Employee, User, Allocation
+from app.utils.cache import invalidate_stats
+from app.utils.skills import index_employee_skills
+from app.utils.pagination import parse_per_page
+from app.utils.search import search
 
 employee_bp = Blueprint('employee', __name__, url_prefix='/employees')
 
 @employee_bp.route('/')
 @jwt_required()
 def list_employees():
-    employees = Employee.query.all()
-    return render_template('employees/list.html', employees=employees)
+    # Full-text search plus skill/status/designation facets, one page at a time
+    filters = {k: request.args.get(k) for k in ('q', 'skill', 'status', 'designation') if request.args.get(k)}
+    page = search('employees', q=filters.get('q'), filters=filters,
+                  before=request.args.get('before', type=int),
+                  after=request.args.get('after', type=int),
+                  per_page=parse_per_page(request.args.get('per_page')))
+    return render_template('employees/list.html', employees=page['items'], page=page, filters=filters)
 
 @employee_bp.route('/add', methods=['GET', 'POST'])
 @jwt_required()
@@ -33,6 +43,8 @@ def add_employee():
             skills=skills
         )
         db.session.add(new_emp)
+        index_employee_skills(new_emp)
+        invalidate_stats()
         db.session.commit()
         
         # Auto-Link to User if exists
@@ -52,4 +64,6 @@ def add_employee():
 @jwt_required()
 def view_employee(id):
     employee = Employee.query.get_or_404(id)
-    return render_template('employees/view.html', employee=employee)
+    allocations = employee.allocations.options(joinedload(Allocation.project)).all()
+    return render_template('employees/view.html', employee=employee, allocations=allocations,
+                           bench_days=employee.bench_days)
@@ -1,7 +1,13 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_jwt_extended import jwt_required
 from app import db
-from app.models import Project
+from sqlalchemy.orm import joinedload
+from app.models import Project, Allocation
+from app.utils.skills import index_project_skills
+from app.utils.pagination import parse_per_page
+from app.utils.search import search
+from app.utils.matching import find_matching_employees, find_available_employees
+from app.utils.offload import gather, offload, offload_shared
 from datetime import datetime
 
 project_bp = Blueprint('project', __name__, url_prefix='/projects')
@@ -9,8 +15,12 @@ project_bp = Blueprint('project', __name__, url_prefix='/projects')
 @project_bp.route('/')
 @jwt_required()
 def list_projects():
-    projects = Project.query.all()
-    return render_template('projects/list.html', projects=projects)
+    filters = {k: request.args.get(k) for k in ('q', 'skill', 'status', 'client') if request.args.get(k)}
+    page = search('projects', q=filters.get('q'), filters=filters,
+                  before=request.args.get('before', type=int),
+                  after=request.args.get('after', type=int),
+                  per_page=parse_per_page(request.args.get('per_page')))
+    return render_template('projects/list.html', projects=page['items'], page=page, filters=filters)
 
 @project_bp.route('/add', methods=['GET', 'POST'])
 @jwt_required()
@@ -34,6 +44,7 @@ def add_project():
             status='Active'
         )
         db.session.add(new_project)
+        index_project_skills(new_project)
         db.session.commit()
         
         flash('Project added successfully', 'success')
@@ -41,8 +52,24 @@ def add_project():
         
     return render_template('projects/add.html')
 
+def _project_allocations(project_id):
+    # Employees come with their allocations in one query, not one per row
+    return Allocation.query.filter_by(project_id=project_id).options(joinedload(Allocation.employee)).all()
+
 @project_bp.route('/<int:id>')
 @jwt_required()
 def view_project(id):
     project = Project.query.get_or_404(id)
-    return render_template('projects/view.html', project=project)
+    # Candidates: free hours over the project dates by default, or today's
+    # availability status
+    match_mode = request.args.get('match', 'window')
+    if match_mode != 'status':
+        match_mode = 'window'
+    match = find_matching_employees if match_mode == 'status' else find_available_employees
+    # Candidates and the allocation table load side by side on the offload pool
+    candidates, allocations = gather(
+        offload_shared((match.__name__, id, 50), match, id),
+        offload(_project_allocations, id),
+    )
+    return render_template('projects/view.html', project=project, allocations=allocations,
+                           candidates=candidates[:10], match_mode=match_mode)
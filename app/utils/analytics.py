@@ -0,0 +1,224 @@
+import json
+import os
+import shutil
+from datetime import date, datetime, timedelta
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Date, DateTime, Integer, select
+from app import db
+from app.models import (Employee, Project, Allocation, EmployeeSnapshot, ProjectSnapshot,
+                        UtilizationSnapshot)
+
+# Columnar export for BI. Tables are streamed from the database with
+# yield_per and each chunk of row tuples is transposed straight into Arrow
+# arrays (no per-row dicts), then written as a hive-partitioned Parquet or
+# Arrow IPC dataset:
+#
+#   <out>/employees/exported_at=20261018T230000123456/part-00000.parquet
+#   <out>/employee_snapshots/month=2026-10/part-00000.parquet
+#   <out>/_manifest.json
+#
+# Entity tables are incremental on updated_at: each run writes the rows
+# changed since the previous run's high-water mark into a new partition, so
+# readers keep the latest row per id (deletes need a --full export, which
+# replaces the table). The daily snapshot tables are append-only by day:
+# each run rewrites whole months from the last exported day's month on, so
+# a partition always holds exactly the days the database has.
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+CHUNK_ROWS = 50000
+FILE_ROWS = 1000000 # Start a new part file after this many rows
+MANIFEST = '_manifest.json'
+# Transactions still open when a run starts may commit rows stamped a little
+# earlier; the next run reaches back this far, re-exporting a few rows
+# rather than missing them
+HWM_OVERLAP = timedelta(minutes=5)
+
+ENTITY_TABLES = {
+    'employees': (Employee, ('id', 'email', 'name', 'mobile', 'designation', 'skills',
+                             'availability_status', 'current_hours', 'updated_at')),
+    'projects': (Project, ('id', 'name', 'client_name', 'required_skills', 'start_date', 'end_date',
+                           'status', 'updated_at')),
+    'allocations': (Allocation, ('id', 'employee_id', 'project_id', 'allocated_hours', 'start_date',
+                                 'end_date', 'updated_at')),
+}
+SNAPSHOT_TABLES = {
+    'employee_snapshots': (EmployeeSnapshot, ('day', 'employee_id', 'hours', 'status', 'bench_days')),
+    'project_snapshots': (ProjectSnapshot, ('day', 'project_id', 'hours', 'allocations')),
+    'utilization_snapshots': (UtilizationSnapshot, ('day', 'designation', 'employees', 'hours', 'bench',
+                                                    'fully_utilized')),
+}
+TABLES = tuple(ENTITY_TABLES) + tuple(SNAPSHOT_TABLES)
+
+def _arrow_type(column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+def table_schema(model, names):
+    columns = model.__table__.columns
+    return pa.schema([pa.field(name, _arrow_type(columns[name]), nullable=columns[name].nullable)
+                      for name in names])
+
+def record_batches(query, schema, chunk_rows=CHUNK_ROWS):
+    # One RecordBatch per chunk of the query's rows, built column-wise.
+    # Rows come straight off the DB-API cursor: wrapping each one in a Row
+    # and parsing its dates in Python cost twice as much as everything else
+    # here, while Arrow casts SQLite's ISO date strings a column at a time.
+    # Bind values are our own dates, so they are rendered inline.
+    connection = db.session.connection()
+    sql = str(query.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    raw = connection.connection.dbapi_connection
+    # psycopg2 only streams from a named (server-side) cursor
+    cursor = raw.cursor('analytics_export') if connection.dialect.driver == 'psycopg2' else raw.cursor()
+    try:
+        cursor.execute(sql)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield pa.RecordBatch.from_arrays([pa.array(values).cast(field.type)
+                                              for values, field in zip(zip(*rows), schema)], schema=schema)
+    finally:
+        cursor.close()
+
+class PartitionWriter:
+    # Writes batches to <directory>/part-NNNNN.<ext>, rolling over to a new
+    # file every FILE_ROWS rows
+    def __init__(self, directory, schema, fmt):
+        self.directory, self.schema, self.fmt = directory, schema, fmt
+        self.files, self.rows = [], 0
+        self._writer, self._sink, self._file_rows = None, None, 0
+
+    def write(self, batch):
+        if self._writer is None or self._file_rows >= FILE_ROWS:
+            self._open()
+        self._writer.write_batch(batch)
+        self._file_rows += batch.num_rows
+        self.rows += batch.num_rows
+
+    def _open(self):
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'part-{len(self.files):05d}{FORMATS[self.fmt]}')
+        if self.fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        self.files.append(path)
+        self._file_rows = 0
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = self._sink = None
+
+def read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_manifest(out_dir, manifest):
+    # Replaced atomically, so a crash mid-run leaves the previous marks
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def export_entity(name, out_dir, fmt, since=None, run_at=None):
+    # Rows of an entity table updated after `since` (all rows when None) into
+    # a new exported_at= partition. Returns (rows, new high-water mark).
+    model, names = ENTITY_TABLES[name]
+    run_at = run_at or datetime.utcnow()
+    schema = table_schema(model, names)
+    query = select(*(getattr(model, n) for n in names)).order_by(model.id)
+    if since is not None:
+        # Rows from before updated_at existed have none and only go out in
+        # the first (or a full) export
+        query = query.where(model.updated_at > since - HWM_OVERLAP, model.updated_at <= run_at)
+    writer = PartitionWriter(os.path.join(out_dir, name, f'exported_at={run_at:%Y%m%dT%H%M%S%f}'), schema, fmt)
+    try:
+        for batch in record_batches(query, schema):
+            writer.write(batch)
+    finally:
+        writer.close()
+    return writer.rows, run_at
+
+def export_snapshots(name, out_dir, fmt, since=None):
+    # Whole months of a snapshot table, from the month of `since` (a day
+    # already exported) or the first snapshot on, each month's partition
+    # replaced. Returns (rows, last day exported or None).
+    model, names = SNAPSHOT_TABLES[name]
+    schema = table_schema(model, names)
+    first, last = db.session.execute(select(db.func.min(model.day), db.func.max(model.day))).one()
+    if last is None:
+        return 0, since
+    month = (since or first).replace(day=1)
+    rows = 0
+    while month <= last:
+        following = (month + timedelta(days=32)).replace(day=1)
+        directory = os.path.join(out_dir, name, f'month={month:%Y-%m}')
+        query = select(*(getattr(model, n) for n in names)) \
+            .where(model.day >= month, model.day < following).order_by(*model.__table__.primary_key.columns)
+        # Written outside the table directory and moved in when complete, so
+        # a failed run never leaves a half-written month behind
+        staging = os.path.join(out_dir, '_staging', name, f'month={month:%Y-%m}')
+        shutil.rmtree(staging, ignore_errors=True)
+        writer = PartitionWriter(staging, schema, fmt)
+        try:
+            for batch in record_batches(query, schema):
+                writer.write(batch)
+        finally:
+            writer.close()
+        shutil.rmtree(directory, ignore_errors=True)
+        if writer.rows:
+            os.makedirs(os.path.dirname(directory), exist_ok=True)
+            os.replace(staging, directory)
+        rows += writer.rows
+        month = following
+    return rows, last
+
+def export_analytics(out_dir, fmt='parquet', tables=TABLES, full=False, log=None):
+    # Incremental by default: each table continues from the high-water mark
+    # in <out_dir>/_manifest.json; full=True starts the tables over.
+    # Returns {table: rows written}.
+    if fmt not in FORMATS:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = read_manifest(out_dir)
+    if manifest.get('format', fmt) != fmt and not full:
+        raise ValueError(f'{out_dir} holds a {manifest["format"]}-format export; run a full export to switch')
+    manifest['format'] = fmt
+    written = {}
+    for name in tables:
+        state = {} if full else manifest.get('tables', {}).get(name, {})
+        mark = state.get('high_water_mark')
+        if full:
+            shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+        if name in ENTITY_TABLES:
+            rows, mark = export_entity(name, out_dir, fmt, since=datetime.fromisoformat(mark) if mark else None)
+        else:
+            rows, mark = export_snapshots(name, out_dir, fmt, since=date.fromisoformat(mark) if mark else None)
+        manifest.setdefault('tables', {})[name] = {
+            'high_water_mark': mark.isoformat() if mark else None,
+            'last_run_rows': rows,
+            'exported_at': datetime.utcnow().isoformat(timespec='seconds'),
+        }
+        _write_manifest(out_dir, manifest)
+        written[name] = rows
+        if log:
+            log(f'{name}: {rows} row(s)')
+    shutil.rmtree(os.path.join(out_dir, '_staging'), ignore_errors=True)
+    db.session.rollback() # End the read transaction
+    return written
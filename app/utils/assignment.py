@@ -0,0 +1,145 @@
+import numpy as np
+from datetime import date
+from scipy.optimize import linear_sum_assignment
+from app import db
+from app.models import Allocation, Employee, Project
+from app.utils.capacity import CapacityTimeline, WEEKLY_CAPACITY
+from app.utils.matrix import build_staffing_matrix
+
+# Bulk staffing: instead of ranking candidates one project at a time (where
+# the same top candidate wins everywhere), solve one global assignment over
+# all open project slots and available employees with the Hungarian method
+# (scipy's linear_sum_assignment). Each employee gets at most one slot per run.
+
+# How much a full-time fit counts next to a 100% skill match
+CAPACITY_WEIGHT = 0.25
+# Stands in for "not allowed"; such pairs are dropped from the solution
+FORBIDDEN = 1e6
+
+def propose_assignments(project_ids=None, hours=WEEKLY_CAPACITY, slots=1,
+                        min_match_percent=50, min_hours=8, today=None):
+    # Returns proposals [{'project', 'employee', 'match_percent',
+    # 'allocated_hours', 'start_date', 'end_date'}], best score first. Nothing
+    # is written; pass proposal_rows(...) to upsert_allocations to book them.
+    today = today or date.today()
+    matrix = build_staffing_matrix(project_ids)
+    if not matrix.project_ids or not matrix.employee_ids:
+        return []
+
+    # Booking window: the project's remaining dates
+    projects = {p.id: p for p in Project.query.filter(Project.id.in_(matrix.project_ids))}
+    windows = {}
+    for pid, proj in projects.items():
+        start = max(proj.start_date or today, today)
+        if proj.end_date and proj.end_date >= start:
+            windows[pid] = (start, proj.end_date)
+
+    # Skill-qualified (project row, employee row) pairs, from the sparse
+    # matrix's hits
+    hits = [(p, e, pct) for p, e, pct in matrix.matches(min_match_percent)
+            if matrix.project_ids[p] in windows and len(e)]
+    if not hits:
+        return []
+    pair_p = np.concatenate([np.full(len(e), p) for p, e, _ in hits])
+    pair_e = np.concatenate([e for _, e, _ in hits])
+    percent = np.concatenate([pct for _, _, pct in hits])
+
+    # Remaining weekly hours over each project's own window (not today's
+    # current_hours, which misses bookings that start later): the peak booked
+    # load in [start, end], as in find_available_employees, for every pair,
+    # from one range query spanning all the windows
+    window_rows = np.unique(pair_p)
+    window_start = np.array([windows[matrix.project_ids[p]][0].toordinal() for p in window_rows])
+    window_end = np.array([windows[matrix.project_ids[p]][1].toordinal() for p in window_rows])
+    span_start, span_end = date.fromordinal(window_start.min()), date.fromordinal(window_end.max())
+    candidate_rows = np.unique(pair_e)
+    bookings = db.session.query(Allocation.employee_id, Allocation.start_date, Allocation.end_date,
+                                Allocation.allocated_hours) \
+        .filter(Allocation.employee_id.in_([matrix.employee_ids[e] for e in candidate_rows]),
+                db.or_(Allocation.end_date.is_(None), Allocation.end_date >= span_start),
+                db.or_(Allocation.start_date.is_(None), Allocation.start_date <= span_end))
+    intervals = {}
+    for emp_id, start, end, booked in bookings:
+        intervals.setdefault(emp_id, []).append((start, end, booked or 0))
+    timelines = [CapacityTimeline(intervals.get(matrix.employee_ids[e], [])) for e in candidate_rows]
+
+    w = np.searchsorted(window_rows, pair_p)
+    peaks = _window_peaks(timelines, np.searchsorted(candidate_rows, pair_e), window_start[w], window_end[w])
+    offered = np.minimum(WEEKLY_CAPACITY - peaks, hours)
+
+    # Only allowed pairs go on; the solver sees just the projects and
+    # employees that still have one
+    allowed = offered >= min_hours
+    pair_p, pair_e, percent, offered = pair_p[allowed], pair_e[allowed], percent[allowed], offered[allowed]
+    if not len(pair_p):
+        return []
+    score = percent / 100 + CAPACITY_WEIGHT * offered / hours
+    proj_keep, pi = np.unique(pair_p, return_inverse=True)
+    emp_cols, ei = np.unique(pair_e, return_inverse=True)
+    cost = np.full((len(proj_keep), len(emp_cols)), FORBIDDEN)
+    cost[pi, ei] = -score
+    pair_index = np.full(cost.shape, -1)
+    pair_index[pi, ei] = np.arange(len(pi))
+    # One cost row per open slot
+    slot_rows = np.repeat(np.arange(len(proj_keep)), slots)
+    cost = cost[slot_rows]
+
+    rows, cols = linear_sum_assignment(cost)
+    picked = [pair_index[slot_rows[r], c] for r, c in zip(rows, cols) if cost[r, c] < FORBIDDEN]
+
+    employees = {e.id: e for e in Employee.query.filter(
+        Employee.id.in_([matrix.employee_ids[pair_e[i]] for i in picked]))}
+    proposals = []
+    for i in picked:
+        proj_id = matrix.project_ids[pair_p[i]]
+        start, end = windows[proj_id]
+        proposals.append({
+            'project': projects[proj_id],
+            'employee': employees[matrix.employee_ids[pair_e[i]]],
+            'match_percent': round(float(percent[i]), 1),
+            'allocated_hours': int(offered[i]),
+            'start_date': start,
+            'end_date': end,
+            'score': float(score[i]),
+        })
+    proposals.sort(key=lambda x: (-x['score'], x['project'].id, x['employee'].id))
+    return proposals
+
+def _window_peaks(timelines, rows, starts, ends, block=65536):
+    # CapacityTimeline.peak(starts[i], ends[i]) of timelines[rows[i]] for
+    # every pair at once (dates as ordinals). The timelines are padded into
+    # rows of segments; a segment counts when it begins by the window end and
+    # the next one begins after the window start. Pairs go in blocks to bound
+    # the temporaries.
+    width = max((len(t.dates) for t in timelines), default=0)
+    if not width:
+        return np.zeros(len(rows), dtype=np.int64)
+    never = np.iinfo(np.int64).max
+    begins = np.full((len(timelines), width), never, dtype=np.int64)
+    nexts = np.full((len(timelines), width), never, dtype=np.int64)
+    loads = np.zeros((len(timelines), width), dtype=np.int64)
+    for r, timeline in enumerate(timelines):
+        if not timeline.dates:
+            continue
+        ordinals = [day.toordinal() for day in timeline.dates]
+        begins[r, :len(ordinals)] = ordinals
+        nexts[r, :len(ordinals) - 1] = ordinals[1:]
+        loads[r, :len(ordinals)] = timeline.load
+
+    peaks = np.zeros(len(rows), dtype=np.int64)
+    for i in range(0, len(rows), block):
+        r, s, e = rows[i:i + block], starts[i:i + block, None], ends[i:i + block, None]
+        active = (begins[r] <= e) & (nexts[r] > s)
+        peaks[i:i + block] = np.where(active, loads[r], 0).max(axis=1)
+    return peaks
+
+def proposal_rows(proposals):
+    # Proposals -> rows for upsert_allocations, which re-checks capacity over
+    # the whole booking window before writing them in one batch
+    return [{
+        'employee_id': p['employee'].id,
+        'project_id': p['project'].id,
+        'allocated_hours': p['allocated_hours'],
+        'start_date': p['start_date'],
+        'end_date': p['end_date'],
+    } for p in proposals]
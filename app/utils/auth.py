@@ -0,0 +1,33 @@
+from flask import g
+from flask_jwt_extended import verify_jwt_in_request, get_current_user
+from app import db
+from app.models import User
+
+# g is app-context scoped, which can outlive a request (e.g. in tests), so
+# the cached user is reset at the start of every request.
+_NOT_LOADED = object()
+
+def reset_current_user():
+    g._current_user = _NOT_LOADED
+
+def lookup_user(jwt_header, jwt_data):
+    # Flask-JWT-Extended user_lookup_loader: at most one User query per request,
+    # however many times the token is verified (decorator, context processor)
+    identity = jwt_data['sub']
+    user = g.get('_current_user', _NOT_LOADED)
+    if user is _NOT_LOADED or user is None or str(user.id) != str(identity):
+        user = db.session.get(User, int(identity))
+        g._current_user = user
+    return user
+
+def load_current_user():
+    # Current user for templates and optional-auth pages; None when anonymous
+    user = g.get('_current_user', _NOT_LOADED)
+    if user is _NOT_LOADED:
+        try:
+            verify_jwt_in_request(optional=True)
+            user = get_current_user()
+        except Exception:
+            user = None
+        g._current_user = user
+    return user
@@ -0,0 +1,88 @@
+from datetime import datetime
+from sqlalchemy import Integer, case, cast, func, literal, select
+from app import db
+from app.models import Allocation, Employee, Skill, employee_skills
+
+# Bench aging, computed in the database. Each bench employee's last end date
+# is one index seek on allocations (employee_id, end_date), bench days and
+# the aging bucket are SQL expressions over it, and the report is three
+# statements whatever the bench size: the bucket histogram (GROUP BY), the
+# per-skill counts (GROUP BY over the skill index) and one page of the
+# longest idle (a row_number() window). Only the page and the
+# aggregates come back, so memory is bounded by the page size too.
+
+# (label, upper bound in days); the last bucket is open-ended
+BUCKETS = (('0-15', 15), ('16-30', 30), ('31-60', 60), ('60+', None))
+BUCKET_LABELS = tuple(label for label, _ in BUCKETS)
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def _days_since(column, today):
+    # Whole days from a date column to today
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return cast(func.julianday(literal(today)) - func.julianday(column), Integer)
+    return literal(today) - column # date - date is an integer on PostgreSQL
+
+def bench_subquery(today):
+    # One row per bench employee with last_end, bench_days and bucket. Same
+    # rule as Employee.bench_days: 0 when never allocated or still booked.
+    # Materialized, or the planner inlines the correlated MAX() into every
+    # expression that reads last_end
+    last_end = select(func.max(Allocation.end_date)).where(Allocation.employee_id == Employee.id) \
+        .correlate(Employee).scalar_subquery()
+    inner = select(Employee.id, Employee.name, Employee.email, Employee.designation, Employee.skills,
+                   last_end.label('last_end')) \
+        .where(Employee.availability_status == 'Bench').cte('bench_base').prefix_with('MATERIALIZED')
+    bench_days = case((inner.c.last_end.is_(None), 0), (inner.c.last_end >= literal(today), 0),
+                      else_=_days_since(inner.c.last_end, today))
+    days = select(inner, bench_days.label('bench_days')).subquery()
+    bucket = case(*((days.c.bench_days <= bound, label) for label, bound in BUCKETS if bound is not None),
+                  else_=BUCKET_LABELS[-1])
+    return select(days, bucket.label('bucket')).subquery('bench')
+
+def bench_aging(today=None, bucket=None, limit=DEFAULT_LIMIT, offset=0, skills=20):
+    # Columnar report; `bucket` narrows the employee page, not the aggregates
+    today = today or datetime.today().date()
+    bench = bench_subquery(today)
+
+    counts = dict(db.session.execute(
+        select(bench.c.bucket, func.count()).group_by(bench.c.bucket)
+    ).all())
+    buckets = {'labels': list(BUCKET_LABELS), 'counts': [counts.get(label, 0) for label in BUCKET_LABELS]}
+
+    per_skill = select(Skill.name, func.count(), func.round(func.avg(bench.c.bench_days), 1),
+                       *(func.sum(case((bench.c.bucket == label, 1), else_=0)) for label in BUCKET_LABELS)) \
+        .select_from(bench) \
+        .join(employee_skills, employee_skills.c.employee_id == bench.c.id) \
+        .join(Skill, Skill.id == employee_skills.c.skill_id) \
+        .group_by(Skill.name).order_by(func.count().desc(), Skill.name).limit(skills)
+    rows = db.session.execute(per_skill).all()
+    skill_columns = {'skill': [r[0] for r in rows], 'employees': [r[1] for r in rows],
+                     'avg_bench_days': [float(r[2] or 0) for r in rows]}
+    for i, label in enumerate(BUCKET_LABELS, start=3):
+        skill_columns[label] = [int(r[i] or 0) for r in rows]
+
+    ranked = select(bench,
+                    func.row_number().over(order_by=(bench.c.bench_days.desc(), bench.c.id)).label('rank'))
+    if bucket is not None:
+        ranked = ranked.where(bench.c.bucket == bucket)
+    ranked = ranked.subquery()
+    rows = db.session.execute(
+        select(ranked.c.id, ranked.c.name, ranked.c.email, ranked.c.designation, ranked.c.skills,
+               ranked.c.last_end, ranked.c.bench_days, ranked.c.bucket, ranked.c.rank)
+        .where(ranked.c.rank.between(offset + 1, offset + limit)).order_by(ranked.c.rank)
+    ).all()
+    names = ('id', 'name', 'email', 'designation', 'skills', 'last_end', 'bench_days', 'bucket', 'rank')
+    employees = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+    employees['last_end'] = [d.isoformat() if d else None for d in employees['last_end']]
+
+    return {
+        'as_of': today.isoformat(),
+        'total': sum(buckets['counts']),
+        'buckets': buckets,
+        'skills': skill_columns,
+        'longest_idle': employees,
+        'matching': counts.get(bucket, 0) if bucket else sum(buckets['counts']), # Rows the page is drawn from
+        'offset': offset,
+        'limit': limit,
+    }
@@ -0,0 +1,389 @@
+from datetime import date, datetime
+from email_validator import validate_email, EmailNotValidError
+from sqlalchemy import insert, text, update
+from app import db
+from app.models import Employee, Project, Allocation, User
+from app.utils.cache import invalidate_stats
+from app.utils.capacity import CapacityTimeline, WEEKLY_CAPACITY
+from app.utils.skills import index_skills_bulk
+from app.utils.status import apply_allocation_changes
+
+# Batch writers shared by the JSON API and the import pipeline. Each takes a
+# list of plain dicts, validates the whole batch up front, touches the
+# database with a constant number of set-based statements, and returns one
+# result per input row: {'index', 'status': created|updated|error, 'id', 'errors'}.
+# The caller owns the transaction and commits once.
+
+PROJECT_STATUSES = ('Active', 'Completed')
+
+def _result(index, status, id=None, errors=None):
+    result = {'index': index, 'status': status, 'id': id}
+    if errors:
+        result['errors'] = errors
+    return result
+
+def _text(row, field, errors, required=False, max_length=None):
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            errors.append(f'{field} is required')
+        return None
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        errors.append(f'{field} must be at most {max_length} characters')
+    return value
+
+def _date(row, field, errors, required=False):
+    value = row.get(field)
+    if value in (None, ''):
+        if required:
+            errors.append(f'{field} is required')
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        errors.append(f'{field} must be a YYYY-MM-DD date')
+        return None
+
+def _int(row, field, errors, required=False, minimum=None, maximum=None):
+    value = row.get(field)
+    if value in (None, ''):
+        if required:
+            errors.append(f'{field} is required')
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        errors.append(f'{field} must be an integer')
+        return None
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        errors.append(f'{field} must be between {minimum} and {maximum}')
+        return None
+    return value
+
+def _insert_with_ids(model, rows):
+    # Inserts rows that carry their own primary key. PostgreSQL's serial
+    # sequence does not see those, so it is moved past them.
+    db.session.execute(insert(model), rows)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        table = model.__tablename__
+        db.session.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                                f"(SELECT max(id) FROM {table}))"))
+
+def upsert_employees(rows, mode='upsert'):
+    # Keyed by email. mode='create' reports existing emails as errors instead
+    # of updating them. A new employee keeps the row's `id` when no one has
+    # it (so a restored export's allocations still point at the right
+    # people); an existing employee's id never changes.
+    results = [None] * len(rows)
+    valid = {}
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[i] = _result(i, 'error', errors=['row must be an object'])
+            continue
+        errors = []
+        values = {}
+        # A blank name would update to NULL, so one given must not be empty
+        values['name'] = _text(row, 'name', errors, required=mode == 'create' or 'name' in row, max_length=64)
+        email = _text(row, 'email', errors, required=True, max_length=120)
+        if email:
+            try:
+                validate_email(email, check_deliverability=False)
+            except EmailNotValidError:
+                errors.append('email is not valid')
+        if email in valid:
+            errors.append('email is duplicated in this batch')
+        values['mobile'] = _text(row, 'mobile', errors, max_length=20)
+        values['designation'] = _text(row, 'designation', errors, max_length=64)
+        values['skills'] = _text(row, 'skills', errors)
+        requested_id = _int(row, 'id', errors, minimum=1)
+        if errors:
+            results[i] = _result(i, 'error', errors=errors)
+            continue
+        # Only overwrite the fields the row actually carries
+        values = {k: v for k, v in values.items() if k in row}
+        values['email'] = email
+        valid[email] = (i, values, requested_id)
+
+    if not valid:
+        return results
+
+    # One IN query decides create vs update for the whole batch
+    existing = dict(db.session.query(Employee.email, Employee.id).filter(Employee.email.in_(list(valid))).all())
+
+    requested = [r for _, _, r in valid.values() if r is not None]
+    taken = {eid for (eid,) in db.session.query(Employee.id).filter(Employee.id.in_(requested))} if requested else set()
+    creates, id_creates, updates = [], [], []
+    for email, (i, values, requested_id) in valid.items():
+        if email not in existing:
+            if not values.get('name'):
+                results[i] = _result(i, 'error', errors=['name is required'])
+                continue
+            if requested_id is not None and requested_id not in taken:
+                taken.add(requested_id)
+                id_creates.append((i, dict(values, id=requested_id)))
+            else:
+                creates.append((i, values))
+        elif mode == 'create':
+            results[i] = _result(i, 'error', id=existing[email], errors=['employee with this email already exists'])
+        else:
+            updates.append((i, dict(values, id=existing[email])))
+
+    skills_by_id = {}
+    # Own ids first, so the generated ones cannot take them
+    if id_creates:
+        _insert_with_ids(Employee, [values for _, values in id_creates])
+        for i, values in id_creates:
+            existing[values['email']] = values['id']
+            results[i] = _result(i, 'created', values['id'])
+            skills_by_id[values['id']] = values.get('skills')
+    if creates:
+        # Same RETURNING insert as projects and allocations: one batch on
+        # Postgres; SQLite cannot order batched RETURNING rows, so it
+        # falls back to one INSERT per row there
+        new_ids = db.session.scalars(
+            insert(Employee).returning(Employee.id, sort_by_parameter_order=True),
+            [values for _, values in creates]
+        ).all()
+        for (i, values), emp_id in zip(creates, new_ids):
+            existing[values['email']] = emp_id
+            results[i] = _result(i, 'created', emp_id)
+            skills_by_id[emp_id] = values.get('skills')
+    creates += id_creates
+    if updates:
+        db.session.execute(update(Employee), [values for _, values in updates])
+        for i, values in updates:
+            results[i] = _result(i, 'updated', values['id'])
+            if 'skills' in values:
+                skills_by_id[values['id']] = values['skills']
+
+    index_skills_bulk(Employee, skills_by_id)
+
+    # Auto-Link to User if exists (same rule as add_employee)
+    if creates:
+        created_emails = [values['email'] for _, values in creates]
+        for user in User.query.filter(User.email.in_(created_emails), User.employee_id.is_(None)).all():
+            user.employee_id = existing[user.email]
+
+    invalidate_stats()
+    return results
+
+def upsert_projects(rows):
+    # Rows with an `id` update that project (or create it under that id when
+    # no project has it), rows without one are created
+    results = [None] * len(rows)
+    creates, updates = [], []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[i] = _result(i, 'error', errors=['row must be an object'])
+            continue
+        errors = []
+        project_id = _int(row, 'id', errors, minimum=1)
+        # As for employees, name and client_name may be left out but not blanked
+        values = {
+            'name': _text(row, 'name', errors, required=project_id is None or 'name' in row, max_length=64),
+            'client_name': _text(row, 'client_name', errors, required=project_id is None or 'client_name' in row,
+                                 max_length=64),
+            'required_skills': _text(row, 'required_skills', errors),
+            'start_date': _date(row, 'start_date', errors),
+            'end_date': _date(row, 'end_date', errors),
+            'status': _text(row, 'status', errors),
+        }
+        if values['status'] and values['status'] not in PROJECT_STATUSES:
+            errors.append(f"status must be one of {', '.join(PROJECT_STATUSES)}")
+        if values['start_date'] and values['end_date'] and values['start_date'] > values['end_date']:
+            errors.append('start_date must not be after end_date')
+        if errors:
+            results[i] = _result(i, 'error', errors=errors)
+            continue
+        values = {k: v for k, v in values.items() if k in row}
+        if project_id is None:
+            values.setdefault('status', 'Active')
+            creates.append((i, values))
+        else:
+            updates.append((i, dict(values, id=project_id)))
+
+    # An id that does not exist yet is created under that id (restoring an
+    # export into an empty database), given the fields a new project needs
+    id_creates = []
+    if updates:
+        known = {pid for (pid,) in db.session.query(Project.id).filter(Project.id.in_([v['id'] for _, v in updates]))}
+        seen = set()
+        for i, values in updates:
+            if values['id'] in known:
+                continue
+            missing = [f for f in ('name', 'client_name') if not values.get(f)]
+            if missing or values['id'] in seen:
+                errors = ['id is duplicated in this batch'] if values['id'] in seen else \
+                    [f'project not found; {", ".join(missing)} required to create it']
+                results[i] = _result(i, 'error', id=values['id'], errors=errors)
+                continue
+            seen.add(values['id'])
+            values.setdefault('status', 'Active')
+            id_creates.append((i, values))
+        updates = [(i, values) for i, values in updates if values['id'] in known]
+
+    skills_by_id = {}
+    # Own ids first, so the generated ones cannot take them
+    if id_creates:
+        _insert_with_ids(Project, [values for _, values in id_creates])
+        for i, values in id_creates:
+            results[i] = _result(i, 'created', values['id'])
+            skills_by_id[values['id']] = values.get('required_skills')
+    if creates:
+        new_ids = db.session.scalars(
+            insert(Project).returning(Project.id, sort_by_parameter_order=True),
+            [values for _, values in creates]
+        ).all()
+        for (i, values), project_id in zip(creates, new_ids):
+            results[i] = _result(i, 'created', project_id)
+            skills_by_id[project_id] = values.get('required_skills')
+    if updates:
+        db.session.execute(update(Project), [values for _, values in updates])
+        for i, values in updates:
+            results[i] = _result(i, 'updated', values['id'])
+            if 'required_skills' in values:
+                skills_by_id[values['id']] = values['required_skills']
+
+    index_skills_bulk(Project, skills_by_id)
+    return results
+
+def upsert_allocations(rows, capacity=WEEKLY_CAPACITY):
+    # Rows with an `id` update that allocation (missing fields keep their
+    # current value), or create it under that id when no allocation has it;
+    # rows without one are created. Same validation and
+    # over-allocation rule as add_allocation/edit_allocation, checked against
+    # existing bookings and the rows accepted earlier in the batch.
+    results = [None] * len(rows)
+    parsed = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[i] = _result(i, 'error', errors=['row must be an object'])
+            continue
+        errors = []
+        alloc_id = _int(row, 'id', errors, minimum=1)
+        required = alloc_id is None
+        values = {
+            'employee_id': _int(row, 'employee_id', errors, required=required),
+            'project_id': _int(row, 'project_id', errors, required=required),
+            'allocated_hours': _int(row, 'allocated_hours', errors, required=required, minimum=1, maximum=capacity),
+            'start_date': _date(row, 'start_date', errors, required=required),
+            'end_date': _date(row, 'end_date', errors, required=required),
+        }
+        if errors:
+            results[i] = _result(i, 'error', errors=errors)
+            continue
+        values = {k: v for k, v in values.items() if v is not None}
+        parsed.append((i, alloc_id, values))
+
+    if not parsed:
+        return results
+
+    # Current state of the allocations being updated, in one IN query
+    update_ids = [alloc_id for _, alloc_id, _ in parsed if alloc_id is not None]
+    current = {}
+    if update_ids:
+        for row in db.session.query(
+            Allocation.id, Allocation.employee_id, Allocation.project_id,
+            Allocation.allocated_hours, Allocation.start_date, Allocation.end_date
+        ).filter(Allocation.id.in_(update_ids)):
+            current[row.id] = dict(row._mapping)
+
+    merged = []
+    new_ids_seen = set()
+    for i, alloc_id, values in parsed:
+        if alloc_id in current:
+            values = dict(current[alloc_id], **values)
+        elif alloc_id is not None:
+            missing = [f for f in ('employee_id', 'project_id', 'allocated_hours', 'start_date', 'end_date')
+                       if f not in values]
+            if missing or alloc_id in new_ids_seen:
+                errors = ['id is duplicated in this batch'] if alloc_id in new_ids_seen else \
+                    [f'allocation not found; {", ".join(missing)} required to create it']
+                results[i] = _result(i, 'error', id=alloc_id, errors=errors)
+                continue
+            new_ids_seen.add(alloc_id)
+        if values['start_date'] > values['end_date']:
+            results[i] = _result(i, 'error', id=alloc_id, errors=['start_date must not be after end_date'])
+            continue
+        merged.append((i, alloc_id, values))
+
+    if not merged:
+        return results
+
+    employee_ids = {v['employee_id'] for _, _, v in merged}
+    project_ids = {v['project_id'] for _, _, v in merged}
+    known_employees = {eid for (eid,) in db.session.query(Employee.id).filter(Employee.id.in_(employee_ids))}
+    known_projects = {pid for (pid,) in db.session.query(Project.id).filter(Project.id.in_(project_ids))}
+
+    # Existing bookings of every employee in the batch, in one range query
+    window_start = min(v['start_date'] for _, _, v in merged)
+    window_end = max(v['end_date'] for _, _, v in merged)
+    booked = {}
+    for booked_id, emp_id, start, end, hours in db.session.query(
+        Allocation.id, Allocation.employee_id, Allocation.start_date, Allocation.end_date, Allocation.allocated_hours
+    ).filter(Allocation.employee_id.in_(known_employees),
+             Allocation.end_date >= window_start,
+             Allocation.start_date <= window_end):
+        booked.setdefault(emp_id, {})[booked_id] = (start, end, hours or 0)
+
+    creates, id_creates, updates = [], [], []
+    for i, alloc_id, values in merged:
+        errors = []
+        if values['employee_id'] not in known_employees:
+            errors.append('employee not found')
+        if values['project_id'] not in known_projects:
+            errors.append('project not found')
+        if not errors:
+            intervals = booked.setdefault(values['employee_id'], {})
+            others = (v for k, v in intervals.items() if k != alloc_id)
+            peak = CapacityTimeline(others).peak(values['start_date'], values['end_date']) + values['allocated_hours']
+            if peak > capacity:
+                errors.append(f'over-allocation: {peak}h/week exceeds capacity of {capacity}h')
+        if errors:
+            results[i] = _result(i, 'error', id=alloc_id, errors=errors)
+            continue
+
+        interval = (values['start_date'], values['end_date'], values['allocated_hours'])
+        if alloc_id is None:
+            # Keyed so later rows see it; the real id is assigned on insert
+            booked[values['employee_id']][('new', i)] = interval
+            creates.append((i, values))
+        elif alloc_id not in current:
+            booked[values['employee_id']][alloc_id] = interval
+            id_creates.append((i, dict(values, id=alloc_id)))
+        else:
+            booked.get(current[alloc_id]['employee_id'], {}).pop(alloc_id, None)
+            booked[values['employee_id']][alloc_id] = interval
+            updates.append((i, dict(values, id=alloc_id)))
+
+    changes = []
+    # Own ids first, so the generated ones cannot take them
+    if id_creates:
+        _insert_with_ids(Allocation, [values for _, values in id_creates])
+        for i, values in id_creates:
+            results[i] = _result(i, 'created', values['id'])
+            changes.append((None, _snapshot(values)))
+    if creates:
+        new_ids = db.session.scalars(
+            insert(Allocation).returning(Allocation.id, sort_by_parameter_order=True),
+            [values for _, values in creates]
+        ).all()
+        for (i, values), alloc_id in zip(creates, new_ids):
+            results[i] = _result(i, 'created', alloc_id)
+            changes.append((None, _snapshot(values)))
+    if updates:
+        db.session.execute(update(Allocation), [values for _, values in updates])
+        for i, values in updates:
+            results[i] = _result(i, 'updated', values['id'])
+            changes.append((_snapshot(current[values['id']]), _snapshot(values)))
+    if changes:
+        apply_allocation_changes(changes)
+
+    return results
+
+def _snapshot(values):
+    # allocation_snapshot() for a dict of column values
+    return (values['employee_id'], values['start_date'], values['end_date'], values['allocated_hours'] or 0)
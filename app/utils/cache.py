@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import db
+from app.models import AppState
+
+STATS_VERSION_KEY = 'stats_version'
+
+class TTLCache:
+    # Small thread-safe in-process store with per-entry expiry and LRU
+    # eviction. Anything with the same get/set/clear methods (e.g. a Redis
+    # wrapper) can be installed as app.extensions['stats_cache'] instead.
+
+    def __init__(self, ttl=30, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+def stats_version():
+    # Read straight from the table (not the identity map) so every worker
+    # process sees writes made by the others
+    return db.session.query(AppState.value).filter(AppState.key == STATS_VERSION_KEY).scalar()
+
+def invalidate_stats():
+    # Call from any write path that changes dashboard numbers. The version is
+    # only bumped once the caller's transaction commits (not at all if it
+    # rolls back), and then in a one-statement transaction of its own, so
+    # concurrent writers never hold the version row's lock for the length of
+    # their transactions.
+    db.session.info['stats_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    if session.info.pop('stats_changed', False):
+        bump_stats_version(session.get_bind())
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('stats_changed', None)
+
+def bump_stats_version(engine):
+    # A new token makes every cached entry keyed on the old one unreachable.
+    # One upsert: no read-modify-write to race on, and the first writer on a
+    # fresh database creates the row without a second one colliding with it.
+    dialect = sqlite if engine.dialect.name == 'sqlite' else postgresql
+    table = AppState.__table__
+    stmt = dialect.insert(table).values(key=STATS_VERSION_KEY, value=uuid4().hex)
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c.key], set_={'value': stmt.excluded.value})
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+def cached_stats(name, params, compute):
+    # Memoize compute() under (name, params, stats version)
+    cache = current_app.extensions['stats_cache']
+    key = (name, params, stats_version())
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
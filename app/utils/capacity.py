@@ -0,0 +1,125 @@
+from bisect import bisect_right
+from datetime import date
+from sqlalchemy import literal, union_all
+from app import db
+from app.models import Allocation, Employee
+
+WEEKLY_CAPACITY = 40 # Hours per week
+
+class CapacityTimeline:
+    # Sorted sweep-line over one employee's allocations. `dates` holds every
+    # boundary where the booked load changes and `load[i]` is the weekly hours
+    # booked from dates[i] up to (not including) dates[i + 1]. Dates are
+    # inclusive on both ends, like Allocation.start_date/end_date.
+
+    def __init__(self, allocations):
+        deltas = {}
+        for start, end, hours in allocations:
+            start = start or date.min
+            stop = _day_after(end)
+            deltas[start] = deltas.get(start, 0) + hours
+            if stop is not None:
+                deltas[stop] = deltas.get(stop, 0) - hours
+
+        self.dates = sorted(deltas)
+        self.load = []
+        running = 0
+        for day in self.dates:
+            running += deltas[day]
+            self.load.append(running)
+
+    def peak(self, start, end):
+        # Highest weekly load anywhere in [start, end]: O(log n) to find the
+        # segment containing `start`, then O(k) over the k boundaries inside.
+        start = start or date.min
+        end = end or date.max
+        i = bisect_right(self.dates, start) - 1
+        peak = self.load[i] if i >= 0 else 0
+        for j in range(i + 1, len(self.dates)):
+            if self.dates[j] > end:
+                break
+            peak = max(peak, self.load[j])
+        return peak
+
+def _day_after(day):
+    if day is None or day == date.max:
+        return None
+    return date.fromordinal(day.toordinal() + 1)
+
+def employee_timeline(employee_id, start=None, end=None, exclude_allocation_id=None):
+    # Only the allocations overlapping [start, end] can affect the peak there
+    query = db.session.query(Allocation.start_date, Allocation.end_date, Allocation.allocated_hours) \
+        .filter(Allocation.employee_id == employee_id)
+    if start:
+        query = query.filter(db.or_(Allocation.end_date.is_(None), Allocation.end_date >= start))
+    if end:
+        query = query.filter(db.or_(Allocation.start_date.is_(None), Allocation.start_date <= end))
+    if exclude_allocation_id:
+        query = query.filter(Allocation.id != exclude_allocation_id)
+    return CapacityTimeline((s, e, h or 0) for s, e, h in query.all())
+
+def check_capacity(employee_id, start, end, hours, exclude_allocation_id=None):
+    # Peak weekly hours the employee would have in [start, end] if `hours`
+    # were added; pass exclude_allocation_id when editing an allocation.
+    # Returns (fits, peak_hours).
+    timeline = employee_timeline(employee_id, start, end, exclude_allocation_id)
+    peak = timeline.peak(start, end) + hours
+    return peak <= WEEKLY_CAPACITY, peak
+
+def find_overbooked_employees(since=None, capacity=WEEKLY_CAPACITY):
+    # Organisation-wide report in one query and one linear pass: every
+    # allocation contributes a start event and an end event, and the database
+    # returns them already ordered by employee and day. On the same day starts
+    # sort before ends because end dates are inclusive.
+    starts = db.session.query(
+        Allocation.employee_id.label('employee_id'),
+        Allocation.start_date.label('day'),
+        literal(0).label('kind'),
+        Allocation.allocated_hours.label('hours')
+    )
+    ends = db.session.query(
+        Allocation.employee_id.label('employee_id'),
+        Allocation.end_date.label('day'),
+        literal(1).label('kind'),
+        Allocation.allocated_hours.label('hours')
+    )
+    dated = (Allocation.start_date.isnot(None), Allocation.end_date.isnot(None))
+    starts = starts.filter(*dated)
+    ends = ends.filter(*dated)
+    if since:
+        # Everything left ends on or after `since`, so a load reached before
+        # `since` is still in place on `since` itself
+        starts = starts.filter(Allocation.end_date >= since)
+        ends = ends.filter(Allocation.end_date >= since)
+    events = union_all(starts, ends).subquery()
+    rows = db.session.execute(
+        db.select(events.c.employee_id, events.c.day, events.c.kind, events.c.hours)
+        .order_by(events.c.employee_id, events.c.day, events.c.kind)
+    )
+
+    peaks = {}
+    current_emp = None
+    load = 0
+    for emp_id, day, kind, hours in rows:
+        if emp_id != current_emp:
+            current_emp, load = emp_id, 0
+        if kind == 0:
+            load += hours or 0
+            if load > capacity and load > peaks.get(emp_id, (0, None))[0]:
+                peaks[emp_id] = (load, max(day, since) if since else day)
+        else:
+            load -= hours or 0
+
+    if not peaks:
+        return []
+
+    employees = {e.id: e for e in Employee.query.filter(Employee.id.in_(list(peaks))).all()}
+    report = []
+    for emp_id, (peak, day) in peaks.items():
+        report.append({
+            'employee': employees.get(emp_id),
+            'peak_hours': peak,
+            'peak_date': day
+        })
+    report.sort(key=lambda x: x['peak_hours'], reverse=True)
+    return report
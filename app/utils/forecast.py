@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select
+from app import db
+from app.models import Allocation, Employee
+from app.utils.cache import cached_stats
+from app.utils.capacity import WEEKLY_CAPACITY
+
+# Forward view of booked hours, week by week. Every allocation is an interval
+# [start, end] of `allocated_hours` per week; instead of walking each interval
+# week by week, each one adds +hours where it starts and -hours where it stops
+# to a difference array, and a cumulative sum turns that into the dense
+# series: O(allocations + rows x weeks) for all employees at once. Weeks start
+# on Monday; an allocation covering part of a week counts pro rata by day.
+
+BENCH_BELOW = 0.4 * WEEKLY_CAPACITY # status_for_hours() thresholds
+FULL_FROM = 0.8 * WEEKLY_CAPACITY
+MAX_WEEKS = 104
+
+def weekly_hours(rows, starts, stops, hours, n_rows, weeks):
+    # n_rows x weeks array of booked hours. starts/stops are day offsets from
+    # the first Monday, already clipped to [0, weeks * 7], stop exclusive.
+    width = weeks + 1 # Spare column takes stops that land past the horizon
+    size = n_rows * width
+    base = rows * width
+    first, last = starts // 7, stops // 7
+    spans = last > first
+    # Whole weeks strictly between the first and the last one
+    diff = np.bincount(base + first + 1, hours * spans, size) - np.bincount(base + last, hours * spans, size)
+    load = np.cumsum(diff.reshape(n_rows, width), axis=1)
+    # Partial first and last weeks, by day
+    head_days = np.minimum(stops, (first + 1) * 7) - starts
+    tail_days = (stops - last * 7) * spans
+    load += np.bincount(base + first, hours * head_days / 7, size).reshape(n_rows, width)
+    load += np.bincount(base + last, hours * tail_days / 7, size).reshape(n_rows, width)
+    return load[:, :weeks]
+
+class UtilizationForecast:
+    def __init__(self, monday, weeks, employee_ids, designations, allocations):
+        # allocations: (employee_id, project_id, start_date, end_date, hours)
+        # rows overlapping the horizon; open-ended dates run to its edges
+        self.monday = monday
+        self.weeks = weeks
+        self.employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        order = np.argsort(self.employee_ids)
+        self.employee_ids = self.employee_ids[order]
+        labels = [designations[i] or '' for i in order]
+        self.designations, self.designation_rows = np.unique(np.asarray(labels, dtype=object).astype(str),
+                                                             return_inverse=True)
+
+        origin, horizon = monday.toordinal(), weeks * 7
+        count = len(allocations)
+        emp = np.fromiter((a[0] for a in allocations), dtype=np.int64, count=count)
+        proj = np.fromiter((a[1] for a in allocations), dtype=np.int64, count=count)
+        starts = np.fromiter((a[2].toordinal() - origin if a[2] else 0 for a in allocations),
+                             dtype=np.int64, count=count)
+        stops = np.fromiter((a[3].toordinal() - origin + 1 if a[3] else horizon for a in allocations),
+                            dtype=np.int64, count=count)
+        hours = np.fromiter((a[4] or 0 for a in allocations), dtype=np.float64, count=count)
+        starts, stops = np.clip(starts, 0, horizon), np.clip(stops, 0, horizon)
+
+        # Allocations of unknown employees or wholly outside the window add nothing
+        rows = np.searchsorted(self.employee_ids, emp)
+        keep = np.isin(emp, self.employee_ids) & (stops > starts)
+        rows, proj, starts, stops, hours = rows[keep], proj[keep], starts[keep], stops[keep], hours[keep]
+
+        self.employee_load = weekly_hours(rows, starts, stops, hours, len(self.employee_ids), weeks)
+        self.project_ids, project_rows = np.unique(proj, return_inverse=True)
+        self.project_load = weekly_hours(project_rows, starts, stops, hours, len(self.project_ids), weeks)
+
+    def week_starts(self):
+        return [(self.monday + timedelta(weeks=w)).isoformat() for w in range(self.weeks)]
+
+    def _curve(self, load, employees):
+        # Booked hours, utilization % and projected status counts for a group
+        capacity = max(employees, 1) * WEEKLY_CAPACITY
+        return {
+            'employees': int(employees),
+            'booked_hours': np.round(load.sum(axis=0), 1).tolist(),
+            'utilization': np.round(load.sum(axis=0) / capacity * 100, 1).tolist(),
+            'bench': (load < BENCH_BELOW).sum(axis=0).tolist(),
+            'fully_utilized': (load >= FULL_FROM).sum(axis=0).tolist(),
+        }
+
+    def org_curve(self):
+        return self._curve(self.employee_load, len(self.employee_ids))
+
+    def designation_curves(self):
+        curves = []
+        for row, name in enumerate(self.designations):
+            members = self.designation_rows == row
+            curves.append(dict(designation=name or None, **self._curve(self.employee_load[members], members.sum())))
+        return curves
+
+    def project_curves(self):
+        # Staffed hours and full-time equivalents per project with any booking
+        return [{'project_id': int(project_id),
+                 'booked_hours': np.round(load, 1).tolist(),
+                 'fte': np.round(load / WEEKLY_CAPACITY, 2).tolist()}
+                for project_id, load in zip(self.project_ids, self.project_load)]
+
+    def to_dict(self, projects=True):
+        data = {
+            'start': self.monday.isoformat(),
+            'weeks': self.week_starts(),
+            'weekly_capacity': WEEKLY_CAPACITY,
+            'org': self.org_curve(),
+            'designations': self.designation_curves(),
+        }
+        if projects:
+            data['projects'] = self.project_curves()
+        return data
+
+def build_forecast(weeks=12, today=None):
+    # Two column reads: every employee, and the allocations overlapping the
+    # weeks from the Monday of `today`'s week on
+    today = today or datetime.today().date()
+    weeks = max(1, min(weeks, MAX_WEEKS))
+    monday = today - timedelta(days=today.weekday())
+    last_day = monday + timedelta(days=weeks * 7 - 1)
+    employees = db.session.execute(select(Employee.id, Employee.designation)).all()
+    allocations = db.session.execute(
+        select(Allocation.employee_id, Allocation.project_id, Allocation.start_date,
+               Allocation.end_date, Allocation.allocated_hours)
+        .where(db.or_(Allocation.end_date.is_(None), Allocation.end_date >= monday),
+               db.or_(Allocation.start_date.is_(None), Allocation.start_date <= last_day))
+    ).all()
+    return UtilizationForecast(monday, weeks, [e.id for e in employees], [e.designation for e in employees],
+                               allocations)
+
+def forecast_summary(weeks=12, projects=True, today=None):
+    # to_dict() of build_forecast, cached until the next allocation write
+    today = today or datetime.today().date()
+    return cached_stats('forecast', (today.isoformat(), weeks, projects),
+                        lambda: build_forecast(weeks, today).to_dict(projects=projects))
@@ -0,0 +1,241 @@
+import hmac
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import Response, abort, current_app, g, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request SQL and template accounting. Cursor events on every engine feed
+# whichever recorders are active in the current context: the one the request
+# hooks open for each request, and any opened by query_budget() in tests or
+# scripts. At the end of a request the numbers go out as a Server-Timing
+# header and into the process-wide Metrics behind /metrics.
+
+# Statements whose shape (parameters aside) repeats this often in one request
+# are logged as a likely N+1
+REPEAT_WARN_THRESHOLD = 10
+
+# A context variable rather than a thread local, so work handed to a thread
+# pool with a copied context is still counted against its request
+_active = ContextVar('query_recorders', default=())
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter() # statement text -> executions
+        self.executions = Counter() # (statement, parameters) -> executions
+        self._template_starts = []
+
+    @property
+    def duplicates(self):
+        # Executions that repeated an earlier statement with the same parameters
+        return sum(n - 1 for n in self.executions.values())
+
+    def repeated(self, threshold=REPEAT_WARN_THRESHOLD):
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def record(self, statement, parameters, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        self.statements[statement] += 1
+        self.executions[(statement, repr(parameters))] += 1
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+def _push(recorder):
+    _active.set(_active.get() + (recorder,))
+
+def _pop(recorder):
+    _active.set(tuple(r for r in _active.get() if r is not recorder))
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    _push(recorder)
+    try:
+        yield recorder
+    finally:
+        _pop(recorder)
+
+@contextmanager
+def query_budget(limit, allow_duplicates=True):
+    # Test helper: fails when the block runs more than `limit` statements
+    #   with query_budget(5):
+    #       client.get('/bench/')
+    with record_queries() as recorder:
+        yield recorder
+    check_budget(recorder, limit, allow_duplicates)
+
+def check_budget(recorder, limit, allow_duplicates=True, label='block'):
+    problems = []
+    if recorder.count > limit:
+        problems.append(f'{recorder.count} queries, budget is {limit}')
+    if not allow_duplicates and recorder.duplicates:
+        problems.append(f'{recorder.duplicates} duplicate queries')
+    if problems:
+        top = '\n'.join(f'  {n}x {_shorten(s)}' for s, n in recorder.statements.most_common(3))
+        raise QueryBudgetExceeded(f"{label}: {'; '.join(problems)}\nmost frequent:\n{top}")
+
+def _shorten(statement, width=160):
+    statement = re.sub(r'\s+', ' ', statement).strip()
+    return statement if len(statement) <= width else statement[:width] + '...'
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = _active.get()
+    starts = conn.info.get('query_start')
+    if not stack or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for recorder in stack:
+        recorder.record(statement, parameters, elapsed)
+
+class Metrics:
+    # Request counters and timing sums per endpoint, rendered in Prometheus
+    # text format. Kept per process: with several workers each one reports
+    # its own numbers, so scrape them individually or aggregate in Prometheus.
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = Counter() # (endpoint, method, status) -> count
+        self._sums = Counter() # (metric, endpoint) -> total
+        self._buckets = {} # endpoint -> [count per bucket]
+
+    def observe(self, endpoint, method, status, duration, recorder):
+        with self._lock:
+            self._requests[(endpoint, method, str(status))] += 1
+            self._sums[('duration', endpoint)] += duration
+            self._sums[('queries', endpoint)] += recorder.count
+            self._sums[('db', endpoint)] += recorder.db_time
+            self._sums[('template', endpoint)] += recorder.template_time
+            self._sums[('duplicates', endpoint)] += recorder.duplicates
+            buckets = self._buckets.setdefault(endpoint, [0] * len(self.BUCKETS))
+            for i, bound in enumerate(self.BUCKETS):
+                if duration <= bound:
+                    buckets[i] += 1
+
+    def render(self):
+        with self._lock:
+            requests = sorted(self._requests.items())
+            sums = dict(self._sums)
+            buckets = {e: list(b) for e, b in self._buckets.items()}
+
+        counts = Counter()
+        for (endpoint, _, _), n in requests:
+            counts[endpoint] += n
+        lines = [
+            '# HELP http_requests_total Requests handled, by endpoint, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (endpoint, method, status), n in requests:
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {n}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request latency, by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for endpoint in sorted(buckets):
+            for bound, n in zip(self.BUCKETS, buckets[endpoint]):
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {n}')
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {counts[endpoint]}')
+            lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {sums[("duration", endpoint)]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {counts[endpoint]}')
+
+        for metric, name, kind, help_text in (
+            ('queries', 'db_queries_total', 'counter', 'SQL statements executed while handling requests.'),
+            ('duplicates', 'db_duplicate_queries_total', 'counter', 'Statements repeated with identical parameters within a request.'),
+            ('db', 'db_time_seconds_total', 'counter', 'Time spent in SQL statements.'),
+            ('template', 'template_render_seconds_total', 'counter', 'Time spent rendering templates.'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for endpoint in sorted(counts):
+                value = sums.get((metric, endpoint), 0)
+                value = f'{value:.6f}' if isinstance(value, float) else value
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+def _start_request():
+    g._query_recorder = QueryRecorder()
+    _push(g._query_recorder)
+    g._request_start = time.perf_counter()
+
+def _finish_request(response):
+    # Streamed bodies are produced after this point; their queries are not counted
+    recorder = g.pop('_query_recorder', None)
+    if recorder is None:
+        return response
+    _pop(recorder)
+    duration = time.perf_counter() - g.pop('_request_start')
+    endpoint = request.endpoint or 'unmatched'
+    app = current_app._get_current_object()
+
+    app.extensions['metrics'].observe(endpoint, request.method, response.status_code, duration, recorder)
+    if app.config.get('SERVER_TIMING'):
+        response.headers['Server-Timing'] = ', '.join((
+            f'db;dur={recorder.db_time * 1000:.1f};desc="{recorder.count} queries, {recorder.duplicates} duplicate"',
+            f'tpl;dur={recorder.template_time * 1000:.1f}',
+            f'app;dur={duration * 1000:.1f}',
+        ))
+    for statement, n in recorder.repeated():
+        app.logger.warning('Statement ran %dx in %s: %s', n, endpoint, _shorten(statement))
+
+    budget = app.config.get('QUERY_BUDGETS', {}).get(endpoint)
+    if budget is not None:
+        try:
+            check_budget(recorder, budget, label=endpoint)
+        except QueryBudgetExceeded as exc:
+            # Tests fail loudly; production only logs
+            if app.testing:
+                raise
+            app.logger.warning(str(exc))
+    return response
+
+def _abandon_request(exc):
+    # teardown: a request that raised never reached after_request
+    recorder = g.pop('_query_recorder', None)
+    if recorder is not None:
+        _pop(recorder)
+
+def _template_started(app, template, context, **extra):
+    recorder = g.get('_query_recorder')
+    if recorder is not None:
+        recorder._template_starts.append(time.perf_counter())
+
+def _template_finished(app, template, context, **extra):
+    recorder = g.get('_query_recorder')
+    if recorder is not None and recorder._template_starts:
+        recorder.template_time += time.perf_counter() - recorder._template_starts.pop()
+
+def metrics_view():
+    # Prometheus scrape target; set METRICS_TOKEN to require it as a bearer
+    # token. With METRICS_REQUIRE_TOKEN (production) it stays closed until
+    # one is set
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        if current_app.config.get('METRICS_REQUIRE_TOKEN'):
+            abort(404)
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    return Response(current_app.extensions['metrics'].render(), mimetype='text/plain; version=0.0.4')
+
+def init_instrumentation(app):
+    app.extensions['metrics'] = Metrics()
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_abandon_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
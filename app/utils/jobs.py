@@ -0,0 +1,279 @@
+import inspect
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, select, update
+from app import db
+from app.models import Job, JobOutputChunk
+from app.utils.cache import invalidate_stats
+from app.utils.matrix import staffing_matrix, staffing_matrix_json
+from app.utils.snapshots import take_snapshots
+from app.utils.status import recompute_current_hours, sweep_allocation_boundaries
+from app.utils.transfer import EXPORT_COLUMNS, FORMATS, export_chunks
+
+# Database-backed job queue. Request handlers enqueue() work and answer right
+# away; `flask worker` claims queued jobs and runs them on a process pool,
+# retrying failures with exponential backoff. Claiming is a conditional
+# UPDATE (queued -> running), so any number of workers can share the table;
+# on PostgreSQL candidates are also read with SKIP LOCKED so workers do not
+# queue up behind each other's row locks.
+
+JOBS = {} # kind -> fn(job, **payload) returning something JSON-serializable
+
+RETRY_BASE_SECONDS = 30 # Doubles with every failed attempt
+STALE_AFTER = timedelta(minutes=30) # A running job older than this lost its worker
+OUTPUT_CHUNK_BYTES = 1024 * 1024 # Compressed bytes per stored output row
+
+class JobFailed(Exception):
+    # Raise from a job to fail it for good, without retries
+    pass
+
+def job(kind):
+    def register(fn):
+        JOBS[kind] = fn
+        return fn
+    return register
+
+def check_payload(kind, payload):
+    # ValueError unless the payload's keys fit the job function's arguments
+    try:
+        inspect.signature(JOBS[kind]).bind(None, **payload)
+    except TypeError as exc:
+        raise ValueError(f'Invalid payload for {kind}: {exc}') from None
+
+def enqueue(kind, payload=None, max_attempts=3, run_after=None):
+    # Caller commits
+    if kind not in JOBS:
+        raise ValueError(f'Unknown job kind {kind}')
+    check_payload(kind, payload or {})
+    new_job = Job(kind=kind, payload=json.dumps(payload or {}), max_attempts=max_attempts,
+                  run_after=run_after or datetime.utcnow())
+    db.session.add(new_job)
+    return new_job
+
+def claim_jobs(worker_id, limit=1, now=None):
+    # Marks up to `limit` runnable jobs as running for `worker_id`; returns their ids
+    now = now or datetime.utcnow()
+    candidates = db.session.query(Job.id) \
+        .filter(Job.status == 'queued', Job.run_after <= now) \
+        .order_by(Job.run_after, Job.id).limit(limit * 2) \
+        .with_for_update(skip_locked=True)
+    claimed = []
+    for (job_id,) in candidates.all():
+        result = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        )
+        if result.rowcount:
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    db.session.commit()
+    return claimed
+
+def run_job(job_id):
+    # Runs one claimed job and records the outcome; returns the new status
+    current = db.session.get(Job, job_id)
+    try:
+        payload = json.loads(current.payload or '{}')
+        try:
+            check_payload(current.kind, payload)
+        except ValueError as exc:
+            # Queued without going through enqueue(); retrying cannot help
+            raise JobFailed(str(exc))
+        result = JOBS[current.kind](current, **payload)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        current = db.session.get(Job, job_id)
+        current.error = traceback.format_exc(limit=5)[-4000:]
+        if isinstance(exc, JobFailed):
+            current.max_attempts = current.attempts
+        _retry_or_fail(current, datetime.utcnow())
+    else:
+        current.status = 'done'
+        current.result = json.dumps(result)
+        current.error = None
+        current.finished_at = datetime.utcnow()
+    current.locked_by = current.locked_at = None
+    db.session.commit()
+    return current.status
+
+def _retry_or_fail(failed, now):
+    if failed.attempts < failed.max_attempts:
+        failed.status = 'queued'
+        failed.run_after = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** max(failed.attempts - 1, 0))
+    else:
+        failed.status = 'failed'
+        failed.finished_at = now
+
+def requeue_stale(now=None):
+    # Jobs whose worker died mid-run go back to the queue (or fail for good)
+    now = now or datetime.utcnow()
+    stale = Job.query.filter(Job.status == 'running', Job.locked_at < now - STALE_AFTER).all()
+    for lost in stale:
+        lost.error = f'Worker {lost.locked_by} did not finish the job'
+        lost.locked_by = lost.locked_at = None
+        _retry_or_fail(lost, now)
+    db.session.commit()
+    return len(stale)
+
+# Worker processes build their own app from the parent's database URL; they
+# are spawned, not forked, so no pooled connection crosses a process boundary
+
+_child_app = None
+
+def _init_child(database_uri):
+    global _child_app
+    from app import create_app
+    from config import config_for_env
+    config = type('WorkerConfig', (config_for_env(),), {'SQLALCHEMY_DATABASE_URI': database_uri})
+    _child_app = create_app(config)
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # The parent decides when to stop
+
+def _run_in_child(job_id):
+    with _child_app.app_context():
+        return run_job(job_id)
+
+def work(processes=None, burst=False, poll_interval=1.0, log=print):
+    # Drains the queue until stopped (or, with burst, until it is empty).
+    # processes=0 runs jobs one at a time in this process.
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    processes = os.cpu_count() if processes is None else processes
+    executor = None
+    if processes:
+        executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_child,
+                                       initargs=(current_app.config['SQLALCHEMY_DATABASE_URI'],))
+    stopping = []
+    previous = signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    running = {}
+    processed = 0
+    try:
+        while not stopping:
+            requeue_stale()
+            free = (processes or 1) - len(running)
+            claimed = claim_jobs(worker_id, free) if free else []
+            for job_id in claimed:
+                if executor is None:
+                    log(f'job {job_id}: {run_job(job_id)}')
+                    processed += 1
+                else:
+                    running[executor.submit(_run_in_child, job_id)] = job_id
+            if not running and not claimed:
+                if burst:
+                    break
+                _sleep(poll_interval, stopping)
+                continue
+            if running:
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    log(f'job {job_id}: {_outcome(future)}')
+                    processed += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Let jobs already handed to the pool finish and record their outcome
+        for future, job_id in running.items():
+            log(f'job {job_id}: {_outcome(future)}')
+            processed += 1
+        if executor is not None:
+            executor.shutdown()
+        signal.signal(signal.SIGTERM, previous)
+    return processed
+
+def _outcome(future):
+    try:
+        return future.result()
+    except Exception as exc:
+        # The child itself died; the job stays running until requeue_stale
+        return f'worker error: {exc!r}'
+
+def _sleep(seconds, stopping):
+    deadline = time.monotonic() + seconds
+    while not stopping and time.monotonic() < deadline:
+        time.sleep(min(0.2, seconds))
+
+def save_output(current, chunks, chunk_bytes=OUTPUT_CHUNK_BYTES):
+    # Gzips text chunks into the job's output rows as they are produced
+    # (committed with the job), so at most about chunk_bytes of compressed
+    # data is held at once; drops outputs past their retention. Returns the
+    # text length.
+    retention = timedelta(days=current_app.config.get('JOB_OUTPUT_RETENTION_DAYS', 7))
+    expired = select(JobOutputChunk.job_id).where(JobOutputChunk.seq == 0,
+                                                  JobOutputChunk.created_at < datetime.utcnow() - retention)
+    JobOutputChunk.query.filter(JobOutputChunk.job_id.in_(expired)).delete(synchronize_session=False)
+
+    compressor = zlib.compressobj(wbits=31) # gzip container
+    buffer, size, seq = bytearray(), 0, 0
+    def write(data):
+        nonlocal seq
+        db.session.execute(insert(JobOutputChunk), {'job_id': current.id, 'seq': seq, 'data': bytes(data),
+                                                    'created_at': datetime.utcnow()})
+        seq += 1
+    for chunk in chunks:
+        size += len(chunk)
+        buffer += compressor.compress(chunk.encode('utf-8'))
+        if len(buffer) >= chunk_bytes:
+            write(buffer)
+            buffer.clear()
+    buffer += compressor.flush()
+    write(buffer)
+    return size
+
+def has_output(job_id):
+    return db.session.query(JobOutputChunk.job_id).filter_by(job_id=job_id, seq=0).first() is not None
+
+def output_chunks(job_id, piece_size=64 * 1024):
+    # Decompressed bytes of a job's output, reading the stored rows one at a
+    # time (a server-side cursor on PostgreSQL)
+    decompressor = zlib.decompressobj(wbits=31)
+    rows = db.session.execute(
+        select(JobOutputChunk.data).where(JobOutputChunk.job_id == job_id).order_by(JobOutputChunk.seq)
+        .execution_options(yield_per=1)
+    ).scalars()
+    for data in rows:
+        while data:
+            piece = decompressor.decompress(data, piece_size)
+            data = decompressor.unconsumed_tail
+            if piece:
+                yield piece
+    yield decompressor.flush()
+
+# Built-in jobs
+
+@job('recompute_status')
+def recompute_status_job(current, employee_ids=None):
+    recompute_current_hours(employee_ids)
+    invalidate_stats()
+    return {'employees': len(employee_ids) if employee_ids is not None else None}
+
+@job('sweep_status')
+def sweep_status_job(current, full=False):
+    return {'touched': sweep_allocation_boundaries(full=full)}
+
+@job('snapshot')
+def snapshot_job(current, start=None, end=None):
+    to_date = lambda value: date.fromisoformat(value) if value else None
+    return {'days': take_snapshots(to_date(start), to_date(end))}
+
+@job('staffing_matrix')
+def staffing_matrix_job(current, top_k=5, min_match_percent=50):
+    return staffing_matrix_json(staffing_matrix(top_k=top_k, min_match_percent=min_match_percent))
+
+@job('export')
+def export_job(current, entity, fmt='csv'):
+    if entity not in EXPORT_COLUMNS or fmt not in FORMATS:
+        raise JobFailed(f'Cannot export {entity} as {fmt}')
+    # Stored in the database rather than on the worker's disk, which the web
+    # service serving the download may not see
+    return {'entity': entity, 'format': fmt, 'chars': save_output(current, export_chunks(entity, fmt))}
@@ -1,63 +1,156 @@
-from app.models import Employee, Project
+import numpy as np
+from datetime import date
+from app import db
+from app.models import Employee, Project, Allocation, employee_skills, project_skills
+from app.utils.capacity import CapacityTimeline, WEEKLY_CAPACITY
+from app.utils.skills import skill_names, unpack_skill_ids
+
+# Share of the time-window score that comes from the skill match; the rest
+# comes from free hours over the project's dates
+SKILL_WEIGHT = 0.6
+
+def _skill_matches(req_skills, min_match_percent, statuses=None):
+    # Walk the posting lists of the required skills only, so employees that
+    # share no skill with the project are never loaded or scored.
+    # Returns ({emp_id: match_percent}, {emp_id: [skill_id, ...]}).
+    postings = db.session.query(employee_skills.c.employee_id, employee_skills.c.skill_id) \
+        .join(Employee, Employee.id == employee_skills.c.employee_id) \
+        .filter(employee_skills.c.skill_id.in_(list(req_skills)))
+    if statuses:
+        postings = postings.filter(Employee.availability_status.in_(statuses))
+
+    matched = {}
+    for emp_id, skill_id in postings.all():
+        matched.setdefault(emp_id, []).append(skill_id)
+
+    scores = {}
+    for emp_id, skill_ids in matched.items():
+        match_percent = (len(skill_ids) / len(req_skills)) * 100
+        if match_percent >= min_match_percent:
+            scores[emp_id] = match_percent
+    return scores, matched
 
 def find_matching_employees(project_id, min_match_percent=50):
     project = Project.query.get(project_id)
     if not project or not project.required_skills:
         return []
 
-    req_skills = [s.strip().lower() for s in project.required_skills.split(',')]
+    req_skills = skill_names(unpack_skill_ids(project.skill_ids))
+    if not req_skills:
+        return []
+
+    # Check all Bench and Partially Utilized
+    scores, matched = _skill_matches(req_skills, min_match_percent, ['Bench', 'Partially Utilized'])
+    if not scores:
+        return []
+
+    employees = Employee.query.filter(Employee.id.in_(list(scores))).all()
     matches = []
-    
-    # Check all bench employees first? Or all available?
-    # Let's check all Bench and Partially Utilized
-    candidates = Employee.query.filter(Employee.availability_status.in_(['Bench', 'Partially Utilized'])).all()
-    
-    for emp in candidates:
-        if not emp.skills:
-            continue
-        
-        emp_skills = [s.strip().lower() for s in emp.skills.split(',')]
-        matched_skills = set(req_skills).intersection(set(emp_skills))
-        
-        match_percent = (len(matched_skills) / len(req_skills)) * 100
-        
-        if match_percent >= min_match_percent:
-            matches.append({
-                'employee': emp,
-                'match_percent': round(match_percent, 1),
-                'matched_skills': ', '.join(matched_skills)
-            })
-            
+    for emp in employees:
+        matches.append({
+            'employee': emp,
+            'match_percent': round(scores[emp.id], 1),
+            'matched_skills': ', '.join(req_skills[s] for s in req_skills if s in matched[emp.id])
+        })
+
     # Sort by match percent desc
     matches.sort(key=lambda x: x['match_percent'], reverse=True)
     return matches
 
+def find_available_employees(project_id, min_match_percent=50, min_free_hours=1, today=None):
+    # Time-window mode: instead of today's availability_status, rank by the
+    # free weekly hours each candidate has over the project's remaining dates
+    # (peak booked load in the window, from one range query for the whole
+    # candidate set), combined with the skill match.
+    project = Project.query.get(project_id)
+    if not project or not project.required_skills:
+        return []
+
+    req_skills = skill_names(unpack_skill_ids(project.skill_ids))
+    if not req_skills:
+        return []
+
+    scores, matched = _skill_matches(req_skills, min_match_percent)
+    if not scores:
+        return []
+
+    today = today or date.today()
+    start = max(project.start_date or today, today)
+    end = project.end_date
+    if end and end < start:
+        return []
+
+    bookings = db.session.query(Allocation.employee_id, Allocation.start_date, Allocation.end_date, Allocation.allocated_hours) \
+        .filter(Allocation.employee_id.in_(list(scores)),
+                db.or_(Allocation.end_date.is_(None), Allocation.end_date >= start))
+    if end:
+        bookings = bookings.filter(db.or_(Allocation.start_date.is_(None), Allocation.start_date <= end))
+    intervals = {}
+    for emp_id, alloc_start, alloc_end, hours in bookings.all():
+        intervals.setdefault(emp_id, []).append((alloc_start, alloc_end, hours or 0))
+
+    free = {}
+    for emp_id in scores:
+        free_hours = WEEKLY_CAPACITY - CapacityTimeline(intervals.get(emp_id, [])).peak(start, end)
+        if free_hours >= min_free_hours:
+            free[emp_id] = free_hours
+    if not free:
+        return []
+
+    employees = Employee.query.filter(Employee.id.in_(list(free))).all()
+    matches = []
+    for emp in employees:
+        matches.append({
+            'employee': emp,
+            'match_percent': round(scores[emp.id], 1),
+            'matched_skills': ', '.join(req_skills[s] for s in req_skills if s in matched[emp.id]),
+            'free_hours': free[emp.id],
+            'score': round(SKILL_WEIGHT * scores[emp.id] / 100 + (1 - SKILL_WEIGHT) * free[emp.id] / WEEKLY_CAPACITY, 3),
+        })
+
+    matches.sort(key=lambda x: (-x['score'], -x['match_percent'], x['employee'].id))
+    return matches
+
 def find_projects_for_employee(employee_id, min_match_percent=50):
     employee = Employee.query.get(employee_id)
     if not employee or not employee.skills:
         return []
 
-    emp_skills = [s.strip().lower() for s in employee.skills.split(',')]
-    matches = []
-    
-    # Check all Active Projects
-    active_projects = Project.query.filter_by(status='Active').all()
-    
-    for proj in active_projects:
-        if not proj.required_skills:
+    emp_skills = skill_names(unpack_skill_ids(employee.skill_ids))
+    if not emp_skills:
+        return []
+
+    # Active projects that require at least one of the employee's skills
+    candidate_ids = db.session.query(project_skills.c.project_id) \
+        .join(Project, Project.id == project_skills.c.project_id) \
+        .filter(project_skills.c.skill_id.in_(list(emp_skills)), Project.status == 'Active') \
+        .distinct()
+
+    # The denominator needs each candidate's full requirement list, which is
+    # the packed skill_ids column; intersect it with the employee's in NumPy
+    emp_ids = unpack_skill_ids(employee.skill_ids)
+    scores = {}
+    for proj_id, packed in db.session.query(Project.id, Project.skill_ids).filter(Project.id.in_(candidate_ids)):
+        required = unpack_skill_ids(packed)
+        if not len(required):
             continue
-            
-        req_skills = [s.strip().lower() for s in proj.required_skills.split(',')]
-        matched_skills = set(emp_skills).intersection(set(req_skills))
-        
-        match_percent = (len(matched_skills) / len(req_skills)) * 100
-        
+        shared = np.intersect1d(required, emp_ids, assume_unique=True)
+        match_percent = (len(shared) / len(required)) * 100
         if match_percent >= min_match_percent:
-            matches.append({
-                'project': proj,
-                'match_percent': round(match_percent, 1),
-                'matched_skills': ', '.join(matched_skills)
-            })
-            
+            scores[proj_id] = (match_percent, shared.tolist())
+
+    if not scores:
+        return []
+
+    projects = Project.query.filter(Project.id.in_(list(scores))).all()
+    matches = []
+    for proj in projects:
+        match_percent, shared = scores[proj.id]
+        matches.append({
+            'project': proj,
+            'match_percent': round(match_percent, 1),
+            'matched_skills': ', '.join(emp_skills[s] for s in shared)
+        })
+
     matches.sort(key=lambda x: x['match_percent'], reverse=True)
     return matches
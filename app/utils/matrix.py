@@ -0,0 +1,129 @@
+import numpy as np
+from scipy import sparse
+from app import db
+from app.models import Employee, Project
+from app.utils.skills import skill_names, unpack_skill_ids
+
+# Batch form of find_matching_employees: scores every available employee
+# against every active project at once. Employees and projects become sparse
+# 0/1 rows over the skill vocabulary (straight from their packed skill_ids)
+# and a sparse product gives the shared-skill count of every pair that has
+# one, instead of one query plus set work per pair. Products are taken a
+# block of projects at a time and only the hits (over the threshold, or the
+# top k) are kept, so memory follows the matches rather than projects x
+# employees.
+
+AVAILABLE_STATUSES = ('Bench', 'Partially Utilized')
+PROJECT_BLOCK = 64 # Projects scored per sparse product
+
+class StaffingMatrix:
+    def __init__(self, employee_skill_ids, project_skill_ids):
+        # {row_id: sorted skill id array} per side, as unpacked from the
+        # skill_ids column. Rows keep id order so ties break the same way on
+        # every run; rows without skills are left out.
+        self.employee_ids = sorted(e for e, ids in employee_skill_ids.items() if len(ids))
+        self.project_ids = sorted(p for p, ids in project_skill_ids.items() if len(ids))
+        emp_arrays = [employee_skill_ids[e] for e in self.employee_ids]
+        proj_arrays = [project_skill_ids[p] for p in self.project_ids]
+
+        # Only skills both sides have can add to an overlap, so the other
+        # columns are dropped; the denominator is each project's full count.
+        emp_all = np.concatenate(emp_arrays) if emp_arrays else np.empty(0, dtype=np.uint32)
+        proj_all = np.concatenate(proj_arrays) if proj_arrays else np.empty(0, dtype=np.uint32)
+        shared = np.intersect1d(emp_all, proj_all)
+        self.skill_ids = shared.tolist()
+
+        # Rows x skills per side, plus skills x employees for the products
+        self.project_vectors = _csr(proj_arrays, proj_all, shared)
+        self.employee_vectors = _csr(emp_arrays, emp_all, shared)
+        self.employee_columns = self.employee_vectors.T.tocsr()
+        self.required = np.maximum(np.array([len(ids) for ids in proj_arrays], dtype=np.float64), 1)
+
+    def matches(self, min_match_percent=50, top_k=None, block=PROJECT_BLOCK):
+        # (project_row, employee_rows, percents) for every project in row
+        # order, best match first with ties by id; employees sharing no skill
+        # never match. With top_k only the k best are kept.
+        for first in range(0, len(self.project_ids), block):
+            counts = self.project_vectors[first:first + block] @ self.employee_columns
+            for r in range(counts.shape[0]):
+                lo, hi = counts.indptr[r], counts.indptr[r + 1]
+                employees = counts.indices[lo:hi]
+                percents = counts.data[lo:hi] / self.required[first + r] * 100
+                keep = percents >= min_match_percent
+                employees, percents = employees[keep], percents[keep]
+                if top_k is not None and len(employees) > top_k:
+                    # Partition on the k-th best score, keeping every tie at the cut
+                    cut = np.partition(percents, len(percents) - top_k)[len(percents) - top_k]
+                    keep = percents >= cut
+                    employees, percents = employees[keep], percents[keep]
+                order = np.lexsort((employees, -percents))[:top_k]
+                yield first + r, employees[order], percents[order]
+
+    def matched_skill_ids(self, project_row, employee_row):
+        both = np.intersect1d(_row(self.project_vectors, project_row), _row(self.employee_vectors, employee_row),
+                              assume_unique=True)
+        return [self.skill_ids[i] for i in both]
+
+def _row(matrix, row):
+    # Column indexes set in one CSR row
+    return matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+
+def _csr(arrays, flat, columns):
+    # rows x columns sparse 0/1 matrix from per-row id arrays, built in one
+    # vectorized pass; ids outside `columns` are skipped
+    shape = (len(arrays), len(columns))
+    if not len(flat) or not len(columns):
+        return sparse.csr_matrix(shape, dtype=np.int32)
+    rows = np.repeat(np.arange(len(arrays)), [len(ids) for ids in arrays])
+    cols = np.searchsorted(columns, flat)
+    keep = (cols < len(columns)) & (columns[np.minimum(cols, len(columns) - 1)] == flat)
+    return sparse.csr_matrix((np.ones(int(keep.sum()), dtype=np.int32), (rows[keep], cols[keep])), shape=shape)
+
+def build_staffing_matrix(project_ids=None):
+    # Two plain column reads for the whole matrix: the packed skill ids of
+    # available employees and of active projects (or the given ones)
+    employees = db.session.query(Employee.id, Employee.skill_ids) \
+        .filter(Employee.availability_status.in_(AVAILABLE_STATUSES))
+    projects = db.session.query(Project.id, Project.skill_ids)
+    if project_ids is None:
+        projects = projects.filter(Project.status == 'Active')
+    else:
+        projects = projects.filter(Project.id.in_(list(project_ids)))
+    return StaffingMatrix({e: unpack_skill_ids(packed) for e, packed in employees},
+                          {p: unpack_skill_ids(packed) for p, packed in projects})
+
+def staffing_matrix(top_k=5, min_match_percent=50, project_ids=None):
+    # [{'project', 'matches': [{'employee', 'match_percent', 'matched_skills'}]}]
+    # per project, in project id order; match dicts look like the ones from
+    # find_matching_employees
+    matrix = build_staffing_matrix(project_ids)
+    picks = list(matrix.matches(min_match_percent, top_k))
+
+    emp_ids = {matrix.employee_ids[e] for _, rows, _ in picks for e in rows}
+    employees = {e.id: e for e in Employee.query.filter(Employee.id.in_(emp_ids))} if emp_ids else {}
+    projects = {p.id: p for p in Project.query.filter(Project.id.in_(matrix.project_ids))} if matrix.project_ids else {}
+    names = skill_names(matrix.skill_ids)
+
+    rows = []
+    for p, emp_rows, percents in picks:
+        rows.append({
+            'project': projects[matrix.project_ids[p]],
+            'matches': [{
+                'employee': employees[matrix.employee_ids[e]],
+                'match_percent': round(float(percent), 1),
+                'matched_skills': ', '.join(names[s] for s in matrix.matched_skill_ids(p, e)),
+            } for e, percent in zip(emp_rows, percents)],
+        })
+    return rows
+
+def staffing_matrix_json(rows):
+    # staffing_matrix() rows as plain data, for the API and background jobs
+    return [{
+        'project': row['project'].to_dict(),
+        'matches': [{
+            'employee_id': m['employee'].id,
+            'name': m['employee'].name,
+            'match_percent': m['match_percent'],
+            'matched_skills': m['matched_skills'],
+        } for m in row['matches']],
+    } for row in rows]
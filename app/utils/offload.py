@@ -0,0 +1,82 @@
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import abort, current_app
+from app import db
+
+# Heavy read paths (matching, the staffing matrix, reports) run on a small
+# per-app thread pool instead of inline in the request thread:
+#   - independent reads of one request run side by side, each on its own
+#     session and connection, so their database waits overlap;
+#   - identical reads already in flight (say, several people opening the same
+#     project) share one computation instead of each running it;
+#   - a request gives up with 503 after OFFLOAD_TIMEOUT rather than holding
+#     its worker thread indefinitely.
+# Results are detached ORM objects: loaded columns are readable, lazy
+# relationships are not, so load what the template needs inside the task.
+
+class Offloader:
+    def __init__(self, app, max_workers):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='offload') if max_workers else None
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        # The task sees the caller's context variables (query instrumentation)
+        # and gets its own app context, hence its own session
+        if self.executor is None:
+            return _done(fn, *args, **kwargs)
+        context = contextvars.copy_context()
+        return self.executor.submit(context.run, self._call, fn, args, kwargs)
+
+    def shared(self, key, fn, *args, **kwargs):
+        # submit(), unless an identical task (same key) is still running
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+        # Outside the lock: a future that is already done runs it right away
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _call(self, fn, args, kwargs):
+        with self.app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                db.session.remove()
+
+def _done(fn, *args, **kwargs):
+    # Inline fallback (OFFLOAD_WORKERS=0): runs in the caller's context and
+    # session, with the Future interface
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+def init_offload(app):
+    app.extensions['offload'] = Offloader(app, app.config.get('OFFLOAD_WORKERS', 4))
+
+def offload(fn, *args, **kwargs):
+    return current_app.extensions['offload'].submit(fn, *args, **kwargs)
+
+def offload_shared(key, fn, *args, **kwargs):
+    return current_app.extensions['offload'].shared(key, fn, *args, **kwargs)
+
+def gather(*futures):
+    # Results in order; 503 if the pool cannot finish them in time
+    timeout = current_app.config.get('OFFLOAD_TIMEOUT', 30)
+    try:
+        return [future.result(timeout=timeout) for future in futures]
+    except FutureTimeout:
+        abort(503, description='The server is busy, please retry.')
@@ -0,0 +1,49 @@
+from sqlalchemy import tuple_
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+def parse_per_page(value, default=DEFAULT_PER_PAGE):
+    try:
+        per_page = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+def keyset_page(query, key_column, before=None, after=None, per_page=DEFAULT_PER_PAGE, cursor_of=None,
+                descending=True):
+    # Keyset (cursor) pagination on a unique, indexed column, newest first.
+    # `before` pages towards older rows, `after` towards newer ones; either way
+    # the database only reads per_page + 1 rows from the index.
+    # A tuple of columns is a composite key compared as a row value, e.g.
+    # (name, id) for a list by name; its cursors are tuples. With
+    # descending=False the list runs smallest first and `before` still pages
+    # on through it.
+    columns = key_column if isinstance(key_column, tuple) else (key_column,)
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+    onwards = (lambda cursor: key < cursor) if descending else (lambda cursor: key > cursor)
+    backwards = (lambda cursor: key > cursor) if descending else (lambda cursor: key < cursor)
+    order = lambda down: [column.desc() if down else column.asc() for column in columns]
+    if after is not None:
+        rows = query.filter(backwards(after)).order_by(*order(not descending)).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_newer, has_older = has_more, True
+    else:
+        if before is not None:
+            query = query.filter(onwards(before))
+        rows = query.order_by(*order(descending)).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_newer, has_older = before is not None, len(rows) > per_page
+
+    # cursor_of reads the key off an item, for queries returning tuples
+    if cursor_of is None:
+        if len(columns) > 1:
+            cursor_of = lambda item: tuple(getattr(item, column.key) for column in columns)
+        else:
+            cursor_of = lambda item: getattr(item, key_column.key)
+    return {
+        'items': items,
+        'next_cursor': cursor_of(items[-1]) if items and has_older else None,
+        'prev_cursor': cursor_of(items[0]) if items and has_newer else None,
+    }
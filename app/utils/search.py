@@ -0,0 +1,135 @@
+import re
+from sqlalchemy import DDL, event, func, literal_column, or_, and_, text
+from app import db
+from app.models import Employee, Project, Skill, employee_skills, project_skills
+from app.utils.pagination import keyset_page, DEFAULT_PER_PAGE
+from app.utils.skills import canonical_names, normalize_skill, skill_names
+
+# Full-text search over employees and projects, backed by whatever the
+# database offers: an FTS5 external-content table kept in sync by triggers on
+# SQLite, a generated tsvector column with a GIN index on PostgreSQL, and
+# plain LIKE filters anywhere else. Every word of the query is a prefix match
+# and all words must match. Results are keyset paginated and come with facet
+# counts over the matching rows.
+
+SEARCH_SPECS = {
+    'employees': {
+        'model': Employee,
+        'table': 'workforce_employees',
+        'columns': ('name', 'email', 'designation', 'skills'),
+        'facets': {'status': Employee.availability_status, 'designation': Employee.designation},
+        'postings': (employee_skills, 'employee_id'),
+    },
+    'projects': {
+        'model': Project,
+        'table': 'workforce_projects',
+        'columns': ('name', 'client_name', 'required_skills'),
+        'facets': {'status': Project.status, 'client': Project.client_name},
+        'postings': (project_skills, 'project_id'),
+    },
+}
+
+MAX_TERMS = 8
+FACET_LIMIT = 15
+
+def search_ddl(table, columns, dialect):
+    # Statements that create the search index for `table`; shared by the
+    # create_all hook below and mirrored in the migration
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    fts = f'{table}_fts'
+    if dialect == 'sqlite':
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        ]
+    if dialect == 'postgresql':
+        document = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+        return [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)",
+        ]
+    return []
+
+def _register_ddl(spec):
+    # Tables made by db.create_all() (tests, first deploy) get the index too
+    table = spec['model'].__table__
+    for dialect in ('sqlite', 'postgresql'):
+        for statement in search_ddl(spec['table'], spec['columns'], dialect):
+            event.listen(table, 'after_create', DDL(statement).execute_if(dialect=dialect))
+    event.listen(table, 'before_drop', DDL(f"DROP TABLE IF EXISTS {spec['table']}_fts").execute_if(dialect='sqlite'))
+
+for _spec in SEARCH_SPECS.values():
+    _register_ddl(_spec)
+
+def _terms(q):
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMS]
+
+def _text_filter(spec, terms):
+    model = spec['model']
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # "term"* is an FTS5 prefix query; space means AND
+        fts = f"{spec['table']}_fts"
+        match = ' '.join(f'"{t}"*' for t in terms)
+        rowids = text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :match').bindparams(match=match)
+        return model.id.in_(rowids.columns(rowid=db.Integer))
+    if dialect == 'postgresql':
+        query = ' & '.join(f'{t}:*' for t in terms)
+        return literal_column(f"{spec['table']}.search_vector").op('@@')(func.to_tsquery('simple', query))
+    columns = [getattr(model, c) for c in spec['columns']]
+    return and_(*(or_(*(c.ilike(f'%{t}%') for c in columns)) for t in terms))
+
+def search(entity, q=None, filters=None, before=None, after=None, per_page=DEFAULT_PER_PAGE):
+    # filters: {'skill': name, <facet>: value}. Returns the keyset page plus
+    # 'total' and 'facets': {facet: [(value, count), ...]}, most common first.
+    spec = SEARCH_SPECS[entity]
+    model = spec['model']
+    postings, key = spec['postings']
+    filters = filters or {}
+
+    conditions = []
+    terms = _terms(q)
+    if terms:
+        conditions.append(_text_filter(spec, terms))
+    for facet, column in spec['facets'].items():
+        if filters.get(facet):
+            conditions.append(column == filters[facet])
+    if filters.get('skill'):
+        name = normalize_skill(filters['skill'])
+        name = canonical_names([name])[name]
+        skill_ids = db.session.query(Skill.id).filter(Skill.name == name)
+        conditions.append(model.id.in_(
+            db.session.query(postings.c[key]).filter(postings.c.skill_id.in_(skill_ids))))
+
+    query = model.query.filter(*conditions)
+    page = keyset_page(query, model.id, before=before, after=after, per_page=per_page)
+
+    # Facet counts over the whole match set, one grouped query each
+    matching_ids = db.session.query(model.id).filter(*conditions)
+    facets = {}
+    for facet, column in spec['facets'].items():
+        counts = db.session.query(column, func.count()).filter(*conditions, column.isnot(None)) \
+            .group_by(column).order_by(func.count().desc(), column).limit(FACET_LIMIT).all()
+        facets[facet] = [(value, count) for value, count in counts]
+    # Skills are counted on the posting list by id (covered by its primary
+    # key) and only the top ones are named
+    skill_counts = db.session.query(postings.c.skill_id, func.count())
+    if conditions:
+        skill_counts = skill_counts.filter(postings.c[key].in_(matching_ids))
+    skill_counts = skill_counts.group_by(postings.c.skill_id) \
+        .order_by(func.count().desc(), postings.c.skill_id).limit(FACET_LIMIT).all()
+    names = skill_names(skill_id for skill_id, _ in skill_counts)
+    facets['skill'] = [(names[skill_id], count) for skill_id, count in skill_counts]
+
+    page['total'] = db.session.query(func.count(model.id)).filter(*conditions).scalar()
+    page['facets'] = facets
+    return page
@@ -0,0 +1,157 @@
+import numpy as np
+from sqlalchemy import delete, insert, update
+from app import db
+from app.models import Employee, Project, Skill, SkillAlias, employee_skills, project_skills
+
+# Skills are resolved once at write time: the comma-separated text is
+# normalized, mapped through the alias table to canonical names, and stored
+# twice - as posting lists (skill -> rows, for candidate lookup) and as a
+# packed uint32 array of sorted skill ids on the row itself (row -> skills,
+# read straight into NumPy by the matchers without any parsing).
+
+SKILL_TABLES = {
+    Employee: (employee_skills, 'employee_id'),
+    Project: (project_skills, 'project_id'),
+}
+
+_PACKED_DTYPE = np.dtype('<u4')
+
+def normalize_skill(name):
+    # Lowercase, trim and collapse inner whitespace: " Machine  Learning" -> "machine learning"
+    return ' '.join(name.lower().split())[:64]
+
+def parse_skills(text):
+    # Comma-separated text -> unique normalized names, input order preserved
+    if not text:
+        return []
+    names = []
+    for raw in text.split(','):
+        name = normalize_skill(raw)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def canonical_names(names):
+    # {name: canonical name} for `names`, with one IN query on the alias table
+    if not names:
+        return {}
+    aliases = dict(db.session.query(SkillAlias.alias, SkillAlias.canonical).filter(SkillAlias.alias.in_(list(names))))
+    return {name: aliases.get(name, name) for name in names}
+
+def resolve_skills(text, canonical=None):
+    # Parsed names mapped to canonical ones, deduplicated again afterwards
+    # ("Python, python3" -> ["python"])
+    names = parse_skills(text)
+    if canonical is None:
+        canonical = canonical_names(names)
+    return list(dict.fromkeys(canonical[n] for n in names))
+
+def get_or_create_skills(names):
+    # One IN query for the known skills, inserts only for the new ones
+    if not names:
+        return {}
+    skills = {s.name: s for s in Skill.query.filter(Skill.name.in_(names)).all()}
+    for name in names:
+        if name not in skills:
+            skill = Skill(name=name)
+            db.session.add(skill)
+            skills[name] = skill
+    return skills
+
+def pack_skill_ids(ids):
+    return np.unique(np.asarray(list(ids), dtype=_PACKED_DTYPE)).tobytes()
+
+def unpack_skill_ids(packed):
+    # Read-only view over the stored bytes, no copy
+    return np.frombuffer(packed or b'', dtype=_PACKED_DTYPE)
+
+def skill_names(ids):
+    # {skill_id: name}, ordered by id
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    return dict(db.session.query(Skill.id, Skill.name).filter(Skill.id.in_(ids)).order_by(Skill.id))
+
+def _index_row(row, text):
+    names = resolve_skills(text)
+    skills = get_or_create_skills(names)
+    row.indexed_skills = [skills[n] for n in names]
+    # New skills need their ids before packing
+    db.session.flush()
+    row.skill_ids = pack_skill_ids(skills[n].id for n in names)
+
+def index_employee_skills(employee):
+    # Call on every write of Employee.skills; caller commits
+    _index_row(employee, employee.skills)
+
+def index_project_skills(project):
+    _index_row(project, project.required_skills)
+
+def index_skills_bulk(model, texts):
+    # Batch form of index_*_skills for bulk writers: `texts` maps row id to its
+    # skills text; replaces those rows' postings with one delete and one
+    # executemany insert and writes their packed ids in one executemany update.
+    # `model` is Employee or Project.
+    if not texts:
+        return
+    table, key = SKILL_TABLES[model]
+    canonical = canonical_names({n for text in texts.values() for n in parse_skills(text)})
+    parsed = {row_id: resolve_skills(text, canonical) for row_id, text in texts.items()}
+    names = list(dict.fromkeys(n for row_names in parsed.values() for n in row_names))
+    skills = get_or_create_skills(names)
+    db.session.flush()
+
+    db.session.execute(delete(table).where(table.c[key].in_(list(parsed))))
+    postings = [{'skill_id': skills[n].id, key: row_id} for row_id, row_names in parsed.items() for n in row_names]
+    if postings:
+        db.session.execute(insert(table), postings)
+    db.session.execute(update(model), [
+        {'id': row_id, 'skill_ids': pack_skill_ids(skills[n].id for n in row_names)}
+        for row_id, row_names in parsed.items()
+    ])
+
+def repack_skill_ids(model, row_ids):
+    # Rebuild the packed column of `row_ids` from their postings
+    if not row_ids:
+        return
+    table, key = SKILL_TABLES[model]
+    grouped = {row_id: [] for row_id in row_ids}
+    for row_id, skill_id in db.session.query(table.c[key], table.c.skill_id).filter(table.c[key].in_(list(row_ids))):
+        grouped[row_id].append(skill_id)
+    db.session.execute(update(model), [
+        {'id': row_id, 'skill_ids': pack_skill_ids(ids)} for row_id, ids in grouped.items()
+    ])
+
+def add_skill_alias(alias, canonical):
+    # Map `alias` to `canonical` for future writes and fold the alias into
+    # the canonical skill wherever it is already in use. Caller commits.
+    alias, canonical = normalize_skill(alias), normalize_skill(canonical)
+    canonical = canonical_names([canonical])[canonical]
+    if not alias or not canonical or alias == canonical:
+        raise ValueError('alias and canonical name must be different, non-empty skills')
+
+    existing = db.session.get(SkillAlias, alias)
+    if existing:
+        existing.canonical = canonical
+    else:
+        db.session.add(SkillAlias(alias=alias, canonical=canonical))
+    # Aliases of the alias now point at the new canonical name
+    db.session.query(SkillAlias).filter(SkillAlias.canonical == alias) \
+        .update({'canonical': canonical}, synchronize_session='fetch')
+
+    old = Skill.query.filter_by(name=alias).first()
+    if old is None:
+        return
+    new = get_or_create_skills([canonical])[canonical]
+    db.session.flush()
+    for model, (table, key) in SKILL_TABLES.items():
+        row_ids = [r for (r,) in db.session.query(table.c[key]).filter(table.c.skill_id == old.id)]
+        if not row_ids:
+            continue
+        has_new = {r for (r,) in db.session.query(table.c[key]).filter(table.c.skill_id == new.id, table.c[key].in_(row_ids))}
+        moved = [{'skill_id': new.id, key: r} for r in row_ids if r not in has_new]
+        db.session.execute(delete(table).where(table.c.skill_id == old.id))
+        if moved:
+            db.session.execute(insert(table), moved)
+        repack_skill_ids(model, row_ids)
+    db.session.delete(old)
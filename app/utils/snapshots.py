@@ -0,0 +1,209 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from app import db
+from app.models import Allocation, AppState, Employee, EmployeeSnapshot, ProjectSnapshot, UtilizationSnapshot
+from app.utils.capacity import WEEKLY_CAPACITY
+
+# Daily history. Live tables only say how things stand today, so once a day
+# `flask snapshot` writes one small row per employee (hours booked, status,
+# bench streak), one per staffed project and one per designation (the
+# rollup org-wide trends read) into fact tables keyed by (day, id); trend
+# reports then read a date range of those instead of replaying every
+# allocation for every day.
+#
+# Days are rebuilt from the allocations table in chunks, each chunk one
+# difference-array pass over the allocations overlapping it and one
+# transaction that replaces whatever rows those days already had, so
+# re-running a day is harmless and an interrupted backfill resumes from the
+# last chunk it committed.
+
+SNAPSHOT_STATE_KEY = 'snapshot_through'
+CHUNK_DAYS = 31
+STATUS_NAMES = np.array(['Bench', 'Partially Utilized', 'Fully Utilized'], dtype=object)
+
+def snapshot_through():
+    # Last day with snapshots, or None before the first run
+    state = db.session.get(AppState, SNAPSHOT_STATE_KEY)
+    return date.fromisoformat(state.value) if state and state.value else None
+
+def daily_hours(rows, starts, stops, hours, n_rows, days):
+    # n_rows x days array of hours booked; starts/stops are day offsets
+    # clipped to [0, days], stop exclusive
+    width = days + 1
+    base = rows * width
+    diff = np.bincount(base + starts, hours, n_rows * width) - np.bincount(base + stops, hours, n_rows * width)
+    return np.cumsum(diff.reshape(n_rows, width), axis=1)[:, :days]
+
+def _status_codes(load):
+    # status_for_hours() over an array: 0 Bench, 1 Partially, 2 Fully Utilized
+    return (load * 100 >= 40 * WEEKLY_CAPACITY).astype(np.int8) + (load * 100 >= 80 * WEEKLY_CAPACITY)
+
+def _last_end_offsets(employee_ids, origin):
+    # Latest allocation end date per employee as a day offset from `origin`,
+    # over all their allocations like Employee.last_allocation_end_date, and
+    # whether they have one at all
+    offsets = np.zeros(len(employee_ids), dtype=np.int64)
+    ended = np.zeros(len(employee_ids), dtype=bool)
+    rows = db.session.execute(
+        select(Allocation.employee_id, func.max(Allocation.end_date))
+        .where(Allocation.end_date.is_not(None)).group_by(Allocation.employee_id)
+    ).all()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    ends = np.array([row[1].toordinal() - origin for row in rows], dtype=np.int64)
+    known = np.isin(ids, employee_ids)
+    positions = np.searchsorted(employee_ids, ids[known])
+    offsets[positions], ended[positions] = ends[known], True
+    return offsets, ended
+
+def write_snapshots(first_day, last_day):
+    # Replaces the snapshots of [first_day, last_day] (one chunk) and commits;
+    # returns the number of employee rows written
+    days = (last_day - first_day).days + 1
+    origin = first_day.toordinal()
+    employees = db.session.execute(
+        select(Employee.id, Employee.designation, Employee.created_at).order_by(Employee.id)
+    ).all()
+    employee_ids = np.array([e.id for e in employees], dtype=np.int64)
+    # An employee is only on the days from their creation on; rows without
+    # created_at predate it and are on every day
+    created = np.array([e.created_at.date().toordinal() - origin if e.created_at else 0 for e in employees],
+                       dtype=np.int64)
+    day_offsets = np.arange(days)
+    present = day_offsets >= created[:, None]
+    designations, groups = np.unique(np.array([e.designation or '' for e in employees], dtype=object).astype(str),
+                                     return_inverse=True)
+    allocations = db.session.execute(
+        select(Allocation.employee_id, Allocation.project_id, Allocation.start_date,
+               Allocation.end_date, Allocation.allocated_hours)
+        .where(db.or_(Allocation.end_date.is_(None), Allocation.end_date >= first_day),
+               db.or_(Allocation.start_date.is_(None), Allocation.start_date <= last_day))
+    ).all()
+
+    count = len(allocations)
+    emp = np.fromiter((a[0] for a in allocations), dtype=np.int64, count=count)
+    proj = np.fromiter((a[1] for a in allocations), dtype=np.int64, count=count)
+    starts = np.fromiter((a[2].toordinal() - origin if a[2] else 0 for a in allocations), dtype=np.int64, count=count)
+    stops = np.fromiter((a[3].toordinal() - origin + 1 if a[3] else days for a in allocations),
+                        dtype=np.int64, count=count)
+    hours = np.fromiter((a[4] or 0 for a in allocations), dtype=np.int64, count=count)
+    starts, stops = np.clip(starts, 0, days), np.clip(stops, 0, days)
+
+    known = np.isin(emp, employee_ids)
+    employee_load = daily_hours(np.searchsorted(employee_ids, emp[known]), starts[known], stops[known],
+                                hours[known], len(employee_ids), days)
+    project_ids, project_rows = np.unique(proj, return_inverse=True)
+    project_load = daily_hours(project_rows, starts, stops, hours, len(project_ids), days)
+    project_count = daily_hours(project_rows, starts, stops, np.ones(count), len(project_ids), days)
+    # bincount sums in floats; the sums of whole hours are exact
+    employee_load, project_load, project_count = (np.rint(a).astype(np.int64)
+                                                  for a in (employee_load, project_load, project_count))
+
+    codes = _status_codes(employee_load)
+    # Employee.bench_days_since for each day: days since the last allocation
+    # ended while on Bench, 0 if it has not ended or there never was one
+    last_end, ended = _last_end_offsets(employee_ids, origin)
+    since = day_offsets - last_end[:, None]
+    streaks = np.where((codes == 0) & ended[:, None], np.maximum(since, 0), 0)
+
+    # designations x days sums of the employee rows that exist on each day
+    rollup = {}
+    for name, values in (('employees', present), ('hours', employee_load * present),
+                         ('bench', (codes == 0) & present), ('fully_utilized', (codes == 2) & present)):
+        rollup[name] = np.zeros((len(designations), days), dtype=np.int64)
+        np.add.at(rollup[name], groups, values)
+
+    day_list = [first_day + timedelta(days=d) for d in range(days)]
+    for model in (EmployeeSnapshot, ProjectSnapshot, UtilizationSnapshot):
+        db.session.execute(delete(model).where(model.day.between(first_day, last_day)))
+    employee_rows = []
+    for d, day in enumerate(day_list):
+        rows = np.flatnonzero(present[:, d])
+        employee_rows.extend(
+            {'day': day, 'employee_id': employee_id, 'hours': h, 'status': status, 'bench_days': b}
+            for employee_id, h, status, b in zip(employee_ids[rows].tolist(), employee_load[rows, d].tolist(),
+                                                 STATUS_NAMES[codes[rows, d]], streaks[rows, d].tolist())
+        )
+    staffed = project_count > 0
+    project_rows_out = [
+        {'day': day_list[d], 'project_id': int(project_ids[p]), 'hours': int(project_load[p, d]),
+         'allocations': int(project_count[p, d])}
+        for d, p in zip(*np.nonzero(staffed.T))
+    ]
+    rollup_rows = [
+        {'day': day, 'designation': name, 'employees': int(rollup['employees'][g, d]),
+         'hours': int(rollup['hours'][g, d]),
+         'bench': int(rollup['bench'][g, d]), 'fully_utilized': int(rollup['fully_utilized'][g, d])}
+        for d, day in enumerate(day_list) for g, name in enumerate(designations)
+    ]
+    for model, rows in ((EmployeeSnapshot, employee_rows), (ProjectSnapshot, project_rows_out),
+                        (UtilizationSnapshot, rollup_rows)):
+        if rows:
+            db.session.execute(insert(model.__table__), rows)
+
+    state = db.session.get(AppState, SNAPSHOT_STATE_KEY)
+    if state is None:
+        state = AppState(key=SNAPSHOT_STATE_KEY)
+        db.session.add(state)
+    if not state.value or date.fromisoformat(state.value) < last_day:
+        state.value = last_day.isoformat()
+    db.session.commit()
+    return len(employee_rows)
+
+def take_snapshots(start=None, end=None, log=None):
+    # Writes every day in [start, end]. By default that is each day after the
+    # last snapshot up to today, and today itself again (just today on the
+    # first run); an explicit start rewrites from there. Returns the number
+    # of days written.
+    end = end or datetime.today().date()
+    if start is None:
+        through = snapshot_through()
+        start = min(through + timedelta(days=1), end) if through else end
+    written = 0
+    while start <= end:
+        last = min(end, start + timedelta(days=CHUNK_DAYS - 1))
+        rows = write_snapshots(start, last)
+        if log:
+            log(f'{start} .. {last}: {rows} employee row(s)')
+        written += (last - start).days + 1
+        start = last + timedelta(days=1)
+    return written
+
+def _series(query, columns):
+    # Columnar {'days': [...], column: [...]} from rows of (day, *columns)
+    rows = db.session.execute(query).all()
+    data = {'days': [row[0].isoformat() for row in rows]}
+    for i, name in enumerate(columns, start=1):
+        data[name] = [row[i] for row in rows]
+    return data
+
+def utilization_history(start, end, designation=None):
+    # Org-wide (or one designation's) booked hours, utilization and status
+    # counts per day: a day-key range over the designation rollup
+    query = select(UtilizationSnapshot.day,
+                   func.sum(UtilizationSnapshot.employees),
+                   func.sum(UtilizationSnapshot.hours),
+                   func.sum(UtilizationSnapshot.bench),
+                   func.sum(UtilizationSnapshot.fully_utilized)) \
+        .where(UtilizationSnapshot.day.between(start, end))
+    if designation is not None:
+        query = query.where(UtilizationSnapshot.designation == designation)
+    data = _series(query.group_by(UtilizationSnapshot.day).order_by(UtilizationSnapshot.day),
+                   ('employees', 'booked_hours', 'bench', 'fully_utilized'))
+    data['utilization'] = [round(hours / (max(employees, 1) * WEEKLY_CAPACITY) * 100, 1)
+                           for employees, hours in zip(data['employees'], data['booked_hours'])]
+    return data
+
+def employee_history(employee_id, start, end):
+    return _series(select(EmployeeSnapshot.day, EmployeeSnapshot.hours, EmployeeSnapshot.status,
+                          EmployeeSnapshot.bench_days)
+                   .where(EmployeeSnapshot.employee_id == employee_id, EmployeeSnapshot.day.between(start, end))
+                   .order_by(EmployeeSnapshot.day),
+                   ('hours', 'status', 'bench_days'))
+
+def project_history(project_id, start, end):
+    # Days with nothing booked have no row
+    return _series(select(ProjectSnapshot.day, ProjectSnapshot.hours, ProjectSnapshot.allocations)
+                   .where(ProjectSnapshot.project_id == project_id, ProjectSnapshot.day.between(start, end))
+                   .order_by(ProjectSnapshot.day),
+                   ('hours', 'allocations'))
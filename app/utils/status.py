@@ -0,0 +1,163 @@
+from datetime import datetime, date
+from sqlalchemy import bindparam, case, update
+from app import db
+from app.models import Allocation, Employee, AppState
+from app.utils.cache import invalidate_stats
+from app.utils.capacity import WEEKLY_CAPACITY
+
+SWEEP_STATE_KEY = 'status_sweep_date'
+
+def status_for_hours(hours):
+    utilization = (hours / WEEKLY_CAPACITY) * 100
+
+    if utilization >= 80:
+        return 'Fully Utilized'
+    elif utilization >= 40:
+        return 'Partially Utilized'
+    return 'Bench'
+
+def _status_case(hours):
+    # status_for_hours() as a SQL expression
+    return case(
+        (hours * 100 >= 80 * WEEKLY_CAPACITY, 'Fully Utilized'),
+        (hours * 100 >= 40 * WEEKLY_CAPACITY, 'Partially Utilized'),
+        else_='Bench'
+    )
+
+def allocation_snapshot(alloc):
+    # The fields that decide an allocation's contribution to current_hours
+    return (int(alloc.employee_id), alloc.start_date, alloc.end_date, alloc.allocated_hours or 0)
+
+def contribution(snapshot, day):
+    # Hours the allocation adds to its employee's load on `day`
+    if snapshot is None:
+        return 0
+    _, start, end, hours = snapshot
+    if (start is None or start <= day) and (end is None or end >= day):
+        return hours
+    return 0
+
+def counter_date():
+    # Day Employee.current_hours describes: the last sweep's, since only the
+    # sweep moves the counter across allocation start/end boundaries. Today
+    # before the first sweep.
+    return _state_date(db.session.get(AppState, SWEEP_STATE_KEY)) or datetime.today().date()
+
+def _state_date(state):
+    return date.fromisoformat(state.value) if state and state.value else None
+
+def _locked_sweep_state():
+    # The sweep date row re-read and locked until commit, so a catch-up and
+    # the scheduled sweep (or two catch-ups) cannot both move the counters
+    # across the same days
+    return db.session.query(AppState).filter_by(key=SWEEP_STATE_KEY) \
+        .with_for_update().populate_existing().one_or_none()
+
+def apply_allocation_change(before=None, after=None, today=None):
+    # Call in the same transaction as an allocation add (before=None), edit or
+    # delete (after=None) with allocation_snapshot() values. Adjusts the
+    # counter in place instead of re-reading the employee's allocations.
+    apply_allocation_changes([(before, after)], today)
+
+def apply_allocation_changes(changes, today=None):
+    # Batch form of apply_allocation_change: one UPDATE, executed once per
+    # employee touched (see adjust_current_hours_many).
+    # Contributions are taken as of the last sweep's day, not the calendar
+    # day, so no boundary is counted by both the write and a sweep. When that
+    # day is behind (the scheduled sweep has not run yet, or is not deployed
+    # at all) the sweep is caught up right here, over the allocations as just
+    # written; only the first write of a day takes the lock for that.
+    state = None
+    if today is None:
+        calendar_day = datetime.today().date()
+        today = counter_date()
+        if today < calendar_day:
+            state = _locked_sweep_state()
+            today = _state_date(state) or calendar_day
+    deltas = {}
+    for before, after in changes:
+        if before is not None:
+            deltas[before[0]] = deltas.get(before[0], 0) - contribution(before, today)
+        if after is not None:
+            deltas[after[0]] = deltas.get(after[0], 0) + contribution(after, today)
+    adjust_current_hours_many(deltas)
+    if state is not None and today < calendar_day:
+        _sweep(state, calendar_day)
+    invalidate_stats()
+
+def adjust_current_hours(employee_id, delta):
+    adjust_current_hours_many({employee_id: delta})
+
+def adjust_current_hours_many(deltas):
+    # {employee_id: delta} as one UPDATE statement sent as an executemany.
+    # Each row is incremented in place so concurrent writers never lose an
+    # increment, and status is re-derived even for a zero delta so it can
+    # never disagree with the counter.
+    if not deltas:
+        return
+    table = Employee.__table__
+    new_hours = table.c.current_hours + bindparam('delta')
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('employee_id'))
+        .values(current_hours=new_hours, availability_status=_status_case(new_hours)),
+        [{'employee_id': employee_id, 'delta': delta} for employee_id, delta in deltas.items()]
+    )
+    # Core statement: loaded employees read the new values on next access
+    for (cls, ident, _), obj in list(db.session.identity_map.items()):
+        if cls is Employee and ident[0] in deltas:
+            db.session.expire(obj, ['current_hours', 'availability_status'])
+
+def recompute_current_hours(employee_ids=None, today=None):
+    # Full rebuild from the allocations table, for all or some employees
+    today = today or counter_date()
+    active = db.session.query(db.func.coalesce(db.func.sum(Allocation.allocated_hours), 0)) \
+        .filter(Allocation.employee_id == Employee.id,
+                Allocation.start_date <= today,
+                Allocation.end_date >= today) \
+        .scalar_subquery()
+    stmt = update(Employee).values(current_hours=active, availability_status=_status_case(active))
+    if employee_ids is not None:
+        stmt = stmt.where(Employee.id.in_(list(employee_ids)))
+    db.session.execute(stmt.execution_options(synchronize_session=False))
+
+def sweep_allocation_boundaries(today=None, full=False):
+    # Scheduled job: only allocations that started or ended since the last
+    # sweep change anyone's load, so only their employees are adjusted.
+    # Returns the number of employees touched.
+    touched = _sweep(_locked_sweep_state(), today or datetime.today().date(), full)
+    db.session.commit()
+    return touched
+
+def _sweep(state, today, full=False):
+    # Moves the counters from the state's day to `today` and records it there,
+    # in the caller's transaction
+    last_run = _state_date(state)
+
+    if full or last_run is None:
+        recompute_current_hours(today=today)
+        touched = Employee.query.count()
+    elif last_run >= today:
+        touched = 0
+    else:
+        crossed = Allocation.query.with_entities(
+            Allocation.employee_id, Allocation.start_date, Allocation.end_date, Allocation.allocated_hours
+        ).filter(db.or_(
+            db.and_(Allocation.start_date > last_run, Allocation.start_date <= today),
+            db.and_(Allocation.end_date >= last_run, Allocation.end_date < today)
+        )).all()
+
+        deltas = {}
+        for snapshot in crossed:
+            delta = contribution(tuple(snapshot), today) - contribution(tuple(snapshot), last_run)
+            if delta:
+                deltas[snapshot[0]] = deltas.get(snapshot[0], 0) + delta
+        adjust_current_hours_many(deltas)
+        touched = len(deltas)
+
+    if touched:
+        invalidate_stats()
+    if state is None:
+        state = AppState(key=SWEEP_STATE_KEY)
+        db.session.add(state)
+    state.value = today.isoformat()
+    return touched
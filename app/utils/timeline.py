@@ -0,0 +1,95 @@
+import json
+from sqlalchemy import func, or_, select
+from app import db
+from app.models import Allocation, Employee, Project
+from app.utils.pagination import keyset_page
+
+# Gantt data for one viewport: a page of lanes (employees or projects, by
+# name) and the allocations of just those lanes that overlap the date
+# window. Lanes are keyset-paged on (name, id), so the next page seeks the
+# name index past the last lane shown. The overlap test
+#
+#   start_date <= window_end AND end_date >= window_start
+#
+# (a missing date counts as open-ended) seeks the (lane id, end_date)
+# index, so a request costs the same whether the lanes are the first or the
+# last of 2,000 and however much history lies outside the window. Bars come
+# back columnar, with dates as day offsets from the window start and lanes
+# as positions in the lane page; the other side's names once each in `refs`.
+
+DEFAULT_LANES = 50
+MAX_LANES = 200
+MAX_WINDOW_DAYS = 731
+
+GROUPS = {
+    # group: (lane model, lane detail column, bar foreign key, other side's model, its foreign key)
+    'employee': (Employee, Employee.designation, Allocation.employee_id, Project, Allocation.project_id),
+    'project': (Project, Project.client_name, Allocation.project_id, Employee, Allocation.employee_id),
+}
+
+def _offset(day, origin):
+    return (day - origin).days if day else None
+
+def parse_cursor(value):
+    # next_cursor as the client sends it back: a JSON [name, id] pair
+    cursor = json.loads(value)
+    if not (isinstance(cursor, list) and len(cursor) == 2 and isinstance(cursor[0], str)
+            and isinstance(cursor[1], int)):
+        raise ValueError('cursor must be a [name, id] pair')
+    return tuple(cursor)
+
+def timeline(start, end, group='employee', cursor=None, limit=DEFAULT_LANES, ids=None):
+    # The `limit` lanes after `cursor` (a lane's (name, id), from next_cursor)
+    # in name order, or exactly `ids` (in that order) when a client already
+    # knows which rows are on screen. The lane count is only worked out for
+    # the first page
+    model, detail, lane_key, other, other_key = GROUPS[group]
+    total = next_cursor = None
+    if ids is not None:
+        lanes = db.session.execute(select(model.id, model.name, detail).where(model.id.in_(ids))).all()
+        position = {lane_id: i for i, lane_id in enumerate(ids)}
+        lanes.sort(key=lambda lane: position[lane.id])
+    else:
+        page = keyset_page(db.session.query(model.id, model.name, detail), (model.name, model.id),
+                           before=cursor, per_page=limit, descending=False)
+        lanes, next_cursor = page['items'], page['next_cursor']
+        if cursor is None:
+            total = db.session.execute(select(func.count()).select_from(model)).scalar()
+
+    bars = []
+    if lanes:
+        bars = db.session.execute(
+            select(Allocation.id, lane_key, other_key, other.name, Allocation.start_date, Allocation.end_date,
+                   Allocation.allocated_hours)
+            .join(other, other.id == other_key)
+            .where(lane_key.in_([lane.id for lane in lanes]),
+                   or_(Allocation.end_date.is_(None), Allocation.end_date >= start),
+                   or_(Allocation.start_date.is_(None), Allocation.start_date <= end))
+            .order_by(lane_key, Allocation.start_date, Allocation.id)
+        ).all()
+
+    lane_index = {lane.id: i for i, lane in enumerate(lanes)}
+    return {
+        'group': group,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': (end - start).days + 1,
+        'total_lanes': total, # First page only
+        'next_cursor': next_cursor, # None on the last page and when fetching by ids
+        'lanes': {
+            'id': [lane.id for lane in lanes],
+            'label': [lane.name for lane in lanes],
+            'detail': [lane[2] for lane in lanes],
+        },
+        # start/end are day offsets from the window start and may fall
+        # outside it; None means open-ended
+        'bars': {
+            'id': [bar[0] for bar in bars],
+            'lane': [lane_index[bar[1]] for bar in bars],
+            'ref': [bar[2] for bar in bars],
+            'start': [_offset(bar[4], start) for bar in bars],
+            'end': [_offset(bar[5], start) for bar in bars],
+            'hours': [bar[6] for bar in bars],
+        },
+        'refs': {bar[2]: bar[3] for bar in bars},
+    }
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+from datetime import date
+from itertools import islice
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Employee, Project, Allocation
+from app.utils.bulk import upsert_employees, upsert_projects, upsert_allocations
+
+# Streaming CSV/NDJSON import and export for the HR sync. Everything here is
+# a generator pipeline: imports read one chunk of rows at a time and commit it
+# through the bulk writers, exports page through the table with yield_per and
+# yield serialized text chunk by chunk, so memory stays flat for any file size.
+
+FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Columns written on export, in order; the same names are accepted on import
+EXPORT_COLUMNS = {
+    'employees': (Employee, ('id', 'email', 'name', 'mobile', 'designation', 'skills', 'availability_status')),
+    'projects': (Project, ('id', 'name', 'client_name', 'required_skills', 'start_date', 'end_date', 'status')),
+    'allocations': (Allocation, ('id', 'employee_id', 'project_id', 'allocated_hours', 'start_date', 'end_date')),
+}
+
+WRITERS = {
+    'employees': upsert_employees,
+    'projects': upsert_projects,
+    'allocations': upsert_allocations,
+}
+
+def guess_format(filename, default='csv'):
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+def _text_stream(stream):
+    # Binary file/request body -> lazily decoded text lines
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    if not hasattr(stream, 'read1'):
+        stream = io.BufferedReader(stream)
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+def read_rows(stream, fmt):
+    # Yields one dict per record. Empty CSV cells are dropped so they leave
+    # the existing value alone, the same as a missing key in NDJSON. A record
+    # that cannot be parsed is yielded as None and reported by the writer.
+    text = _text_stream(stream)
+    if fmt == 'csv':
+        for row in csv.DictReader(text):
+            yield {k: v for k, v in row.items() if k and v not in (None, '')}
+    elif fmt == 'ndjson':
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+    else:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_rows(entity, rows, chunk_size=CHUNK_SIZE, **options):
+    # Writes `rows` in chunks of `chunk_size`, one transaction per chunk, so a
+    # bad row only skips itself and a failed chunk never rolls back earlier
+    # ones. Result indexes are absolute row numbers (0-based, header excluded).
+    writer = WRITERS[entity]
+    summary = {'rows': 0, 'created': 0, 'updated': 0, 'error': 0, 'errors': []}
+    offset = 0
+    for chunk in chunked(rows, chunk_size):
+        try:
+            results = writer(chunk, **options)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            message = f'chunk failed: {e.__class__.__name__}'
+            results = [{'index': i, 'status': 'error', 'id': None, 'errors': [message]} for i in range(len(chunk))]
+
+        for result in results:
+            summary[result['status']] += 1
+            if result['status'] == 'error' and len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append(dict(result, index=offset + result['index']))
+        offset += len(chunk)
+        summary['rows'] = offset
+    return summary
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def export_rows(entity, chunk_size=CHUNK_SIZE):
+    # Plain column tuples (no ORM objects), fetched chunk_size rows at a time;
+    # on PostgreSQL yield_per also switches to a server-side cursor
+    model, columns = EXPORT_COLUMNS[entity]
+    stmt = select(*(getattr(model, c) for c in columns)).order_by(model.id)
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield [dict(zip(columns, row)) for row in partition]
+
+def export_chunks(entity, fmt, chunk_size=CHUNK_SIZE):
+    # Serialized text, one piece per partition, for a streamed response or file
+    if fmt not in FORMATS:
+        raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+    _, columns = EXPORT_COLUMNS[entity]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+    if fmt == 'csv':
+        writer.writeheader()
+    for rows in export_rows(entity, chunk_size):
+        if fmt == 'csv':
+            writer.writerows({k: v.isoformat() if isinstance(v, date) else v for k, v in row.items()} for row in rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(row, default=_json_default) + '\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
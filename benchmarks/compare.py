@@ -0,0 +1,59 @@
+"""Diff two benchmarks/run.py result files by median time.
+
+    python benchmarks/compare.py base.json head.json --threshold 20
+
+Exits non-zero when any case shared by both files got slower by more than
+--threshold percent (and by at least --min-ms, to ignore timer noise).
+"""
+import argparse
+import json
+import sys
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def describe(meta):
+    commit = (meta.get('commit') or 'unknown')[:10] + ('+dirty' if meta.get('dirty') else '')
+    return f"{commit} {meta.get('scale')} seed={meta.get('seed')} {meta.get('dialect')}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Percent slowdown counted as a regression.')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='Ignore differences smaller than this.')
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    print(f"base: {describe(base['meta'])}")
+    print(f"head: {describe(head['meta'])}")
+    for key in ('scale', 'seed', 'dialect'):
+        if base['meta'].get(key) != head['meta'].get(key):
+            print(f"warning: {key} differs ({base['meta'].get(key)} vs {head['meta'].get(key)})")
+    print()
+
+    regressions = []
+    print(f"{'case':<60} {'base ms':>10} {'head ms':>10} {'change':>8}")
+    for name in sorted(set(base['results']) | set(head['results'])):
+        if name not in base['results'] or name not in head['results']:
+            side = 'head' if name in head['results'] else 'base'
+            print(f'{name:<60} {"only in " + side:>30}')
+            continue
+        before = base['results'][name]['median_ms']
+        after = head['results'][name]['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > args.threshold and after - before >= args.min_ms:
+            flag = '  <-- slower'
+            regressions.append(name)
+        elif change < -args.threshold and before - after >= args.min_ms:
+            flag = '  faster'
+        print(f'{name:<60} {before:10.1f} {after:10.1f} {change:+7.0f}%{flag}')
+
+    if regressions:
+        print(f'\n{len(regressions)} case(s) slower by more than {args.threshold:g}%')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Seeded synthetic dataset for the benchmarks.
+
+Employees get a designation and skills drawn from that role's core stack
+plus a Zipf-distributed tail (a few skills are everywhere, most are rare),
+with the odd alternate spelling so normalization is exercised. Projects
+draw required skills the same way. Every employee gets an allocation
+history from two years back to six months ahead: mostly back-to-back
+bookings with gaps, some part-time ones running in parallel, never more
+than 40h/week at once. The same scale and seed always give the same rows.
+
+    python benchmarks/datagen.py --scale 10k --database-url sqlite:///benchmarks/data/bench-10k.db
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation, AppState
+from app.utils.capacity import WEEKLY_CAPACITY
+from app.utils.skills import add_skill_alias, index_skills_bulk
+from app.utils.status import SWEEP_STATE_KEY, recompute_current_hours
+from config import Config
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+DATASET_KEY = 'bench_dataset'
+ADMIN_USERNAME = 'bench-admin'
+ADMIN_PASSWORD = 'bench-password'
+CHUNK = 10_000
+
+ROLES = {
+    'Backend Developer': ['python', 'django', 'sql', 'postgresql', 'rest', 'docker'],
+    'Frontend Developer': ['javascript', 'react', 'typescript', 'css', 'html'],
+    'Data Engineer': ['python', 'sql', 'spark', 'airflow', 'kafka'],
+    'Data Scientist': ['python', 'machine learning', 'pandas', 'statistics', 'sql'],
+    'DevOps Engineer': ['kubernetes', 'docker', 'terraform', 'aws', 'linux'],
+    'Java Developer': ['java', 'spring', 'sql', 'microservices', 'kafka'],
+    'QA Engineer': ['selenium', 'python', 'testing', 'jira'],
+    'Mobile Developer': ['kotlin', 'swift', 'android', 'ios'],
+    'Project Manager': ['agile', 'scrum', 'jira', 'stakeholder management'],
+}
+# Long tail shared by everyone, drawn with Zipf-like weights
+TAIL = sorted({s for stack in ROLES.values() for s in stack}) + [f'tool-{i}' for i in range(300)]
+TAIL_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAIL))]
+SPELLINGS = {'python': 'Python3', 'javascript': 'JS', 'kubernetes': 'k8s', 'postgresql': 'Postgres'}
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Anita', 'John', 'Maria', 'Wei', 'Omar', 'Lena', 'Sara',
+               'Vikram', 'Neha', 'Carlos', 'Aisha', 'Tom', 'Yuki', 'Ivan', 'Fatima', 'Raj', 'Emma']
+LAST_NAMES = ['Sharma', 'Verma', 'Rao', 'Smith', 'Garcia', 'Chen', 'Khan', 'Muller', 'Silva', 'Patel',
+              'Kumar', 'Brown', 'Ito', 'Petrov', 'Ali', 'Jones', 'Singh', 'Lopez', 'Nair', 'Wilson']
+CLIENTS = [f'Client {i}' for i in range(200)]
+
+def _skills_text(rng, stack, core, tail):
+    names = rng.sample(stack, min(core, len(stack)))
+    names += rng.choices(TAIL, weights=TAIL_WEIGHTS, k=tail)
+    return ', '.join(SPELLINGS[n] if n in SPELLINGS and rng.random() < 0.1 else n.title() for n in names)
+
+def _allocations(rng, employee_id, project_ids, today):
+    # One employee's history: a cursor walks from two years back, booking
+    # 1-6 month stints with 0-60 day gaps; a part-time stint may get a
+    # parallel part-time booking that fits in the remaining hours
+    rows = []
+    day = today - timedelta(days=730 - rng.randint(0, 120))
+    horizon = today + timedelta(days=180)
+    while day < horizon:
+        length = timedelta(days=rng.randint(30, 180))
+        hours = rng.choice((40, 40, 40, 20, 30))
+        rows.append((employee_id, rng.choice(project_ids), hours, day, day + length))
+        if hours < WEEKLY_CAPACITY and rng.random() < 0.5:
+            offset = timedelta(days=rng.randint(0, length.days // 2))
+            rows.append((employee_id, rng.choice(project_ids), WEEKLY_CAPACITY - hours,
+                         day + offset, day + length))
+        day += length + timedelta(days=rng.randint(1, 60))
+    return rows
+
+def generate(employees, seed=42, today=None, log=print):
+    # Fills the (empty) database of the current app context
+    today = today or date.today()
+    rng = random.Random(seed)
+    roles = list(ROLES)
+
+    admin = User(username=ADMIN_USERNAME, email='bench-admin@example.com', role='Admin', is_verified=True)
+    admin.set_password(ADMIN_PASSWORD)
+    db.session.add(admin)
+    # create_all() leaves the alias table empty; the migration would seed these
+    for canonical, spelling in SPELLINGS.items():
+        add_skill_alias(spelling, canonical)
+
+    projects = max(10, employees // 20)
+    for start in range(0, projects, CHUNK):
+        rows = []
+        for i in range(start, min(start + CHUNK, projects)):
+            begin = today + timedelta(days=rng.randint(-600, 120))
+            rows.append({
+                'name': f'Project {i}', 'client_name': rng.choice(CLIENTS),
+                'required_skills': _skills_text(rng, ROLES[rng.choice(roles)], rng.randint(1, 3), rng.randint(0, 2)),
+                'start_date': begin, 'end_date': begin + timedelta(days=rng.randint(60, 720)),
+                'status': 'Active' if rng.random() < 0.7 else 'Completed',
+            })
+        db.session.execute(insert(Project), rows)
+    project_ids = [p for (p,) in db.session.query(Project.id).order_by(Project.id)]
+    texts = dict(db.session.query(Project.id, Project.required_skills))
+    for start in range(0, len(project_ids), CHUNK):
+        index_skills_bulk(Project, {p: texts[p] for p in project_ids[start:start + CHUNK]})
+    db.session.commit()
+    log(f'{projects} projects')
+
+    for start in range(0, employees, CHUNK):
+        rows = []
+        for i in range(start, min(start + CHUNK, employees)):
+            role = rng.choice(roles)
+            rows.append({
+                'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'email': f'employee{i}@example.com',
+                'mobile': f'9{rng.randint(100000000, 999999999)}',
+                'designation': role,
+                'skills': _skills_text(rng, ROLES[role], rng.randint(2, 4), rng.randint(1, 4)),
+            })
+        db.session.execute(insert(Employee), rows)
+        ids = dict(db.session.query(Employee.email, Employee.id).filter(Employee.email.in_([r['email'] for r in rows])))
+        index_skills_bulk(Employee, {ids[r['email']]: r['skills'] for r in rows})
+
+        allocations = []
+        for r in rows:
+            allocations.extend(_allocations(rng, ids[r['email']], project_ids, today))
+        db.session.execute(insert(Allocation), [
+            {'employee_id': e, 'project_id': p, 'allocated_hours': h, 'start_date': s, 'end_date': end}
+            for e, p, h, s, end in allocations
+        ])
+        db.session.commit()
+        log(f'{start + len(rows)} employees')
+
+    # Counters and statuses as of today, as the status sweep would leave them
+    recompute_current_hours(today=today)
+    db.session.merge(AppState(key=SWEEP_STATE_KEY, value=today.isoformat()))
+    db.session.commit()
+
+def ensure_dataset(scale, seed=42, log=print):
+    # Generates into the current database unless it already holds this
+    # scale/seed; returns False when it was reused
+    db.create_all()
+    marker = f'{scale}:{seed}'
+    state = db.session.get(AppState, DATASET_KEY)
+    if state is not None:
+        if not state.value.startswith(marker + ':'):
+            raise SystemExit(f'database holds dataset {state.value}, not {marker}; use another --database-url')
+        return False
+    if db.session.query(Employee.id).first() is not None:
+        raise SystemExit('database is not empty; use a fresh --database-url')
+    today = date.today()
+    generate(SCALES[scale], seed=seed, today=today, log=log)
+    db.session.add(AppState(key=DATASET_KEY, value=f'{marker}:{today.isoformat()}'))
+    db.session.commit()
+    return True
+
+def dataset_date():
+    # The day the dataset was generated; allocation histories are relative to it
+    state = db.session.get(AppState, DATASET_KEY)
+    return date.fromisoformat(state.value.rsplit(':', 1)[1])
+
+def bench_config(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+    return BenchConfig
+
+def default_database_url(scale, seed=42):
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    return f'sqlite:///{os.path.join(data_dir, f"bench-{scale}-{seed}.db")}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Defaults to a SQLite file under benchmarks/data/.')
+    args = parser.parse_args()
+
+    app = create_app(bench_config(args.database_url or default_database_url(args.scale, args.seed)))
+    with app.app_context():
+        created = ensure_dataset(args.scale, args.seed)
+        print('generated' if created else 'dataset already present')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Throughput of the app under gunicorn, default vs. tuned deployment profile.
+
+Starts gunicorn once per profile against the same benchmark dataset, logs in
+as the benchmark admin and keeps --concurrency clients requesting a mix of
+pages and API calls for --duration seconds, then reports requests/second and
+latency percentiles per profile.
+
+    python benchmarks/loadtest.py --scale 10k --concurrency 16 --duration 20
+    python benchmarks/loadtest.py --database-url postgresql://... --scale 100k
+
+Profiles:
+    baseline  gunicorn run:app (one sync worker, development config)
+    tuned     gunicorn -c gunicorn.conf.py run:app with APP_ENV=production
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import Employee, Project
+from datagen import ADMIN_PASSWORD, ADMIN_USERNAME, SCALES, bench_config, default_database_url, ensure_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = {
+    'baseline': (['gunicorn', 'run:app'], {'APP_ENV': 'development'}),
+    'tuned': (['gunicorn', '-c', 'gunicorn.conf.py', 'run:app'], {'APP_ENV': 'production'}),
+}
+# Weighted toward the pages people keep open
+PATHS = [
+    '/dashboard', '/dashboard',
+    '/employees/', '/employees/?q=python',
+    '/employees/{employee_id}', '/employees/{employee_id}',
+    '/projects/', '/projects/{project_id}',
+    '/bench/', '/allocations/',
+    '/api/v1/employees?per_page=50',
+    '/api/v1/search/employees?q=data',
+    '/api/v1/projects/{project_id}/matches',
+]
+
+def sample_ids():
+    employee_id = db.session.query(Employee.id).order_by(Employee.id).offset(100).limit(1).scalar()
+    project_id = db.session.query(Project.id).filter(Project.status == 'Active').order_by(Project.id).limit(1).scalar()
+    return {'employee_id': employee_id or 1, 'project_id': project_id or 1}
+
+def wait_until_up(base_url, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f'gunicorn exited with {proc.returncode}')
+        try:
+            urllib.request.urlopen(base_url + '/auth/login', timeout=2).read()
+            return
+        except OSError: # refused or still booting
+            time.sleep(0.2)
+    raise SystemExit('gunicorn did not start')
+
+def login(base_url):
+    body = json.dumps({'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}).encode()
+    req = urllib.request.Request(base_url + '/auth/login', data=body, headers={'Content-Type': 'application/json'})
+    token = json.load(urllib.request.urlopen(req))['token']
+    # Pages read the JWT cookie, the API also takes the header
+    return {'Cookie': f'access_token_cookie={token}', 'Authorization': f'Bearer {token}'}
+
+def hammer(base_url, headers, urls, concurrency, duration):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < stop:
+            url = urls[i % len(urls)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(base_url + url, headers=headers), timeout=60) as resp:
+                    resp.read()
+                ok = True
+            except OSError as exc: # HTTPError and URLError included
+                ok = False
+                error = f'{url}: {exc}'
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(error)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    began = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - began
+
+    ordered = sorted(latencies) or [0.0]
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'first_errors': errors[:5],
+        'rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(statistics.median(ordered) * 1000, 1),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0] * 1000, 1),
+        'p99_ms': round(ordered[int(len(ordered) * 0.99) - 1 if len(ordered) > 1 else 0] * 1000, 1),
+    }
+
+def run_profile(name, database_url, port, urls, concurrency, duration, warmup):
+    command, env = PROFILES[name]
+    env = dict(os.environ, DATABASE_URL=database_url, PORT=str(port), **env)
+    proc = subprocess.Popen(command + ['--bind', f'127.0.0.1:{port}'], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base_url, proc)
+        headers = login(base_url)
+        hammer(base_url, headers, urls, concurrency, warmup)
+        return hammer(base_url, headers, urls, concurrency, duration)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Defaults to a SQLite file under benchmarks/data/.')
+    parser.add_argument('--profiles', default='baseline,tuned')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds measured per profile.')
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--output', help='JSON results file.')
+    args = parser.parse_args()
+
+    database_url = args.database_url or default_database_url(args.scale, args.seed)
+    app = create_app(bench_config(database_url))
+    with app.app_context():
+        ensure_dataset(args.scale, args.seed)
+        ids = sample_ids()
+    urls = [path.format(**ids) for path in PATHS]
+
+    results = {}
+    for name in args.profiles.split(','):
+        print(f'{name}: {args.concurrency} clients for {args.duration:g}s ...', flush=True)
+        results[name] = run_profile(name, database_url, args.port, urls, args.concurrency, args.duration, args.warmup)
+
+    print(f"\n{'profile':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f} {r['errors']:7}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'scale': args.scale, 'concurrency': args.concurrency, 'duration': args.duration,
+                       'dialect': database_url.split(':', 1)[0], 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""Time every route and the matching/status functions on a generated dataset.
+
+Routes are requested through the Flask test client as the benchmark admin;
+each case runs once to warm up and then --repeat times. Results go to a JSON
+file keyed by case name, with the commit and dataset recorded alongside, so
+two runs can be diffed with benchmarks/compare.py.
+
+    python benchmarks/run.py --scale 10k --output benchmarks/results/$(git rev-parse --short HEAD)-10k.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import url_for
+from app import create_app, db
+from app.models import Allocation, AppState, Employee, Project
+from app.utils.assignment import propose_assignments
+from app.utils.forecast import build_forecast
+from app.utils.matching import find_matching_employees, find_available_employees, find_projects_for_employee
+from app.utils.matrix import staffing_matrix
+from app.utils.search import SEARCH_SPECS
+from app.utils.status import (SWEEP_STATE_KEY, allocation_snapshot, apply_allocation_change,
+                              recompute_current_hours, sweep_allocation_boundaries)
+from app.utils.instrumentation import record_queries
+from app.utils.transfer import EXPORT_COLUMNS
+
+from datagen import ADMIN_PASSWORD, ADMIN_USERNAME, SCALES, bench_config, dataset_date, default_database_url, ensure_dataset
+
+# GET routes that change state, and ones not worth timing (job status and
+# downloads need a job the benchmark never enqueues)
+SKIPPED_ENDPOINTS = {'static', 'dashboard.approve_user', 'api.get_job', 'api.download_job'}
+# Query strings worth timing on top of the bare routes
+EXTRA_URLS = [
+    '/employees/?q=python',
+    '/employees/?skill=kubernetes&status=Bench',
+    '/projects/?q=client',
+    '/projects/{project_id}?match=window',
+    '/api/v1/employees?per_page=100',
+    '/api/v1/search/employees?q=data+python',
+    '/api/v1/projects/{project_id}/matches?mode=window',
+]
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=root, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             cwd=root, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def measure(fn, repeat):
+    # The warm-up run also counts the statements the case executes
+    with record_queries() as recorder:
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    ordered = sorted(samples)
+    return {
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[max(0, -(-len(ordered) * 95 // 100) - 1)], 3),
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3),
+        'runs': repeat,
+        'queries': recorder.count,
+    }
+
+def sample_ids(seed):
+    # The same rows on every run of the same dataset
+    rng = random.Random(seed)
+    employees = [e for (e,) in db.session.query(Employee.id).order_by(Employee.id)]
+    projects = [p for (p,) in db.session.query(Project.id).filter(Project.status == 'Active').order_by(Project.id)]
+    allocations = db.session.query(Allocation.id).order_by(Allocation.id)
+    return {
+        'employee_id': rng.choice(employees),
+        'project_id': rng.choice(projects),
+        'allocation_id': rng.choice([a for (a,) in allocations.filter(Allocation.employee_id == employees[0])]),
+    }
+
+def route_urls(app, ids):
+    # One URL per GET rule, with path arguments filled from the sample rows
+    urls = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in rule.methods or rule.endpoint in SKIPPED_ENDPOINTS:
+            continue
+        if 'entity' in rule.arguments:
+            entities = SEARCH_SPECS if rule.endpoint == 'api.search_entities' else EXPORT_COLUMNS
+            urls.extend(rule.rule.replace('<entity>', entity) for entity in entities)
+            continue
+        values = {}
+        for arg in rule.arguments:
+            if arg == 'id':
+                arg_key = 'project_id' if rule.endpoint.startswith('project.') else 'employee_id'
+            else:
+                arg_key = arg
+            values[arg] = ids[arg_key]
+        with app.test_request_context():
+            urls.append(url_for(rule.endpoint, **values))
+    return urls + [url.format(**ids) for url in EXTRA_URLS]
+
+def time_routes(app, ids, repeat, results):
+    client = app.test_client()
+    resp = client.post('/auth/login', json={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+    headers = {'Authorization': f"Bearer {resp.get_json()['token']}"}
+
+    def get(url):
+        def call():
+            response = client.get(url, headers=headers)
+            # Streamed responses are only produced while being read
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return response.status_code, size
+        return call
+
+    for url in route_urls(app, ids):
+        status, size = get(url)()
+        results[f'GET {url}'] = dict(measure(get(url), repeat), status=status, bytes=size)
+        print(f"GET {url:<55} {results[f'GET {url}']['median_ms']:10.1f} ms  {status}  {results[f'GET {url}']['queries']:4} queries")
+
+    preview = {'project_ids': [ids['project_id']], 'slots': 2, 'commit': False}
+    call = lambda: client.post('/api/v1/assignments', json=preview, headers=headers)
+    results['POST /api/v1/assignments (preview)'] = dict(measure(call, repeat), status=call().status_code)
+
+def time_functions(ids, repeat, results):
+    today = dataset_date()
+    employee_id, project_id = ids['employee_id'], ids['project_id']
+    allocation = db.session.get(Allocation, ids['allocation_id'])
+    snapshot = allocation_snapshot(allocation)
+    moved = (snapshot[0], today, today + timedelta(days=30), snapshot[3])
+
+    def rolled_back(fn):
+        def call():
+            fn()
+            db.session.rollback()
+        return call
+
+    cases = {
+        'find_matching_employees': lambda: find_matching_employees(project_id),
+        'find_available_employees': lambda: find_available_employees(project_id, today=today),
+        'find_projects_for_employee': lambda: find_projects_for_employee(employee_id),
+        'staffing_matrix': lambda: staffing_matrix(),
+        'propose_assignments': lambda: propose_assignments(today=today),
+        'build_forecast (26 weeks)': lambda: build_forecast(26, today=today).to_dict(),
+        'apply_allocation_change': rolled_back(lambda: apply_allocation_change(snapshot, moved, today=today)),
+        'recompute_current_hours (one employee)': rolled_back(lambda: recompute_current_hours([employee_id], today=today)),
+        'recompute_current_hours (all)': rolled_back(lambda: recompute_current_hours(today=today)),
+    }
+    for name, fn in cases.items():
+        results[name] = measure(fn, repeat)
+        print(f'{name:<59} {results[name]["median_ms"]:10.1f} ms')
+
+    # The sweep commits, so each run sweeps one more day forward and the
+    # dataset is put back to its generation day afterwards
+    days = iter(range(1, repeat + 2))
+    results['sweep_allocation_boundaries (one day)'] = measure(
+        lambda: sweep_allocation_boundaries(today=today + timedelta(days=next(days))), repeat)
+    print(f"{'sweep_allocation_boundaries (one day)':<59} {results['sweep_allocation_boundaries (one day)']['median_ms']:10.1f} ms")
+    recompute_current_hours(today=today)
+    db.session.merge(AppState(key=SWEEP_STATE_KEY, value=today.isoformat()))
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Defaults to a SQLite file under benchmarks/data/.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='JSON results file (default: print only).')
+    parser.add_argument('--skip-routes', action='store_true')
+    parser.add_argument('--skip-functions', action='store_true')
+    args = parser.parse_args()
+
+    app = create_app(bench_config(args.database_url or default_database_url(args.scale, args.seed)))
+    with app.app_context():
+        ensure_dataset(args.scale, args.seed)
+        ids = sample_ids(args.seed)
+        commit, dirty = git_revision()
+        report = {
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'scale': args.scale,
+                'seed': args.seed,
+                'dialect': db.engine.dialect.name,
+                'rows': {
+                    'employees': db.session.query(Employee.id).count(),
+                    'projects': db.session.query(Project.id).count(),
+                    'allocations': db.session.query(Allocation.id).count(),
+                },
+                'samples': ids,
+                'repeat': args.repeat,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            },
+            'results': {},
+        }
+
+    # Outside any app context, so every request gets its own session as it
+    # would when served
+    if not args.skip_routes:
+        time_routes(app, ids, args.repeat, report['results'])
+    if not args.skip_functions:
+        with app.app_context():
+            time_functions(ids, args.repeat, report['results'])
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 import os
 from datetime import timedelta
+from sqlalchemy.pool import NullPool
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-prod'
@@ -13,3 +17,78 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_TOKEN_LOCATION = ['cookies']
     JWT_COOKIE_CSRF_PROTECT = False # Disable for development simplicity
+    API_MAX_BATCH = 5000 # Rows per bulk API request
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 30)) # Seconds
+    OFFLOAD_WORKERS = int(os.environ.get('OFFLOAD_WORKERS', 4)) # Threads per process for heavy reads, 0 = inline
+    OFFLOAD_TIMEOUT = int(os.environ.get('OFFLOAD_TIMEOUT', 30)) # Seconds before a heavy read answers 503
+    JOB_OUTPUT_RETENTION_DAYS = int(os.environ.get('JOB_OUTPUT_RETENTION_DAYS', 7)) # Job files (exports) kept this long
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1' # Per-request DB/template timings header
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') # Bearer token required by /metrics when set
+    METRICS_REQUIRE_TOKEN = False # Refuse /metrics outright while METRICS_TOKEN is unset
+    # Most SQL statements a route may run, whatever the data size. Exceeding
+    # one fails the request in tests and logs a warning otherwise.
+    QUERY_BUDGETS = {
+        'dashboard.index': 7,
+        'employee.list_employees': 10,
+        'employee.view_employee': 6,
+        'project.list_projects': 10,
+        'project.view_project': 10,
+        'allocation.list_allocations': 4,
+        'allocation.overbooked': 4,
+        'bench.list_bench': 4,
+        'bench.match_employee': 7,
+        'bench.staffing': 8,
+        'api.list_employees': 4,
+        'api.list_projects': 4,
+        'api.list_allocations': 4,
+        'api.project_matches': 8,
+        'api.get_staffing_matrix': 8,
+        'api.utilization_forecast': 4,
+        'api.get_bench_aging': 4,
+        'api.get_timeline': 4,
+        'allocation.timeline_view': 2,
+        'api.search_entities': 10,
+        'api.export_data': 4,
+    }
+
+def production_engine_options(database_url, pgbouncer=False):
+    # Pool sized for one gunicorn worker: each request thread and each offload
+    # thread holds at most one connection, plus a little overflow for
+    # streamed responses. Total connections = workers x (DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW); keep it under the server's max_connections.
+    if pgbouncer:
+        # PgBouncer in transaction mode already pools; a second pool here
+        # would pin server connections, and it rejects the startup options
+        # used below (set statement_timeout on the role instead)
+        return {'poolclass': NullPool}
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', _env_int('GUNICORN_THREADS', 4) + _env_int('OFFLOAD_WORKERS', 4)),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 2),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10), # Seconds to wait for a free connection
+        'pool_pre_ping': True, # Managed Postgres drops idle connections
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_use_lifo': True, # Reuse warm connections, let the rest idle out
+    }
+    if database_url.startswith('postgresql'):
+        statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+        options['connect_args'] = {
+            'application_name': 'workforceoptix',
+            'options': f'-c statement_timeout={statement_timeout} -c idle_in_transaction_session_timeout=60000',
+        }
+    return options
+
+class ProductionConfig(Config):
+    JWT_COOKIE_SECURE = True
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'
+    METRICS_REQUIRE_TOKEN = True
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER') == '1'
+    SQLALCHEMY_ENGINE_OPTIONS = production_engine_options(Config.SQLALCHEMY_DATABASE_URI, DB_PGBOUNCER)
+
+CONFIGS = {
+    'development': Config,
+    'production': ProductionConfig,
+}
+
+def config_for_env():
+    # APP_ENV picks the profile for run.py (gunicorn, flask CLI)
+    return CONFIGS[os.environ.get('APP_ENV', 'development')]
@@ -0,0 +1,30 @@
+# gunicorn -c gunicorn.conf.py run:app
+#
+# Threaded workers: requests spend most of their time waiting on Postgres, so
+# a few threads per process overlap that wait without the memory of extra
+# processes. Every request thread and every offload thread can hold one
+# pooled connection (see production_engine_options in config.py), so the
+# database sees at most
+#   workers x (GUNICORN_THREADS + OFFLOAD_WORKERS + DB_MAX_OVERFLOW)
+# connections, or workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) when the pool
+# size is set explicitly.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Matching and exports can run for a while on large datasets
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks (and NumPy arenas) are bounded
+max_requests = 2000
+max_requests_jitter = 200
+
+# Workers build the app after forking, so no pooled connection is ever
+# shared between processes
+preload_app = False
@@ -51,6 +51,22 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_name(name, type_, parent_names):
+    # The search index lives outside the models (see app/utils/search.py):
+    # FTS5 tables and their shadow tables on SQLite, a generated
+    # search_vector column and its GIN index on PostgreSQL. Autogenerate
+    # must not see them, or it would emit drops for them.
+    from app.utils.search import SEARCH_SPECS
+    tables = [spec['table'] for spec in SEARCH_SPECS.values()]
+    if type_ == 'table':
+        return not any(name == f'{t}_fts' or name.startswith(f'{t}_fts_') for t in tables)
+    if type_ == 'column':
+        return not (name == 'search_vector' and parent_names.get('table_name') in tables)
+    if type_ == 'index':
+        return name not in [f'ix_{t}_search_vector' for t in tables]
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -94,6 +110,8 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
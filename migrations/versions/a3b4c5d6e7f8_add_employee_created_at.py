@@ -0,0 +1,26 @@
+"""add created_at to employees
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b4c5d6e7f8'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ADD COLUMN like updated_at; existing employees stay NULL since
+    # when they were added is not recorded anywhere
+    op.add_column('workforce_employees', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('workforce_employees', 'created_at')
@@ -0,0 +1,26 @@
+"""add (name, id) indexes for timeline lanes
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c5d6e7f8a9'
+down_revision = 'a3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workforce_employees_name_id', 'workforce_employees', ['name', 'id'], unique=False)
+    op.create_index('ix_workforce_projects_name_id', 'workforce_projects', ['name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workforce_projects_name_id', table_name='workforce_projects')
+    op.drop_index('ix_workforce_employees_name_id', table_name='workforce_employees')
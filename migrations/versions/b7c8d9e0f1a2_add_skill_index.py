@@ -0,0 +1,93 @@
+"""add skill index tables
+
+Revision ID: b7c8d9e0f1a2
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c8d9e0f1a2'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def _parse_skills(text):
+    # Same normalization as app.utils.skills.parse_skills at the time of writing
+    names = []
+    for raw in (text or '').split(','):
+        name = raw.strip().lower()[:64]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    skills_table = op.create_table('workforce_skills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    employee_skills = op.create_table('workforce_employee_skills',
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['workforce_employees.id'], ),
+    sa.ForeignKeyConstraint(['skill_id'], ['workforce_skills.id'], ),
+    sa.PrimaryKeyConstraint('skill_id', 'employee_id')
+    )
+    with op.batch_alter_table('workforce_employee_skills', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_workforce_employee_skills_employee_id'), ['employee_id'], unique=False)
+
+    project_skills = op.create_table('workforce_project_skills',
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['workforce_projects.id'], ),
+    sa.ForeignKeyConstraint(['skill_id'], ['workforce_skills.id'], ),
+    sa.PrimaryKeyConstraint('skill_id', 'project_id')
+    )
+    with op.batch_alter_table('workforce_project_skills', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_workforce_project_skills_project_id'), ['project_id'], unique=False)
+
+    # Backfill from the existing comma-separated columns
+    conn = op.get_bind()
+    employees = conn.execute(sa.text('SELECT id, skills FROM workforce_employees')).fetchall()
+    projects = conn.execute(sa.text('SELECT id, required_skills FROM workforce_projects')).fetchall()
+
+    skill_ids = {}
+    employee_rows = []
+    project_rows = []
+    for target, rows, key in ((employee_rows, employees, 'employee_id'), (project_rows, projects, 'project_id')):
+        for row_id, text in rows:
+            for name in _parse_skills(text):
+                if name not in skill_ids:
+                    skill_ids[name] = len(skill_ids) + 1
+                target.append({'skill_id': skill_ids[name], key: row_id})
+
+    if skill_ids:
+        op.bulk_insert(skills_table, [{'id': i, 'name': n} for n, i in skill_ids.items()])
+    if employee_rows:
+        op.bulk_insert(employee_skills, employee_rows)
+    if project_rows:
+        op.bulk_insert(project_skills, project_rows)
+
+    if skill_ids and conn.dialect.name == 'postgresql':
+        # Explicit ids were inserted, move the sequence past them
+        op.execute("SELECT setval(pg_get_serial_sequence('workforce_skills', 'id'), "
+                   "(SELECT MAX(id) FROM workforce_skills))")
+
+
+def downgrade():
+    with op.batch_alter_table('workforce_project_skills', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_workforce_project_skills_project_id'))
+
+    op.drop_table('workforce_project_skills')
+    with op.batch_alter_table('workforce_employee_skills', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_workforce_employee_skills_employee_id'))
+
+    op.drop_table('workforce_employee_skills')
+    op.drop_table('workforce_skills')
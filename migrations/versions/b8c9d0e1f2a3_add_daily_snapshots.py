@@ -0,0 +1,55 @@
+"""add daily utilization snapshots
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workforce_employee_snapshots',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('bench_days', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'employee_id')
+    )
+    op.create_index('ix_workforce_employee_snapshots_employee_id_day', 'workforce_employee_snapshots',
+                    ['employee_id', 'day'], unique=False)
+    op.create_table('workforce_project_snapshots',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Integer(), nullable=False),
+    sa.Column('allocations', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'project_id')
+    )
+    op.create_index('ix_workforce_project_snapshots_project_id_day', 'workforce_project_snapshots',
+                    ['project_id', 'day'], unique=False)
+    op.create_table('workforce_utilization_snapshots',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('designation', sa.String(length=64), nullable=False),
+    sa.Column('employees', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Integer(), nullable=False),
+    sa.Column('bench', sa.Integer(), nullable=False),
+    sa.Column('fully_utilized', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'designation')
+    )
+
+
+def downgrade():
+    op.drop_table('workforce_utilization_snapshots')
+    op.drop_index('ix_workforce_project_snapshots_project_id_day', table_name='workforce_project_snapshots')
+    op.drop_table('workforce_project_snapshots')
+    op.drop_index('ix_workforce_employee_snapshots_employee_id_day', table_name='workforce_employee_snapshots')
+    op.drop_table('workforce_employee_snapshots')
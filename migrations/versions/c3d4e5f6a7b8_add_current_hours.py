@@ -0,0 +1,53 @@
+"""add employee current_hours counter and app state table
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b7c8d9e0f1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workforce_app_state',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('workforce_employees', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('current_hours', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill the counter and status as of today; the status sweep
+    # continues from here.
+    today = date.today()
+    op.get_bind().execute(sa.text(
+        "UPDATE workforce_employees SET current_hours = COALESCE(("
+        "SELECT SUM(a.allocated_hours) FROM workforce_allocations a "
+        "WHERE a.employee_id = workforce_employees.id "
+        "AND a.start_date <= :today AND a.end_date >= :today), 0)"
+    ), {'today': today.isoformat()})
+    op.execute(
+        "UPDATE workforce_employees SET availability_status = CASE "
+        "WHEN current_hours * 100 >= 80 * 40 THEN 'Fully Utilized' "
+        "WHEN current_hours * 100 >= 40 * 40 THEN 'Partially Utilized' "
+        "ELSE 'Bench' END"
+    )
+    op.get_bind().execute(sa.text(
+        "INSERT INTO workforce_app_state (key, value) VALUES ('status_sweep_date', :today)"
+    ), {'today': today.isoformat()})
+
+
+def downgrade():
+    with op.batch_alter_table('workforce_employees', schema=None) as batch_op:
+        batch_op.drop_column('current_hours')
+
+    op.drop_table('workforce_app_state')
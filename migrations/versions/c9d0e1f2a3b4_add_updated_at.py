@@ -0,0 +1,32 @@
+"""add updated_at to employees, projects and allocations
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+TABLES = ('workforce_employees', 'workforce_projects', 'workforce_allocations')
+
+
+def upgrade():
+    # Plain ADD COLUMN (no batch rebuild) so the search triggers on
+    # employees/projects stay in place; existing rows start out NULL
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False)
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,27 @@
+"""replace the allocation project_id index with (project_id, end_date)
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Timeline overlap queries seek project lanes by end date; the composite
+    # index also covers every lookup the single-column one served
+    op.create_index('ix_workforce_allocations_project_id_end_date', 'workforce_allocations', ['project_id', 'end_date'], unique=False)
+    op.drop_index('ix_workforce_allocations_project_id', table_name='workforce_allocations')
+
+
+def downgrade():
+    op.create_index('ix_workforce_allocations_project_id', 'workforce_allocations', ['project_id'], unique=False)
+    op.drop_index('ix_workforce_allocations_project_id_end_date', table_name='workforce_allocations')
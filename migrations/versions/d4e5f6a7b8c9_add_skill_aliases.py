@@ -0,0 +1,96 @@
+"""add skill aliases and packed skill id columns
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import struct
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+# Common alternate spellings; more can be added with `flask skill-alias`
+DEFAULT_ALIASES = {
+    'python3': 'python',
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'csharp': 'c#',
+    'ml': 'machine learning',
+}
+
+
+def _pack(ids):
+    # Same layout as app.utils.skills.pack_skill_ids: sorted little-endian uint32
+    ids = sorted(set(ids))
+    return struct.pack(f'<{len(ids)}I', *ids)
+
+
+def upgrade():
+    aliases_table = op.create_table('workforce_skill_aliases',
+    sa.Column('alias', sa.String(length=64), nullable=False),
+    sa.Column('canonical', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('alias')
+    )
+    with op.batch_alter_table('workforce_employees', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_ids', sa.LargeBinary(), nullable=True))
+    with op.batch_alter_table('workforce_projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('skill_ids', sa.LargeBinary(), nullable=True))
+
+    op.bulk_insert(aliases_table, [{'alias': a, 'canonical': c} for a, c in DEFAULT_ALIASES.items()])
+
+    # Fold skills already stored under an alias into the canonical skill
+    conn = op.get_bind()
+    skill_ids = dict(conn.execute(sa.text('SELECT name, id FROM workforce_skills')).fetchall())
+    postings = (('workforce_employee_skills', 'employee_id'), ('workforce_project_skills', 'project_id'))
+    for alias, canonical in DEFAULT_ALIASES.items():
+        if alias not in skill_ids:
+            continue
+        old_id = skill_ids.pop(alias)
+        if canonical not in skill_ids:
+            conn.execute(sa.text('UPDATE workforce_skills SET name = :name WHERE id = :id'),
+                         {'name': canonical, 'id': old_id})
+            skill_ids[canonical] = old_id
+            continue
+        new_id = skill_ids[canonical]
+        for table, key in postings:
+            conn.execute(sa.text(
+                f'INSERT INTO {table} (skill_id, {key}) SELECT :new_id, {key} FROM {table} '
+                f'WHERE skill_id = :old_id AND {key} NOT IN (SELECT {key} FROM {table} WHERE skill_id = :new_id)'
+            ), {'new_id': new_id, 'old_id': old_id})
+            conn.execute(sa.text(f'DELETE FROM {table} WHERE skill_id = :old_id'), {'old_id': old_id})
+        conn.execute(sa.text('DELETE FROM workforce_skills WHERE id = :id'), {'id': old_id})
+
+    # Backfill the packed columns from the posting lists
+    for (table, key), owner in zip(postings, ('workforce_employees', 'workforce_projects')):
+        grouped = {}
+        for row_id, skill_id in conn.execute(sa.text(f'SELECT {key}, skill_id FROM {table}')):
+            grouped.setdefault(row_id, []).append(skill_id)
+        if grouped:
+            conn.execute(sa.text(f'UPDATE {owner} SET skill_ids = :packed WHERE id = :id'),
+                         [{'id': row_id, 'packed': _pack(ids)} for row_id, ids in grouped.items()])
+        conn.execute(sa.text(f'UPDATE {owner} SET skill_ids = :empty WHERE skill_ids IS NULL'), {'empty': b''})
+
+
+def downgrade():
+    with op.batch_alter_table('workforce_projects', schema=None) as batch_op:
+        batch_op.drop_column('skill_ids')
+    with op.batch_alter_table('workforce_employees', schema=None) as batch_op:
+        batch_op.drop_column('skill_ids')
+
+    op.drop_table('workforce_skill_aliases')
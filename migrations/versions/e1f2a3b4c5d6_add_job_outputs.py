@@ -0,0 +1,32 @@
+"""store job outputs in the database
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workforce_job_outputs',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['workforce_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index(op.f('ix_workforce_job_outputs_created_at'), 'workforce_job_outputs', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_workforce_job_outputs_created_at'), table_name='workforce_job_outputs')
+    op.drop_table('workforce_job_outputs')
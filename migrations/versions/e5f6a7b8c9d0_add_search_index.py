@@ -0,0 +1,60 @@
+"""add full-text search index for employees and projects
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+# Mirrors SEARCH_SPECS / search_ddl in app/utils/search.py at the time of writing
+SEARCH_COLUMNS = {
+    'workforce_employees': ('name', 'email', 'designation', 'skills'),
+    'workforce_projects': ('name', 'client_name', 'required_skills'),
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table, columns in SEARCH_COLUMNS.items():
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{c}' for c in columns)
+        old = ', '.join(f'old.{c}' for c in columns)
+        fts = f'{table}_fts'
+        if dialect == 'sqlite':
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', prefix='2 3')")
+            op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                       f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+            op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                       f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END")
+            op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                       f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                       f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+            # Index the existing rows
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        elif dialect == 'postgresql':
+            document = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+            op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+                       f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED")
+            op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table in SEARCH_COLUMNS:
+        fts = f'{table}_fts'
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif dialect == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_search_vector')
+            op.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
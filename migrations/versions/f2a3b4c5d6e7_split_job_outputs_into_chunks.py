@@ -0,0 +1,55 @@
+"""store job outputs as ordered chunk rows
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workforce_job_output_chunks',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['workforce_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'seq')
+    )
+    op.create_index(op.f('ix_workforce_job_output_chunks_created_at'), 'workforce_job_output_chunks', ['created_at'], unique=False)
+    # A stored output is one gzip stream, which is a valid single chunk
+    op.execute(
+        "INSERT INTO workforce_job_output_chunks (job_id, seq, data, created_at) "
+        "SELECT job_id, 0, data, created_at FROM workforce_job_outputs"
+    )
+    op.drop_index(op.f('ix_workforce_job_outputs_created_at'), table_name='workforce_job_outputs')
+    op.drop_table('workforce_job_outputs')
+
+
+def downgrade():
+    op.create_table('workforce_job_outputs',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['workforce_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_index(op.f('ix_workforce_job_outputs_created_at'), 'workforce_job_outputs', ['created_at'], unique=False)
+    # Only single-chunk outputs fit back into one row; the rest are dropped
+    # (exports expire within days anyway)
+    op.execute(
+        "INSERT INTO workforce_job_outputs (job_id, data, created_at) "
+        "SELECT job_id, data, created_at FROM workforce_job_output_chunks c WHERE seq = 0 "
+        "AND NOT EXISTS (SELECT 1 FROM workforce_job_output_chunks n WHERE n.job_id = c.job_id AND n.seq > 0)"
+    )
+    op.drop_index(op.f('ix_workforce_job_output_chunks_created_at'), table_name='workforce_job_output_chunks')
+    op.drop_table('workforce_job_output_chunks')
@@ -0,0 +1,35 @@
+"""add indexes for allocation, status and bench filters
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain op.create_index rather than batch mode: on SQLite a batch
+    # operation may rebuild the table and lose the search triggers
+    op.create_index('ix_workforce_allocations_employee_id_end_date', 'workforce_allocations', ['employee_id', 'end_date'], unique=False)
+    op.create_index(op.f('ix_workforce_allocations_project_id'), 'workforce_allocations', ['project_id'], unique=False)
+    op.create_index(op.f('ix_workforce_allocations_start_date'), 'workforce_allocations', ['start_date'], unique=False)
+    op.create_index(op.f('ix_workforce_allocations_end_date'), 'workforce_allocations', ['end_date'], unique=False)
+    op.create_index(op.f('ix_workforce_employees_availability_status'), 'workforce_employees', ['availability_status'], unique=False)
+    op.create_index(op.f('ix_workforce_projects_status'), 'workforce_projects', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_workforce_projects_status'), table_name='workforce_projects')
+    op.drop_index(op.f('ix_workforce_employees_availability_status'), table_name='workforce_employees')
+    op.drop_index(op.f('ix_workforce_allocations_end_date'), table_name='workforce_allocations')
+    op.drop_index(op.f('ix_workforce_allocations_start_date'), table_name='workforce_allocations')
+    op.drop_index(op.f('ix_workforce_allocations_project_id'), table_name='workforce_allocations')
+    op.drop_index('ix_workforce_allocations_employee_id_end_date', table_name='workforce_allocations')
@@ -1,6 +1,7 @@
 from app import create_app
+from config import config_for_env
 
-app = create_app()
+app = create_app(config_for_env())
 
 if __name__ == '__main__':
     app.run(debug=True)
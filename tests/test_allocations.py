@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.pagination import keyset_page
+from config import Config
+from datetime import date
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class AllocationListTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+
+        self.employees = [Employee(name=f'Emp {i}', email=f'e{i}@test.com') for i in range(5)]
+        self.projects = [Project(name=f'Proj {i}', client_name='C') for i in range(3)]
+        db.session.add_all(self.employees + self.projects)
+        db.session.flush()
+        for i in range(30):
+            db.session.add(Allocation(
+                employee_id=self.employees[i % 5].id,
+                project_id=self.projects[i % 3].id,
+                allocated_hours=10,
+                start_date=date(2025, 1 + i % 12, 1),
+                end_date=date(2025, 1 + i % 12, 28)
+            ))
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def count_queries(self, url):
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            resp = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(resp.status_code, 200)
+        return len(statements)
+
+    def test_keyset_pages_cover_every_row_once(self):
+        seen = []
+        page = keyset_page(Allocation.query, Allocation.id, per_page=8)
+        pages = [page]
+        while page['next_cursor']:
+            page = keyset_page(Allocation.query, Allocation.id, before=page['next_cursor'], per_page=8)
+            pages.append(page)
+        for p in pages:
+            seen.extend(a.id for a in p['items'])
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(seen, sorted((a.id for a in Allocation.query.all()), reverse=True))
+
+        # Walking back from the last page returns the previous one
+        back = keyset_page(Allocation.query, Allocation.id, after=pages[-1]['prev_cursor'], per_page=8)
+        self.assertEqual([a.id for a in back['items']], [a.id for a in pages[-2]['items']])
+        self.assertIsNone(pages[0]['prev_cursor'])
+
+    def test_list_page_links_to_next_cursor(self):
+        resp = self.client.get('/allocations/?per_page=8')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('before=', resp.get_data(as_text=True))
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.client.get('/allocations/')
+        small = self.count_queries('/allocations/?per_page=2')
+        large = self.count_queries('/allocations/?per_page=30')
+        self.assertEqual(small, large)
+
+    def test_filters(self):
+        emp = self.employees[0]
+        resp = self.client.get(f'/allocations/?employee_id={emp.id}&start=2025-03-01&end=2025-04-30')
+        body = resp.get_data(as_text=True)
+        expected = Allocation.query.filter(
+            Allocation.employee_id == emp.id,
+            Allocation.end_date >= date(2025, 3, 1),
+            Allocation.start_date <= date(2025, 4, 30)
+        ).count()
+        self.assertGreater(expected, 0)
+        self.assertEqual(body.count('/allocations/edit/'), expected)
+
+if __name__ == '__main__':
+    unittest.main()
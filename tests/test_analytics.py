@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation, EmployeeSnapshot
+from app.utils import analytics
+from app.utils.analytics import export_analytics, read_manifest
+from app.utils.snapshots import take_snapshots
+from app.utils.status import adjust_current_hours
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+DAY = date(2030, 1, 30)
+
+class AnalyticsExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.out = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.out)
+        self.addCleanup(setattr, analytics, 'HWM_OVERLAP', analytics.HWM_OVERLAP)
+        analytics.HWM_OVERLAP = timedelta(0)
+
+        db.session.add(User(username='admin', email='a@a.com', role='Admin', is_verified=True))
+        self.employees = [Employee(name=f'E{i}', email=f'e{i}@example.com', designation='Developer')
+                          for i in range(5)]
+        project = Project(name='P', client_name='C', start_date=DAY, end_date=DAY + timedelta(days=60))
+        db.session.add_all(self.employees + [project])
+        db.session.flush()
+        db.session.add(Allocation(employee_id=self.employees[0].id, project_id=project.id, allocated_hours=40,
+                                  start_date=DAY, end_date=DAY + timedelta(days=10)))
+        db.session.commit()
+        take_snapshots(DAY, DAY + timedelta(days=4)) # Spans January and February
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def dataset(self, table, fmt='parquet'):
+        return ds.dataset(os.path.join(self.out, table), format='parquet' if fmt == 'parquet' else 'ipc',
+                          partitioning='hive').to_table()
+
+    def test_full_export(self):
+        written = export_analytics(self.out)
+        self.assertEqual(written['employees'], 5)
+        self.assertEqual(written['employee_snapshots'], 25)
+
+        employees = self.dataset('employees')
+        self.assertEqual(sorted(employees['email'].to_pylist()), [f'e{i}@example.com' for i in range(5)])
+        self.assertEqual(employees.schema.field('current_hours').type, pa.int64())
+        allocations = self.dataset('allocations')
+        self.assertEqual(allocations['start_date'].to_pylist(), [DAY])
+
+        self.assertEqual(sorted(os.listdir(os.path.join(self.out, 'employee_snapshots'))),
+                         ['month=2030-01', 'month=2030-02'])
+        snapshots = self.dataset('employee_snapshots')
+        self.assertEqual(snapshots.num_rows, EmployeeSnapshot.query.count())
+        self.assertEqual(set(snapshots['status'].to_pylist()), {'Bench', 'Fully Utilized'})
+        self.assertFalse(os.path.exists(os.path.join(self.out, '_staging')))
+
+    def test_incremental_export(self):
+        export_analytics(self.out)
+        mark = read_manifest(self.out)['tables']['employees']['high_water_mark']
+
+        # Unchanged: nothing new for the entities
+        written = export_analytics(self.out, tables=('employees', 'allocations'))
+        self.assertEqual(written, {'employees': 0, 'allocations': 0})
+
+        # ORM edits and the Core status UPDATE both stamp updated_at
+        self.employees[1].designation = 'Lead'
+        adjust_current_hours(self.employees[2].id, 20)
+        db.session.commit()
+        self.assertGreater(self.employees[2].updated_at, datetime.fromisoformat(mark))
+        written = export_analytics(self.out, tables=('employees',))
+        self.assertEqual(written['employees'], 2)
+        self.assertEqual(len(os.listdir(os.path.join(self.out, 'employees'))), 2)
+        latest = {}
+        for row in sorted(self.dataset('employees').to_pylist(), key=lambda r: r['updated_at']):
+            latest[row['id']] = row
+        self.assertEqual(latest[self.employees[1].id]['designation'], 'Lead')
+        self.assertEqual(latest[self.employees[2].id]['current_hours'], 20)
+
+        # Snapshot months from the last exported day on are rewritten, not appended
+        take_snapshots(DAY + timedelta(days=5), DAY + timedelta(days=6))
+        export_analytics(self.out, tables=('employee_snapshots',))
+        self.assertEqual(self.dataset('employee_snapshots').num_rows, 35)
+        self.assertEqual(read_manifest(self.out)['tables']['employee_snapshots']['high_water_mark'],
+                         (DAY + timedelta(days=6)).isoformat())
+
+    def test_arrow_format(self):
+        export_analytics(self.out, fmt='arrow')
+        self.assertEqual(self.dataset('projects', fmt='arrow')['name'].to_pylist(), ['P'])
+        with self.assertRaises(ValueError):
+            export_analytics(self.out, fmt='parquet')
+        export_analytics(self.out, fmt='parquet', full=True)
+        self.assertEqual(self.dataset('projects')['name'].to_pylist(), ['P'])
+
+if __name__ == '__main__':
+    unittest.main()
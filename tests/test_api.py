@@ -0,0 +1,179 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.matching import find_matching_employees
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class BulkApiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        db.session.add(User(username='jane', email='jane@test.com', is_verified=True))
+        db.session.add(Employee(name='Old Name', email='old@test.com', skills='Java'))
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        resp = self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        self.headers = {'Authorization': f"Bearer {resp.get_json()['token']}"}
+        self.client.post('/auth/logout')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def post(self, url, payload):
+        return self.client.post(url, json=payload, headers=self.headers)
+
+    def test_requires_auth(self):
+        resp = self.client.post('/api/v1/employees/bulk', json={'employees': []})
+        self.assertEqual(resp.status_code, 401)
+
+    def count_statements(self, url, payload):
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            resp = self.post(url, payload)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(resp.status_code, 200)
+        return statements
+
+    def test_employee_statement_count_is_independent_of_batch_size(self):
+        small = self.count_statements('/api/v1/employees/bulk', {'employees': [
+            {'name': f'Emp {i}', 'email': f'e{i}@test.com', 'skills': 'Go'} for i in range(2)
+        ]})
+        large = self.count_statements('/api/v1/employees/bulk', {'employees': [
+            {'name': f'Emp {i}', 'email': f'f{i}@test.com', 'skills': 'Rust'} for i in range(200)
+        ]})
+        def split(statements):
+            inserts = [s for s in statements if s.startswith('INSERT INTO workforce_employees')]
+            return len(inserts), len(statements) - len(inserts)
+        small_inserts, small_rest = split(small)
+        large_inserts, large_rest = split(large)
+        self.assertEqual(small_rest, large_rest)
+        # INSERT .. RETURNING is one batch except on SQLite, which cannot
+        # order batched RETURNING rows
+        if db.engine.dialect.name == 'sqlite':
+            self.assertEqual((small_inserts, large_inserts), (2, 200))
+        else:
+            self.assertEqual((small_inserts, large_inserts), (1, 1))
+        self.assertEqual(Employee.query.count(), 203)
+
+    def test_bulk_employee_upsert(self):
+        resp = self.post('/api/v1/employees/bulk', {'employees': [
+            {'name': 'Jane', 'email': 'jane@test.com', 'skills': 'Python, SQL'},
+            {'name': 'New Name', 'email': 'old@test.com', 'skills': 'Python'},
+            {'name': 'Bad', 'email': 'not-an-email'},
+            {'email': 'nameless@test.com'},
+            {'name': 'Dup', 'email': 'jane@test.com'},
+        ] + [{'name': f'Emp {i}', 'email': f'e{i}@test.com'} for i in range(50)]})
+
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(data['summary'], {'created': 51, 'updated': 1, 'error': 3})
+        self.assertEqual([r['status'] for r in data['results'][:5]], ['created', 'updated', 'error', 'error', 'error'])
+        self.assertIn('email is not valid', data['results'][2]['errors'])
+
+        jane = Employee.query.filter_by(email='jane@test.com').one()
+        self.assertEqual(User.query.filter_by(username='jane').one().employee_id, jane.id)
+        self.assertEqual(Employee.query.filter_by(email='old@test.com').one().name, 'New Name')
+
+        # Bulk rows are in the skill index
+        proj = Project(name='P', client_name='C', required_skills='python, sql')
+        db.session.add(proj)
+        from app.utils.skills import index_project_skills
+        index_project_skills(proj)
+        db.session.commit()
+        matches = find_matching_employees(proj.id)
+        self.assertEqual([m['employee'].email for m in matches], ['jane@test.com', 'old@test.com'])
+
+    def test_blank_employee_name_is_a_row_error(self):
+        resp = self.post('/api/v1/employees/bulk', {'employees': [
+            {'name': '', 'email': 'old@test.com'},
+            {'name': 'Jane', 'email': 'jane@test.com'},
+        ]})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.get_json()['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'created'])
+        self.assertIn('name is required', results[0]['errors'])
+        self.assertEqual(Employee.query.filter_by(email='old@test.com').one().name, 'Old Name')
+
+    def test_create_mode_rejects_existing(self):
+        resp = self.post('/api/v1/employees/bulk?mode=create', {'employees': [
+            {'name': 'X', 'email': 'old@test.com'}
+        ]})
+        self.assertEqual(resp.get_json()['results'][0]['status'], 'error')
+
+    def test_bulk_projects_and_allocations(self):
+        resp = self.post('/api/v1/projects/bulk', {'projects': [
+            {'name': 'P1', 'client_name': 'C1', 'required_skills': 'Python',
+             'start_date': '2030-01-01', 'end_date': '2030-12-31'},
+            {'name': 'P2', 'client_name': 'C1', 'start_date': '2030-02-01', 'end_date': '2030-01-01'},
+        ]})
+        results = resp.get_json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error'])
+        project_id = results[0]['id']
+
+        emp = Employee.query.filter_by(email='old@test.com').one()
+        resp = self.post('/api/v1/allocations/bulk', {'allocations': [
+            {'employee_id': emp.id, 'project_id': project_id, 'allocated_hours': 30,
+             'start_date': '2030-01-01', 'end_date': '2030-06-30'},
+            # Overlaps the row above
+            {'employee_id': emp.id, 'project_id': project_id, 'allocated_hours': 20,
+             'start_date': '2030-06-01', 'end_date': '2030-07-31'},
+            {'employee_id': emp.id, 'project_id': project_id, 'allocated_hours': 20,
+             'start_date': '2030-07-01', 'end_date': '2030-07-31'},
+            {'employee_id': 999, 'project_id': project_id, 'allocated_hours': 20,
+             'start_date': '2030-07-01', 'end_date': '2030-07-31'},
+        ]})
+        results = resp.get_json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'created', 'error'])
+        self.assertEqual(Allocation.query.count(), 2)
+
+        resp = self.client.get('/api/v1/allocations?per_page=1', headers=self.headers)
+        data = resp.get_json()
+        self.assertEqual(len(data['items']), 1)
+        self.assertIsNotNone(data['next_cursor'])
+
+    def test_blank_project_names_are_row_errors(self):
+        project = Project(name='P', client_name='C')
+        db.session.add(project)
+        db.session.commit()
+        resp = self.post('/api/v1/projects/bulk', {'projects': [
+            {'id': project.id, 'client_name': ''},
+            {'id': project.id, 'name': '  '},
+            {'id': project.id, 'status': 'Completed'},
+        ]})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.get_json()['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'error', 'updated'])
+        self.assertIn('client_name is required', results[0]['errors'])
+        self.assertIn('name is required', results[1]['errors'])
+        project = db.session.get(Project, project.id)
+        self.assertEqual((project.name, project.client_name, project.status), ('P', 'C', 'Completed'))
+
+    def test_list_employees(self):
+        resp = self.client.get('/api/v1/employees', headers=self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['items'][0]['email'], 'old@test.com')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.assignment import propose_assignments, proposal_rows
+from app.utils.bulk import upsert_allocations
+from app.utils.skills import index_employee_skills, index_project_skills
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+TODAY = date(2030, 1, 1)
+
+class AssignmentTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+
+        # Ann is the best match for both projects; a greedy pick would give
+        # her to both and leave the Java project without anyone.
+        self.employees = {}
+        for name, skills, hours in [('Ann', 'Python, Java', 0), ('Bob', 'Python', 0), ('Cat', 'Python', 30)]:
+            emp = Employee(name=name, email=f'{name.lower()}@test.com', skills=skills, current_hours=hours,
+                           availability_status='Partially Utilized' if hours else 'Bench')
+            db.session.add(emp)
+            index_employee_skills(emp)
+            self.employees[name] = emp
+        self.projects = {}
+        for name, skills in [('Py', 'Python'), ('Java', 'Java, Python')]:
+            proj = Project(name=name, client_name='C', required_skills=skills,
+                           start_date=date(2029, 12, 1), end_date=date(2030, 6, 30))
+            db.session.add(proj)
+            index_project_skills(proj)
+            self.projects[name] = proj
+        self.undated = Project(name='Undated', client_name='C', required_skills='Python')
+        db.session.add(self.undated)
+        db.session.flush()
+        # Cat is booked 30h a week over both projects' windows
+        db.session.add(Allocation(employee_id=self.employees['Cat'].id, project_id=self.undated.id,
+                                  allocated_hours=30, start_date=date(2029, 11, 1), end_date=date(2030, 12, 31)))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def pairs(self, proposals):
+        return sorted((p['project'].name, p['employee'].name) for p in proposals)
+
+    def test_global_assignment(self):
+        proposals = propose_assignments(today=TODAY)
+        self.assertEqual(self.pairs(proposals), [('Java', 'Ann'), ('Py', 'Bob')])
+        self.assertEqual(proposals[0]['start_date'], TODAY)
+        self.assertEqual(proposals[0]['allocated_hours'], 40)
+
+    def test_slots_use_remaining_capacity(self):
+        proposals = propose_assignments(slots=2, today=TODAY)
+        self.assertEqual(self.pairs(proposals), [('Java', 'Ann'), ('Py', 'Bob'), ('Py', 'Cat')])
+        cat = [p for p in proposals if p['employee'].name == 'Cat'][0]
+        self.assertEqual(cat['allocated_hours'], 10)
+
+        results = upsert_allocations(proposal_rows(proposals))
+        db.session.commit()
+        self.assertEqual([r['status'] for r in results], ['created'] * 3)
+        self.assertEqual(Allocation.query.count(), 4)
+
+    def test_min_hours_excludes_nearly_full(self):
+        proposals = propose_assignments(slots=2, today=TODAY, min_hours=20)
+        self.assertNotIn('Cat', [p['employee'].name for p in proposals])
+
+    def test_later_bookings_count_against_the_window(self):
+        # Bob is on the bench today but fully booked from March, inside the
+        # Py window; Cat's 10 free hours are all that can be offered there
+        bob = self.employees['Bob']
+        db.session.add(Allocation(employee_id=bob.id, project_id=self.undated.id, allocated_hours=40,
+                                  start_date=date(2030, 3, 1), end_date=date(2030, 4, 30)))
+        db.session.commit()
+        self.assertEqual(db.session.get(Employee, bob.id).availability_status, 'Bench')
+
+        proposals = propose_assignments(today=TODAY)
+        self.assertEqual(self.pairs(proposals), [('Java', 'Ann'), ('Py', 'Cat')])
+        results = upsert_allocations(proposal_rows(proposals))
+        self.assertEqual([r['status'] for r in results], ['created', 'created'])
+
+    def test_api_commit(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.post('/api/v1/assignments', json={})
+        self.assertEqual(len(resp.get_json()['proposals']), 2)
+        self.assertEqual(Allocation.query.count(), 1)
+        resp = client.post('/api/v1/assignments', json={'commit': True, 'project_ids': [self.projects['Py'].id]})
+        self.assertEqual(resp.get_json()['summary'], {'created': 1})
+        self.assertEqual(client.get('/bench/assign').status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.bench import bench_aging
+from app.utils.skills import index_employee_skills
+from config import Config
+from datetime import datetime, timedelta
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class BenchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+
+        today = datetime.today().date()
+        proj = Project(name='P1', client_name='C1')
+        self.recent = Employee(name='Recent', email='r@test.com', availability_status='Bench', skills='Python, SQL')
+        self.old = Employee(name='Old', email='o@test.com', availability_status='Bench', skills='Python')
+        self.never = Employee(name='Never', email='n@test.com', availability_status='Bench')
+        self.busy = Employee(name='Busy', email='b@test.com', availability_status='Fully Utilized')
+        db.session.add_all([proj, self.recent, self.old, self.never, self.busy])
+        db.session.flush()
+        for emp in (self.recent, self.old):
+            index_employee_skills(emp)
+        db.session.add_all([
+            Allocation(employee_id=self.recent.id, project_id=proj.id, allocated_hours=40,
+                       start_date=today - timedelta(days=100), end_date=today - timedelta(days=5)),
+            Allocation(employee_id=self.old.id, project_id=proj.id, allocated_hours=40,
+                       start_date=today - timedelta(days=200), end_date=today - timedelta(days=90)),
+            Allocation(employee_id=self.old.id, project_id=proj.id, allocated_hours=40,
+                       start_date=today - timedelta(days=300), end_date=today - timedelta(days=150)),
+        ])
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_with_last_allocation_end_orders_in_sql(self):
+        query = Employee.query.filter_by(availability_status='Bench')
+        rows = Employee.with_last_allocation_end(query, order_by_bench_days=True).all()
+        self.assertEqual([emp.name for emp, _ in rows], ['Old', 'Recent', 'Never'])
+        self.assertEqual([emp.bench_days_since(last_end) for emp, last_end in rows], [90, 5, 0])
+        self.assertIsNone(rows[-1][1])
+
+    def test_to_dict_accepts_precomputed_last_end(self):
+        emp, last_end = Employee.with_last_allocation_end().filter(Employee.id == self.old.id).one()
+        self.assertEqual(emp.to_dict(last_end)['bench_days'], 90)
+        self.assertEqual(emp.to_dict(), emp.to_dict(last_end))
+
+    def test_bench_page(self):
+        resp = self.client.get('/bench/')
+        self.assertEqual(resp.status_code, 200)
+        body = resp.get_data(as_text=True)
+        self.assertLess(body.index('Old'), body.index('Recent'))
+        self.assertNotIn('Busy', body)
+
+    def test_bench_aging_report(self):
+        report = bench_aging()
+        self.assertEqual(report['total'], 3)
+        self.assertEqual(report['buckets'], {'labels': ['0-15', '16-30', '31-60', '60+'], 'counts': [2, 0, 0, 1]})
+        self.assertEqual(report['skills']['skill'], ['python', 'sql'])
+        self.assertEqual(report['skills']['employees'], [2, 1])
+        self.assertEqual(report['skills']['avg_bench_days'], [47.5, 5.0])
+        self.assertEqual(report['skills']['60+'], [1, 0])
+        idle = report['longest_idle']
+        self.assertEqual(idle['name'], ['Old', 'Recent', 'Never'])
+        self.assertEqual(idle['bench_days'], [90, 5, 0])
+        self.assertEqual(idle['rank'], [1, 2, 3])
+        self.assertIsNone(idle['last_end'][2])
+
+        page = bench_aging(bucket='0-15', limit=1, offset=1)
+        self.assertEqual((page['longest_idle']['name'], page['matching']), (['Never'], 2))
+
+    def test_bench_aging_api(self):
+        resp = self.client.get('/api/v1/bench/aging?limit=2')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json['longest_idle']['bench_days'], [90, 5])
+        self.assertEqual(self.client.get('/api/v1/bench/aging?bucket=60%2B').json['longest_idle']['name'], ['Old'])
+        self.assertEqual(self.client.get('/api/v1/bench/aging?bucket=90').status_code, 400)
+        body = self.client.get('/bench/?bucket=0-15').get_data(as_text=True)
+        self.assertIn('Recent', body)
+        self.assertNotIn('Old', body)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.capacity import CapacityTimeline, check_capacity, find_overbooked_employees
+from config import Config
+from datetime import date
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class CapacityTimelineTestCase(unittest.TestCase):
+    def test_peak_respects_start_and_end_dates(self):
+        timeline = CapacityTimeline([
+            (date(2026, 1, 1), date(2026, 1, 31), 20),
+            (date(2026, 2, 1), date(2026, 2, 28), 30),
+            (date(2026, 1, 31), date(2026, 2, 1), 10),
+        ])
+        self.assertEqual(timeline.peak(date(2026, 1, 1), date(2026, 1, 30)), 20)
+        self.assertEqual(timeline.peak(date(2026, 1, 31), date(2026, 1, 31)), 30)
+        self.assertEqual(timeline.peak(date(2026, 1, 1), date(2026, 3, 31)), 40)
+        self.assertEqual(timeline.peak(date(2026, 2, 2), date(2026, 3, 31)), 30)
+        self.assertEqual(timeline.peak(date(2026, 3, 1), date(2026, 3, 31)), 0)
+        self.assertEqual(timeline.peak(date(2025, 1, 1), date(2025, 12, 31)), 0)
+
+class CapacityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        self.emp = Employee(name='Jane', email='j@j.com')
+        self.other = Employee(name='Joe', email='joe@j.com')
+        self.proj = Project(name='P1', client_name='C1')
+        db.session.add_all([admin, self.emp, self.other, self.proj])
+        db.session.flush()
+        self.alloc = Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=30,
+                                start_date=date(2030, 1, 1), end_date=date(2030, 6, 30))
+        db.session.add(self.alloc)
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_check_capacity(self):
+        self.assertEqual(check_capacity(self.emp.id, date(2030, 6, 1), date(2030, 7, 31), 20), (False, 50))
+        self.assertEqual(check_capacity(self.emp.id, date(2030, 7, 1), date(2030, 7, 31), 40), (True, 40))
+        self.assertEqual(check_capacity(self.emp.id, date(2030, 1, 1), date(2030, 6, 30), 40,
+                                        exclude_allocation_id=self.alloc.id), (True, 40))
+
+    def test_add_allocation_rejects_overbooking(self):
+        resp = self.client.post('/allocations/add', data={
+            'employee_id': self.emp.id,
+            'project_id': self.proj.id,
+            'allocated_hours': 20,
+            'start_date': '2030-03-01',
+            'end_date': '2030-03-31'
+        }, follow_redirects=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b'Over-allocation', resp.data)
+        self.assertEqual(Allocation.query.count(), 1)
+
+        # Same hours after the existing allocation ends is fine
+        self.client.post('/allocations/add', data={
+            'employee_id': self.emp.id,
+            'project_id': self.proj.id,
+            'allocated_hours': 20,
+            'start_date': '2030-07-01',
+            'end_date': '2030-07-31'
+        }, follow_redirects=True)
+        self.assertEqual(Allocation.query.count(), 2)
+
+    def test_overbooked_report(self):
+        # Written directly, bypassing the write-time check
+        db.session.add_all([
+            Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=20,
+                       start_date=date(2030, 6, 15), end_date=date(2030, 8, 1)),
+            Allocation(employee_id=self.other.id, project_id=self.proj.id, allocated_hours=40,
+                       start_date=date(2030, 1, 1), end_date=date(2030, 1, 31)),
+            Allocation(employee_id=self.other.id, project_id=self.proj.id, allocated_hours=40,
+                       start_date=date(2030, 2, 1), end_date=date(2030, 2, 28)),
+        ])
+        db.session.commit()
+
+        report = find_overbooked_employees()
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['employee'].id, self.emp.id)
+        self.assertEqual(report[0]['peak_hours'], 50)
+        self.assertEqual(report[0]['peak_date'], date(2030, 6, 15))
+
+        self.assertEqual(find_overbooked_employees(since=date(2030, 7, 1)), [])
+
+        resp = self.client.get('/allocations/overbooked')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b'Jane', resp.data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.pool import NullPool
+from config import Config, ProductionConfig, production_engine_options
+
+class ProductionConfigTestCase(unittest.TestCase):
+    def test_postgres_pool_and_timeouts(self):
+        options = production_engine_options('postgresql://u:p@db/app')
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertGreater(options['pool_size'], 0)
+        self.assertIn('statement_timeout=', options['connect_args']['options'])
+
+    def test_sqlite_has_no_postgres_connect_args(self):
+        self.assertNotIn('connect_args', production_engine_options('sqlite:///workforce.db'))
+
+    def test_pgbouncer_disables_app_pool(self):
+        self.assertEqual(production_engine_options('postgresql://u:p@bouncer/app', pgbouncer=True),
+                         {'poolclass': NullPool})
+
+    def test_metrics_need_a_token_in_production(self):
+        self.assertTrue(ProductionConfig.METRICS_REQUIRE_TOKEN)
+        self.assertFalse(Config.METRICS_REQUIRE_TOKEN)
+
+if __name__ == '__main__':
+    unittest.main()
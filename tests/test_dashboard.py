@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Employee
+from app.utils.cache import TTLCache, invalidate_stats, stats_version
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class DashboardCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add_all([admin, Employee(name='Jane', email='j@j.com')])
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def get_dashboard(self):
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            resp = self.client.get('/dashboard')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_data(as_text=True), statements
+
+    def test_repeated_loads_hit_the_cache(self):
+        _, cold = self.get_dashboard()
+        _, warm = self.get_dashboard()
+        self.assertLess(len(warm), len(cold))
+        self.assertFalse(any('workforce_employees' in s for s in warm))
+
+    def test_writes_invalidate(self):
+        body, _ = self.get_dashboard()
+        self.assertIn('No pending approvals', body)
+
+        self.client.post('/auth/register', data={
+            'username': 'newbie', 'email': 'n@n.com', 'password': 'x', 'confirm_password': 'x'
+        })
+        self.client.post('/employees/add', data={'name': 'Joe', 'email': 'joe@j.com'})
+
+        body, _ = self.get_dashboard()
+        self.assertIn('newbie', body)
+        self.assertRegex(body, r'Total Employees</h6>\s*<h2[^>]*>2</h2>')
+
+    def test_version_is_bumped_after_commit_only(self):
+        before = stats_version()
+        db.session.add(Employee(name='Tmp', email='t@t.com'))
+        invalidate_stats()
+        db.session.flush()
+        self.assertEqual(stats_version(), before)
+        db.session.rollback()
+        db.session.commit()
+        self.assertEqual(stats_version(), before)
+
+        invalidate_stats()
+        db.session.commit()
+        bumped = stats_version()
+        self.assertNotEqual(bumped, before)
+        invalidate_stats()
+        db.session.commit()
+        self.assertNotIn(stats_version(), (before, bumped))
+
+    def test_current_user_is_loaded_once_per_request(self):
+        _, statements = self.get_dashboard()
+        user_lookups = [s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM workforce_users' in s
+                        and 'is_verified' not in s.split('WHERE')[-1]]
+        self.assertEqual(len(user_lookups), 1)
+
+    def test_anonymous_pages_have_no_current_user(self):
+        self.client.post('/auth/logout')
+        resp = self.client.get('/contact')
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn(b'My Profile', resp.data)
+
+    def test_ttl_cache_expiry_and_eviction(self):
+        cache = TTLCache(ttl=30, maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        cache.set('d', 4, ttl=-1)
+        self.assertIsNone(cache.get('d'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.forecast import UtilizationForecast, build_forecast
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+MONDAY = date(2030, 1, 7)
+
+def daily_reference(monday, weeks, employee_ids, allocations):
+    # Day-by-day sum of each allocation's hours / 7, the slow way
+    load = np.zeros((len(employee_ids), weeks))
+    for employee_id, _, start, end, hours in allocations:
+        for offset in range(weeks * 7):
+            day = monday + timedelta(days=offset)
+            if (start is None or start <= day) and (end is None or end >= day):
+                load[employee_ids.index(employee_id), offset // 7] += hours / 7
+    return load
+
+class ForecastTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        self.dev = Employee(name='Dev', email='dev@example.com', designation='Developer')
+        self.qa = Employee(name='QA', email='qa@example.com', designation='QA')
+        self.idle = Employee(name='Idle', email='idle@example.com', designation='Developer')
+        self.project = Project(name='P', client_name='C')
+        db.session.add_all([self.dev, self.qa, self.idle, self.project])
+        db.session.flush()
+        db.session.add_all([
+            # Full time for the first two weeks
+            Allocation(employee_id=self.dev.id, project_id=self.project.id, allocated_hours=40,
+                       start_date=MONDAY - timedelta(days=30), end_date=MONDAY + timedelta(days=13)),
+            # Half time from the Thursday of week 1 (four days of it), open-ended
+            Allocation(employee_id=self.qa.id, project_id=self.project.id, allocated_hours=20,
+                       start_date=MONDAY + timedelta(days=10), end_date=None),
+            # Ended before the window
+            Allocation(employee_id=self.idle.id, project_id=self.project.id, allocated_hours=40,
+                       start_date=MONDAY - timedelta(days=60), end_date=MONDAY - timedelta(days=1)),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_matches_day_by_day_sum(self):
+        rng = np.random.default_rng(7)
+        employee_ids = list(range(1, 21))
+        allocations = []
+        for _ in range(300):
+            start = MONDAY + timedelta(days=int(rng.integers(-20, 80)))
+            end = start + timedelta(days=int(rng.integers(0, 50)))
+            allocations.append((int(rng.choice(employee_ids)), int(rng.integers(1, 4)),
+                                start if rng.random() > 0.1 else None, end if rng.random() > 0.2 else None,
+                                int(rng.choice([8, 20, 40]))))
+        forecast = UtilizationForecast(MONDAY, 10, employee_ids, ['Dev'] * 20, allocations)
+        np.testing.assert_allclose(forecast.employee_load, daily_reference(MONDAY, 10, employee_ids, allocations))
+
+    def test_curves(self):
+        # Any day of the week starts the forecast on its Monday
+        data = build_forecast(weeks=4, today=MONDAY + timedelta(days=3)).to_dict()
+        self.assertEqual(data['weeks'], ['2030-01-07', '2030-01-14', '2030-01-21', '2030-01-28'])
+        self.assertEqual(data['org']['booked_hours'], [40.0, 51.4, 20.0, 20.0])
+        self.assertEqual(data['org']['bench'], [2, 2, 2, 2])
+        self.assertEqual(data['org']['fully_utilized'], [1, 1, 0, 0])
+        self.assertEqual(data['org']['utilization'], [33.3, 42.9, 16.7, 16.7])
+
+        developers, qa = data['designations']
+        self.assertEqual((developers['designation'], developers['employees']), ('Developer', 2))
+        self.assertEqual(developers['utilization'], [50.0, 50.0, 0.0, 0.0])
+        self.assertEqual(qa['booked_hours'], [0.0, 11.4, 20.0, 20.0])
+        self.assertEqual(data['projects'], [{'project_id': self.project.id,
+                                             'booked_hours': [40.0, 51.4, 20.0, 20.0],
+                                             'fte': [1.0, 1.29, 0.5, 0.5]}])
+
+    def test_api_and_dashboard(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.get('/api/v1/forecast?weeks=6&projects=0')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json['weeks']), 6)
+        self.assertEqual(resp.json['org']['employees'], 3)
+        self.assertNotIn('projects', resp.json)
+        self.assertIn('projects', client.get('/api/v1/forecast').json)
+        self.assertEqual(client.get('/dashboard').status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
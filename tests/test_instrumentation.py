@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.instrumentation import QueryBudgetExceeded, query_budget
+from config import Config
+from datetime import datetime, timedelta
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        project = Project(name='P1', client_name='C1', required_skills='python')
+        db.session.add(project)
+        db.session.commit()
+        self.project_id = project.id
+
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_allocations(self, count):
+        today = datetime.today().date()
+        first = Employee.query.count()
+        for i in range(first, first + count):
+            emp = Employee(name=f'E{i}', email=f'e{i}@example.com', skills='python')
+            db.session.add(emp)
+            db.session.flush()
+            db.session.add(Allocation(employee_id=emp.id, project_id=self.project_id, allocated_hours=10,
+                                      start_date=today, end_date=today + timedelta(days=30)))
+        db.session.commit()
+
+    def count_queries(self, url):
+        # Requests share the test's session; start each from an empty identity map
+        db.session.expunge_all()
+        with query_budget(1000) as recorder:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return recorder.count
+
+    def test_server_timing_header(self):
+        resp = self.client.get('/bench/')
+        header = resp.headers['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('tpl;dur=', header)
+        self.assertIn('app;dur=', header)
+        self.assertRegex(header, r'desc="\d+ queries, \d+ duplicate"')
+
+    def test_metrics_endpoint(self):
+        self.client.get('/bench/')
+        self.client.get('/bench/')
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('http_requests_total{endpoint="bench.list_bench",method="GET",status="200"} 2', body)
+        self.assertIn('http_request_duration_seconds_count{endpoint="bench.list_bench"} 2', body)
+        self.assertIn('db_queries_total{endpoint="bench.list_bench"}', body)
+
+    def test_metrics_token(self):
+        self.app.config['METRICS_TOKEN'] = 'scrape'
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        resp = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape'})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_metrics_closed_without_token_when_required(self):
+        self.app.config['METRICS_REQUIRE_TOKEN'] = True
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.app.config['METRICS_TOKEN'] = 'scrape'
+        resp = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape'})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_query_budget_helper(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                Employee.query.all()
+                Project.query.all()
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(5, allow_duplicates=False):
+                db.session.query(Project.id).filter(Project.id == 1).all()
+                db.session.query(Project.id).filter(Project.id == 1).all()
+        with query_budget(2) as recorder:
+            Employee.query.all()
+        self.assertEqual(recorder.count, 1)
+
+    def test_route_budget_fails_request_in_tests(self):
+        self.app.config['QUERY_BUDGETS'] = {'bench.list_bench': 0}
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/bench/')
+
+    def test_detail_pages_do_not_query_per_allocation(self):
+        self.add_allocations(2)
+        project_small = self.count_queries(f'/projects/{self.project_id}')
+        employee_small = self.count_queries('/employees/1')
+        self.add_allocations(10)
+        self.assertEqual(self.count_queries(f'/projects/{self.project_id}'), project_small)
+        self.assertEqual(self.count_queries('/employees/1'), employee_small)
+
+if __name__ == '__main__':
+    unittest.main()
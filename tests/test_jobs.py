@@ -0,0 +1,153 @@
+import unittest
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Job, JobOutputChunk
+from app.utils import jobs
+from app.utils.jobs import claim_jobs, enqueue, job, output_chunks, requeue_stale, run_job, save_output, work
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+@job('test_flaky')
+def flaky_job(current, fail_until=0):
+    if current.attempts <= fail_until:
+        raise RuntimeError(f'attempt {current.attempts} failed')
+    return {'attempts': current.attempts}
+
+class JobsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        db.session.add(Employee(name='Ann', email='ann@example.com', skills='python'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def run_queue(self):
+        return work(processes=0, burst=True, log=lambda message: None)
+
+    def test_enqueue_claim_and_run(self):
+        with self.assertRaises(ValueError):
+            enqueue('nope')
+        queued = enqueue('test_flaky')
+        db.session.commit()
+        self.assertEqual(claim_jobs('w1', limit=5), [queued.id])
+        # Already running: nobody else can claim it
+        self.assertEqual(claim_jobs('w2', limit=5), [])
+        self.assertEqual(run_job(queued.id), 'done')
+        self.assertEqual(json.loads(queued.result), {'attempts': 1})
+        self.assertIsNone(queued.locked_by)
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        retried = enqueue('test_flaky', {'fail_until': 1})
+        failing = enqueue('test_flaky', {'fail_until': 9}, max_attempts=2)
+        db.session.commit()
+        self.assertEqual(self.run_queue(), 2)
+        self.assertEqual(retried.status, 'queued')
+        self.assertIn('attempt 1 failed', retried.error)
+        self.assertGreater(retried.run_after, datetime.utcnow() + timedelta(seconds=jobs.RETRY_BASE_SECONDS - 5))
+
+        # Not due yet, so nothing runs until run_after passes
+        self.assertEqual(self.run_queue(), 0)
+        Job.query.update({Job.run_after: datetime.utcnow()})
+        db.session.commit()
+        self.assertEqual(self.run_queue(), 2)
+        self.assertEqual((retried.status, retried.attempts), ('done', 2))
+        self.assertEqual((failing.status, failing.attempts), ('failed', 2))
+        self.assertIsNotNone(failing.finished_at)
+
+    def test_stale_running_jobs_are_requeued(self):
+        lost = enqueue('test_flaky')
+        db.session.commit()
+        claim_jobs('dead-worker')
+        self.assertEqual(requeue_stale(), 0)
+        lost.locked_at = datetime.utcnow() - jobs.STALE_AFTER - timedelta(minutes=1)
+        db.session.commit()
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(lost.status, 'queued')
+        self.assertIn('dead-worker', lost.error)
+
+    def test_invalid_export_fails_without_retry(self):
+        bad = enqueue('export', {'entity': 'nope'})
+        db.session.commit()
+        self.run_queue()
+        self.assertEqual((bad.status, bad.attempts), ('failed', 1))
+        self.assertEqual(JobOutputChunk.query.count(), 0)
+
+        # Arguments the job does not take fail it at once too
+        with self.assertRaises(ValueError):
+            enqueue('export', {'entity': 'employees', 'format': 'csv'})
+        mismatched = Job(kind='export', payload=json.dumps({'format': 'csv'}))
+        db.session.add(mismatched)
+        db.session.commit()
+        self.run_queue()
+        self.assertEqual((mismatched.status, mismatched.attempts), ('failed', 1))
+        self.assertIn('Invalid payload', mismatched.error)
+
+    def test_output_is_stored_and_read_in_chunks(self):
+        current = enqueue('test_flaky')
+        db.session.commit()
+        # Hex of random bytes barely compresses, so it spans several rows
+        pieces = [os.urandom(4096).hex() for _ in range(40)]
+        self.assertEqual(save_output(current, iter(pieces), chunk_bytes=32 * 1024), 40 * 8192)
+        db.session.commit()
+        seqs = [seq for (seq,) in db.session.query(JobOutputChunk.seq).filter_by(job_id=current.id)
+                .order_by(JobOutputChunk.seq)]
+        self.assertGreater(len(seqs), 3)
+        self.assertEqual(seqs, list(range(len(seqs))))
+        self.assertEqual(b''.join(output_chunks(current.id, piece_size=1000)), ''.join(pieces).encode())
+
+    def test_api_enqueue_poll_and_download(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        self.assertEqual(client.post('/api/v1/jobs', json={'kind': 'nope'}).status_code, 400)
+        for payload in ({}, {'entity': 'employees', 'format': 'csv'}):
+            resp = client.post('/api/v1/jobs', json={'kind': 'export', 'payload': payload})
+            self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Job.query.count(), 0)
+
+        resp = client.post('/api/v1/jobs', json={'kind': 'recompute_status'})
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json['status'], 'queued')
+        status_url = resp.headers['Location']
+
+        resp = client.get('/api/v1/export/employees?format=csv&async=1')
+        self.assertEqual(resp.status_code, 202)
+        export_url = resp.json['status_url']
+        self.assertEqual(client.get(f'{export_url}/download').status_code, 409)
+
+        self.assertEqual(self.run_queue(), 2)
+        self.assertEqual(client.get(status_url).json['status'], 'done')
+        body = client.get(export_url).json
+        self.assertEqual(body['status'], 'done')
+        resp = client.get(body['download_url'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b'ann@example.com', resp.data)
+        resp.close()
+
+        # Past retention, the next export's job prunes it
+        db.session.get(JobOutputChunk, (body['id'], 0)).created_at = datetime.utcnow() - timedelta(days=8)
+        db.session.commit()
+        enqueue('export', {'entity': 'projects', 'fmt': 'ndjson'})
+        db.session.commit()
+        self.run_queue()
+        self.assertEqual(client.get(body['download_url']).status_code, 410)
+
+if __name__ == '__main__':
+    unittest.main()
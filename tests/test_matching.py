@@ -0,0 +1,135 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from datetime import date
+from app.models import Employee, Project, Skill, SkillAlias, Allocation
+from app.utils.matching import find_matching_employees, find_projects_for_employee, find_available_employees
+from app.utils.skills import index_employee_skills, index_project_skills, parse_skills, add_skill_alias, unpack_skill_ids
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class SkillIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_employee(self, name, skills, status='Bench'):
+        emp = Employee(name=name, email=f'{name.lower()}@test.com', skills=skills, availability_status=status)
+        db.session.add(emp)
+        index_employee_skills(emp)
+        db.session.commit()
+        return emp
+
+    def add_project(self, name, skills, status='Active'):
+        proj = Project(name=name, client_name='Client', required_skills=skills, status=status)
+        db.session.add(proj)
+        index_project_skills(proj)
+        db.session.commit()
+        return proj
+
+    def test_parse_skills_normalizes_and_dedupes(self):
+        self.assertEqual(parse_skills(' Python, SQL ,python,,'), ['python', 'sql'])
+        self.assertEqual(parse_skills(None), [])
+
+    def test_aliases_resolve_to_canonical_skill(self):
+        db.session.add(SkillAlias(alias='python3', canonical='python'))
+        db.session.commit()
+        ann = self.add_employee('Ann', 'Python3,  python , SQL')
+        proj = self.add_project('P1', 'python')
+        python = Skill.query.filter_by(name='python').one()
+        self.assertEqual(unpack_skill_ids(proj.skill_ids).tolist(), [python.id])
+        self.assertEqual(len(unpack_skill_ids(ann.skill_ids)), 2)
+        self.assertEqual(find_matching_employees(proj.id)[0]['match_percent'], 100.0)
+
+    def test_add_alias_folds_existing_skill(self):
+        ann = self.add_employee('Ann', 'golang, Docker')
+        bob = self.add_employee('Bob', 'Go, golang')
+        proj = self.add_project('P1', 'Go')
+        add_skill_alias('Golang', 'go')
+        db.session.commit()
+
+        self.assertEqual(sorted(s.name for s in Skill.query.all()), ['docker', 'go'])
+        go = Skill.query.filter_by(name='go').one()
+        self.assertIn(go.id, unpack_skill_ids(db.session.get(Employee, ann.id).skill_ids).tolist())
+        self.assertEqual(unpack_skill_ids(db.session.get(Employee, bob.id).skill_ids).tolist(), [go.id])
+        self.assertEqual(sorted(m['employee'].name for m in find_matching_employees(proj.id)), ['Ann', 'Bob'])
+
+        # New writes use the canonical skill too
+        cid = self.add_employee('Cid', 'GoLang')
+        self.assertEqual(unpack_skill_ids(cid.skill_ids).tolist(), [go.id])
+        with self.assertRaises(ValueError):
+            add_skill_alias('go', 'Go ')
+
+    def test_skills_are_shared_between_rows(self):
+        self.add_employee('Ann', 'Python, SQL')
+        self.add_project('P1', 'python, Java')
+        self.assertEqual(sorted(s.name for s in Skill.query.all()), ['java', 'python', 'sql'])
+
+    def test_find_matching_employees(self):
+        ann = self.add_employee('Ann', 'Python, SQL')
+        bob = self.add_employee('Bob', 'Python')
+        self.add_employee('Cid', 'Java')
+        self.add_employee('Dee', 'Python, SQL', status='Fully Utilized')
+        proj = self.add_project('P1', 'Python, SQL')
+
+        matches = find_matching_employees(proj.id)
+        self.assertEqual([m['employee'].id for m in matches], [ann.id, bob.id])
+        self.assertEqual(matches[0]['match_percent'], 100.0)
+        self.assertEqual(matches[1]['match_percent'], 50.0)
+        self.assertEqual(matches[1]['matched_skills'], 'python')
+
+        matches = find_matching_employees(proj.id, min_match_percent=75)
+        self.assertEqual([m['employee'].id for m in matches], [ann.id])
+
+    def test_find_projects_for_employee(self):
+        emp = self.add_employee('Ann', 'Python, SQL')
+        full = self.add_project('Full', 'python, sql')
+        half = self.add_project('Half', 'python, java')
+        self.add_project('Low', 'python, java, go')
+        self.add_project('Done', 'python', status='Completed')
+
+        matches = find_projects_for_employee(emp.id)
+        self.assertEqual([m['project'].id for m in matches], [full.id, half.id])
+        self.assertEqual(matches[1]['match_percent'], 50.0)
+
+    def test_time_window_matching(self):
+        booked = self.add_employee('Ann', 'Python, SQL')
+        ending = self.add_employee('Bob', 'Python, SQL', status='Fully Utilized')
+        half = self.add_employee('Cat', 'Python')
+        proj = self.add_project('P1', 'Python, SQL')
+        proj.start_date, proj.end_date = date(2030, 3, 1), date(2030, 6, 30)
+        other = self.add_project('P2', 'Java')
+        # Ann is on the bench today but fully booked from March; Bob is
+        # fully utilized today but free from February
+        db.session.add_all([
+            Allocation(employee_id=booked.id, project_id=other.id, allocated_hours=40,
+                       start_date=date(2030, 3, 1), end_date=date(2030, 12, 31)),
+            Allocation(employee_id=ending.id, project_id=other.id, allocated_hours=40,
+                       start_date=date(2030, 1, 1), end_date=date(2030, 1, 31)),
+            Allocation(employee_id=half.id, project_id=other.id, allocated_hours=20,
+                       start_date=date(2030, 6, 1), end_date=date(2030, 6, 30)),
+        ])
+        db.session.commit()
+
+        matches = find_available_employees(proj.id, today=date(2030, 1, 1))
+        self.assertEqual([(m['employee'].name, m['free_hours']) for m in matches], [('Bob', 40), ('Cat', 20)])
+        self.assertGreater(matches[0]['score'], matches[1]['score'])
+
+        # Status mode still shows Ann and hides Bob
+        self.assertEqual([m['employee'].name for m in find_matching_employees(proj.id)], ['Ann', 'Cat'])
+
+if __name__ == '__main__':
+    unittest.main()
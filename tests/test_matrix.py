@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project
+from app.utils.matching import find_matching_employees
+from app.utils.matrix import staffing_matrix
+from app.utils.skills import index_employee_skills, index_project_skills
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class StaffingMatrixTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+
+        people = [
+            ('Ann', 'Python, SQL, Docker', 'Bench'),
+            ('Bob', 'Python', 'Partially Utilized'),
+            ('Cid', 'Python, SQL', 'Fully Utilized'),
+            ('Dee', 'Java, SQL', 'Bench'),
+            ('Eve', 'Rust', 'Bench'),
+        ]
+        for name, skills, status in people:
+            emp = Employee(name=name, email=f'{name.lower()}@test.com', skills=skills, availability_status=status)
+            db.session.add(emp)
+            index_employee_skills(emp)
+        self.projects = []
+        for name, skills, status in [('Web', 'Python, SQL', 'Active'), ('Legacy', 'Java', 'Active'),
+                                     ('Old', 'Python', 'Completed'), ('Infra', 'Docker, Go, K8s', 'Active')]:
+            proj = Project(name=name, client_name='C', required_skills=skills, status=status)
+            db.session.add(proj)
+            index_project_skills(proj)
+            self.projects.append(proj)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_matches_per_project_function(self):
+        rows = staffing_matrix(top_k=10)
+        self.assertEqual([r['project'].name for r in rows], ['Web', 'Legacy', 'Infra'])
+        for row in rows:
+            expected = find_matching_employees(row['project'].id)
+            self.assertEqual(
+                sorted((m['employee'].name, m['match_percent']) for m in row['matches']),
+                sorted((m['employee'].name, m['match_percent']) for m in expected))
+
+        web = rows[0]['matches']
+        self.assertEqual([(m['employee'].name, m['match_percent']) for m in web],
+                         [('Ann', 100.0), ('Bob', 50.0), ('Dee', 50.0)])
+        self.assertEqual(web[0]['matched_skills'], 'python, sql')
+        # One of three Infra skills is below the 50% default
+        self.assertEqual(rows[2]['matches'], [])
+
+    def test_top_k_and_threshold(self):
+        rows = staffing_matrix(top_k=1, min_match_percent=0)
+        self.assertEqual([m['employee'].name for m in rows[0]['matches']], ['Ann'])
+        self.assertEqual([m['employee'].name for m in rows[2]['matches']], ['Ann'])
+
+    def test_view_and_api(self):
+        client = self.app.test_client()
+        resp = client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        self.assertEqual(client.get('/bench/staffing').status_code, 200)
+        resp = client.get('/api/v1/staffing-matrix?top_k=2')
+        data = resp.get_json()
+        self.assertEqual(data[0]['project']['name'], 'Web')
+        self.assertEqual([m['name'] for m in data[0]['matches']], ['Ann', 'Bob'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.exceptions import NotFound, ServiceUnavailable
+from app import create_app, db
+from app.models import User, Employee, Project
+from app.utils.offload import gather, offload, offload_shared
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class OffloadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        db.session.add(Employee(name='Ann', email='ann@example.com', skills='python'))
+        db.session.add(Project(name='P', client_name='C', required_skills='python'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_tasks_run_on_their_own_session(self):
+        caller = db.session()
+        session, name = gather(offload(lambda: db.session()), offload(lambda: Employee.query.one().name))
+        self.assertIsNot(session, caller)
+        self.assertEqual(name, 'Ann')
+
+    def test_identical_tasks_in_flight_are_shared(self):
+        release = threading.Event()
+        calls = []
+        def slow(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        first = offload_shared(('slow', 21), slow, 21)
+        second = offload_shared(('slow', 21), slow, 21)
+        other = offload_shared(('slow', 1), slow, 1)
+        release.set()
+        self.assertIs(first, second)
+        self.assertEqual(gather(first, second, other), [42, 42, 2])
+        self.assertEqual(sorted(calls), [1, 21])
+        # Finished tasks are not reused
+        self.assertIsNot(offload_shared(('slow', 21), slow, 21), first)
+
+    def test_http_errors_and_timeouts_reach_the_caller(self):
+        with self.app.test_request_context():
+            with self.assertRaises(NotFound):
+                gather(offload(db.get_or_404, Employee, 999))
+            self.app.config['OFFLOAD_TIMEOUT'] = 0.05
+            release = threading.Event()
+            with self.assertRaises(ServiceUnavailable):
+                gather(offload(release.wait, 5))
+            release.set()
+
+    def test_inline_mode(self):
+        app = create_app(type('InlineConfig', (TestConfig,), {'OFFLOAD_WORKERS': 0}))
+        with app.app_context():
+            future = offload(threading.current_thread)
+            self.assertIs(future.result(), threading.current_thread())
+
+    def test_match_page_renders_from_pool(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.get('/bench/match/1')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(b'Ann', resp.data)
+        self.assertEqual(client.get('/bench/match/999').status_code, 404)
+        self.assertEqual(client.get('/projects/1').status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import json
+import re
+from contextlib import contextmanager
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation, AppState
+from app.utils.capacity import check_capacity
+from app.utils.matching import find_matching_employees, find_available_employees, find_projects_for_employee
+from app.utils.matrix import build_staffing_matrix
+from app.utils.skills import index_employee_skills, index_project_skills
+from app.utils.status import SWEEP_STATE_KEY, sweep_allocation_boundaries
+from app.utils.timeline import timeline
+from config import Config
+
+# Runs the hot read paths, captures every SELECT they issue and EXPLAINs it
+# on the same connection; a test fails if the plan reads a whole table. Uses
+# SQLite in memory by default; point TEST_DATABASE_URL at a PostgreSQL
+# database to check its plans too.
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    QUERY_BUDGETS = {} # The EXPLAINs issued below would count against them
+
+def full_scans(connection, statement, parameters):
+    # Tables the plan of `statement` reads in full
+    tables = set(db.metadata.tables)
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        # "SCAN t" is a table scan; "SCAN t USING [COVERING] INDEX" walks an index
+        scanned = (re.match(r'SCAN (\w+)(?: AS \w+)?$', row[-1]) for row in rows)
+        return {m.group(1) for m in scanned if m and m.group(1) in tables}
+    if connection.dialect.name == 'postgresql':
+        # Tiny test tables make a seq scan look cheap; forbid it so one only
+        # shows up when no index can serve the query
+        connection.exec_driver_sql('SET enable_seqscan = off')
+        try:
+            plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+        finally:
+            connection.exec_driver_sql('RESET enable_seqscan')
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        found, nodes = set(), [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables:
+                found.add(node['Relation Name'])
+            nodes.extend(node.get('Plans', []))
+        return found
+    return set()
+
+class QueryPlanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        self.emp = Employee(name='Ann', email='ann@test.com', skills='Python, SQL')
+        self.project = Project(name='P', client_name='C', required_skills='Python',
+                               start_date=date(2030, 1, 1), end_date=date(2030, 12, 31))
+        db.session.add_all([self.emp, self.project])
+        index_employee_skills(self.emp)
+        index_project_skills(self.project)
+        db.session.flush()
+        db.session.add(Allocation(employee_id=self.emp.id, project_id=self.project.id, allocated_hours=20,
+                                  start_date=date(2030, 1, 1), end_date=date(2030, 6, 30)))
+        db.session.add(AppState(key=SWEEP_STATE_KEY, value='2030-01-01'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    @contextmanager
+    def assert_no_full_scans(self):
+        # Explained as they run, on the connection and transaction that runs them
+        captured = []
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, full_scans(conn, statement, parameters)))
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertTrue(captured)
+        for statement, scans in captured:
+            self.assertFalse(scans, f'full scan of {", ".join(sorted(scans))} in:\n{statement}')
+
+    def test_capacity_and_bench_days(self):
+        with self.assert_no_full_scans():
+            check_capacity(self.emp.id, date(2030, 3, 1), date(2030, 9, 30), 10)
+            self.emp.last_allocation_end_date
+
+    def test_status_sweep(self):
+        with self.assert_no_full_scans():
+            sweep_allocation_boundaries(today=date(2030, 7, 15))
+
+    def test_matching(self):
+        with self.assert_no_full_scans():
+            find_matching_employees(self.project.id)
+            find_available_employees(self.project.id, today=date(2030, 1, 1))
+            find_projects_for_employee(self.emp.id)
+            build_staffing_matrix()
+
+    def test_timeline_lane_pages(self):
+        with self.assert_no_full_scans():
+            for group in ('employee', 'project'):
+                timeline(date(2030, 1, 1), date(2030, 3, 31), group=group)
+                timeline(date(2030, 1, 1), date(2030, 3, 31), group=group, cursor=('A', 0))
+
+    def test_bench_and_allocation_pages(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        with self.assert_no_full_scans():
+            client.get('/bench/')
+            client.get(f'/allocations/?employee_id={self.emp.id}')
+            client.get(f'/allocations/?project_id={self.project.id}')
+            client.get(f'/projects/{self.project.id}')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project
+from app.utils.bulk import upsert_employees, upsert_projects
+from app.utils.search import search
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class SearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        upsert_employees([
+            {'name': 'Priya Sharma', 'email': 'priya@example.com', 'designation': 'Data Engineer', 'skills': 'Python, Spark'},
+            {'name': 'Rahul Verma', 'email': 'rahul@example.com', 'designation': 'Backend Developer', 'skills': 'Python, Django'},
+            {'name': 'Anita Rao', 'email': 'anita@example.com', 'designation': 'Frontend Developer', 'skills': 'React'},
+        ])
+        upsert_projects([{'name': 'Payments Revamp', 'client_name': 'Acme', 'required_skills': 'Python'}])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def names(self, page):
+        return sorted(e.name for e in page['items'])
+
+    def test_prefix_terms_are_anded(self):
+        self.assertEqual(self.names(search('employees', q='pyth')), ['Priya Sharma', 'Rahul Verma'])
+        self.assertEqual(self.names(search('employees', q='pyth dev')), ['Rahul Verma'])
+        self.assertEqual(search('employees', q='"; drop')['total'], 0)
+
+    def test_index_follows_updates(self):
+        upsert_employees([{'email': 'anita@example.com', 'skills': 'React, Python'}])
+        db.session.commit()
+        self.assertIn('Anita Rao', self.names(search('employees', q='python')))
+        Employee.query.filter_by(email='priya@example.com').delete()
+        db.session.commit()
+        self.assertEqual(self.names(search('employees', q='spark')), [])
+
+    def test_facets_and_filters(self):
+        page = search('employees', q='developer')
+        self.assertEqual(page['total'], 2)
+        self.assertEqual(dict(page['facets']['skill'])['python'], 1)
+        self.assertEqual(page['facets']['status'], [('Bench', 2)])
+
+        page = search('employees', filters={'skill': 'Python', 'designation': 'Data Engineer'})
+        self.assertEqual(self.names(page), ['Priya Sharma'])
+        self.assertEqual(search('projects', q='pay', filters={'client': 'Acme'})['total'], 1)
+
+    def test_pagination(self):
+        page = search('employees', per_page=2)
+        self.assertEqual(len(page['items']), 2)
+        rest = search('employees', before=page['next_cursor'], per_page=2)
+        self.assertEqual(len(rest['items']), 1)
+        self.assertEqual(rest['total'], 3)
+
+    def test_views_and_api(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.get('/employees/?q=rah')
+        self.assertIn(b'Rahul Verma', resp.data)
+        self.assertNotIn(b'Anita Rao', resp.data)
+        self.assertEqual(client.get('/projects/?q=acme').status_code, 200)
+        data = client.get('/api/v1/search/employees?skill=react').get_json()
+        self.assertEqual([e['name'] for e in data['items']], ['Anita Rao'])
+
+if __name__ == '__main__':
+    unittest.main()
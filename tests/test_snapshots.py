@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation, EmployeeSnapshot, ProjectSnapshot
+from app.utils import snapshots
+from app.utils.snapshots import snapshot_through, take_snapshots
+from app.utils.status import status_for_hours
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+DAY = date(2030, 3, 1)
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        self.ann = Employee(name='Ann', email='ann@example.com', designation='Developer')
+        self.bob = Employee(name='Bob', email='bob@example.com', designation='QA')
+        self.project = Project(name='P', client_name='C')
+        db.session.add_all([self.ann, self.bob, self.project])
+        db.session.flush()
+        db.session.add_all([
+            # Ann: full time until DAY + 4, then 20h from DAY + 10
+            Allocation(employee_id=self.ann.id, project_id=self.project.id, allocated_hours=40,
+                       start_date=DAY - timedelta(days=30), end_date=DAY + timedelta(days=4)),
+            Allocation(employee_id=self.ann.id, project_id=self.project.id, allocated_hours=20,
+                       start_date=DAY + timedelta(days=10), end_date=None),
+            # Bob: last allocation ended three days before DAY
+            Allocation(employee_id=self.bob.id, project_id=self.project.id, allocated_hours=40,
+                       start_date=DAY - timedelta(days=40), end_date=DAY - timedelta(days=3)),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def history(self, employee):
+        rows = EmployeeSnapshot.query.filter_by(employee_id=employee.id).order_by(EmployeeSnapshot.day).all()
+        return [(row.hours, row.status, row.bench_days) for row in rows]
+
+    def test_backfill_matches_allocations(self):
+        self.assertEqual(take_snapshots(DAY, DAY + timedelta(days=11)), 12)
+        ann = self.history(self.ann)
+        self.assertEqual(ann[:5], [(40, 'Fully Utilized', 0)] * 5)
+        self.assertEqual(ann[5:10], [(0, 'Bench', n) for n in range(1, 6)])
+        self.assertEqual(ann[10:], [(20, 'Partially Utilized', 0)] * 2)
+        # Bob's streak starts from his last end date, like the live bench_days
+        self.assertEqual([b for _, _, b in self.history(self.bob)][:3], [3, 4, 5])
+        for hours, status, _ in ann + self.history(self.bob):
+            self.assertEqual(status, status_for_hours(hours))
+
+        project = ProjectSnapshot.query.order_by(ProjectSnapshot.day).all()
+        self.assertEqual([(p.hours, p.allocations) for p in project[:5]], [(40, 1)] * 5)
+        # Nothing booked from DAY + 5 to DAY + 9, so no rows
+        self.assertEqual([p.day for p in project[5:]], [DAY + timedelta(days=10), DAY + timedelta(days=11)])
+
+    def test_backfill_skips_employees_before_they_were_created(self):
+        cat = Employee(name='Cat', email='cat@example.com', designation='QA',
+                       created_at=datetime.combine(DAY + timedelta(days=2), datetime.min.time()))
+        db.session.add(cat)
+        db.session.commit()
+
+        take_snapshots(DAY, DAY + timedelta(days=3))
+        self.assertEqual(len(self.history(cat)), 2)
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.get('/api/v1/history/utilization?start=2030-03-01&end=2030-03-04&designation=QA')
+        self.assertEqual(resp.json['employees'], [1, 1, 2, 2])
+        self.assertEqual(resp.json['bench'], [1, 1, 2, 2])
+
+    def test_bench_days_match_the_live_rule(self):
+        # Never allocated: the live bench_days is 0, and so is the snapshot
+        dan = Employee(name='Dan', email='dan@example.com')
+        db.session.add(dan)
+        db.session.commit()
+
+        take_snapshots(DAY, DAY + timedelta(days=5))
+        self.assertEqual([b for _, _, b in self.history(dan)], [0] * 6)
+        self.assertEqual(dan.bench_days, 0)
+        # Bob's count is days since his last end date, on every day
+        bob = self.history(self.bob)
+        self.assertEqual([b for _, _, b in bob], list(range(3, 9)))
+
+    def test_reruns_are_idempotent_and_incremental(self):
+        self.addCleanup(setattr, snapshots, 'CHUNK_DAYS', snapshots.CHUNK_DAYS)
+        snapshots.CHUNK_DAYS = 3 # Several chunks
+        take_snapshots(DAY, DAY + timedelta(days=7))
+        first = self.history(self.ann)
+        self.assertEqual(snapshot_through(), DAY + timedelta(days=7))
+
+        # The default run continues after the last day; the last day itself
+        # is only rewritten once everything up to it is done
+        self.assertEqual(take_snapshots(end=DAY + timedelta(days=9)), 2)
+        self.assertEqual(take_snapshots(end=DAY + timedelta(days=9)), 1)
+        self.assertEqual(self.history(self.ann)[:8], first)
+        self.assertEqual(self.history(self.ann)[9], (0, 'Bench', 5))
+
+        take_snapshots(DAY, DAY + timedelta(days=9))
+        self.assertEqual(EmployeeSnapshot.query.count(), 2 * 10)
+        self.assertEqual(snapshot_through(), DAY + timedelta(days=9))
+
+    def test_history_api(self):
+        take_snapshots(DAY, DAY + timedelta(days=9))
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+        resp = client.get('/api/v1/history/utilization?start=2030-03-01&end=2030-03-06')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json['days'][0], '2030-03-01')
+        self.assertEqual(resp.json['booked_hours'], [40, 40, 40, 40, 40, 0])
+        self.assertEqual(resp.json['utilization'], [50.0] * 5 + [0.0])
+        self.assertEqual(resp.json['bench'], [1] * 5 + [2])
+        resp = client.get('/api/v1/history/utilization?start=2030-03-01&end=2030-03-02&designation=QA')
+        self.assertEqual(resp.json['booked_hours'], [0, 0])
+
+        resp = client.get(f'/api/v1/history/employees/{self.ann.id}?start=2030-03-05&end=2030-03-06')
+        self.assertEqual(resp.json, {'days': ['2030-03-05', '2030-03-06'], 'hours': [40, 0],
+                                     'status': ['Fully Utilized', 'Bench'], 'bench_days': [0, 1]})
+        resp = client.get(f'/api/v1/history/projects/{self.project.id}?start=2030-03-01&end=2030-03-31')
+        self.assertEqual(len(resp.json['days']), 5)
+        self.assertEqual(client.get('/api/v1/history/utilization?start=2030-03-05&end=2030-03-01').status_code, 400)
+        self.assertEqual(client.get('/api/v1/history/utilization?start=nope').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
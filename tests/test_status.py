@@ -0,0 +1,174 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation, AppState
+from app.utils.status import adjust_current_hours_many, recompute_current_hours, sweep_allocation_boundaries, SWEEP_STATE_KEY
+from config import Config
+from sqlalchemy import event
+from datetime import datetime, timedelta
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+class StatusTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        self.emp = Employee(name='Jane', email='j@j.com')
+        self.proj = Project(name='P1', client_name='C1')
+        db.session.add_all([admin, self.emp, self.proj])
+        db.session.commit()
+
+        self.today = datetime.today().date()
+        self.client = self.app.test_client()
+        self.client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add(self, hours, start, end, employee=None):
+        return self.client.post('/allocations/add', data={
+            'employee_id': (employee or self.emp).id,
+            'project_id': self.proj.id,
+            'allocated_hours': hours,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat()
+        })
+
+    def test_counter_follows_writes(self):
+        self.add(20, self.today - timedelta(days=10), self.today + timedelta(days=10))
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 20)
+        self.assertEqual(self.emp.availability_status, 'Partially Utilized')
+
+        # Future allocations do not count yet
+        self.add(20, self.today + timedelta(days=30), self.today + timedelta(days=60))
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 20)
+
+        alloc = Allocation.query.filter_by(employee_id=self.emp.id).order_by(Allocation.id).first()
+        self.client.post(f'/allocations/edit/{alloc.id}', data={
+            'employee_id': self.emp.id,
+            'project_id': self.proj.id,
+            'allocated_hours': 40,
+            'start_date': alloc.start_date.isoformat(),
+            'end_date': alloc.end_date.isoformat()
+        })
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 40)
+        self.assertEqual(self.emp.availability_status, 'Fully Utilized')
+
+        self.client.post(f'/allocations/delete/{alloc.id}')
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 0)
+        self.assertEqual(self.emp.availability_status, 'Bench')
+
+    def test_sweep_only_adjusts_crossed_boundaries(self):
+        start = self.today - timedelta(days=5)
+        db.session.add_all([
+            # Starts inside the sweep window
+            Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=20,
+                       start_date=self.today - timedelta(days=1), end_date=self.today + timedelta(days=30)),
+            # Ends inside the sweep window
+            Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=30,
+                       start_date=self.today - timedelta(days=60), end_date=self.today - timedelta(days=2)),
+        ])
+        self.emp.current_hours = 30
+        db.session.add(AppState(key=SWEEP_STATE_KEY, value=start.isoformat()))
+        db.session.commit()
+
+        touched = sweep_allocation_boundaries(today=self.today)
+        self.assertEqual(touched, 1)
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 20)
+        self.assertEqual(self.emp.availability_status, 'Partially Utilized')
+        self.assertEqual(AppState.query.get(SWEEP_STATE_KEY).value, self.today.isoformat())
+
+        # Running again the same day is a no-op
+        self.assertEqual(sweep_allocation_boundaries(today=self.today), 0)
+
+    def test_writes_before_the_sweep_are_not_counted_twice(self):
+        # Last sweep yesterday; today's has not run yet
+        yesterday = self.today - timedelta(days=1)
+        other = Employee(name='Joe', email='joe@j.com')
+        db.session.add_all([other, AppState(key=SWEEP_STATE_KEY, value=yesterday.isoformat())])
+        db.session.commit()
+
+        # Starts today; and for the other, back-dated and ended yesterday
+        self.add(20, self.today, self.today + timedelta(days=30))
+        self.add(20, yesterday - timedelta(days=10), yesterday, employee=other)
+
+        def counters():
+            for employee in (self.emp, other):
+                db.session.refresh(employee)
+            return [(e.current_hours, e.availability_status) for e in (self.emp, other)]
+
+        sweep_allocation_boundaries(today=self.today)
+        swept = counters()
+        self.assertEqual(swept, [(20, 'Partially Utilized'), (0, 'Bench')])
+        recompute_current_hours(today=self.today)
+        db.session.commit()
+        self.assertEqual(counters(), swept)
+
+    def test_first_write_of_a_day_catches_up_the_sweep(self):
+        # Last swept yesterday, while a 40h allocation still ran; no sweep
+        # since (the scheduled job is not deployed everywhere)
+        yesterday = self.today - timedelta(days=1)
+        db.session.add_all([
+            Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=40,
+                       start_date=yesterday - timedelta(days=14), end_date=yesterday),
+            AppState(key=SWEEP_STATE_KEY, value=yesterday.isoformat()),
+        ])
+        self.emp.current_hours, self.emp.availability_status = 40, 'Fully Utilized'
+        db.session.commit()
+
+        self.add(20, self.today, self.today + timedelta(days=30))
+        db.session.refresh(self.emp)
+        self.assertEqual((self.emp.current_hours, self.emp.availability_status), (20, 'Partially Utilized'))
+        self.assertEqual(db.session.get(AppState, SWEEP_STATE_KEY).value, self.today.isoformat())
+        # The scheduled sweep has nothing left to do
+        self.assertEqual(sweep_allocation_boundaries(today=self.today), 0)
+
+    def test_counter_adjustments_are_one_update(self):
+        others = [Employee(name=f'E{i}', email=f'e{i}@j.com') for i in range(5)]
+        db.session.add_all(others)
+        db.session.commit()
+
+        deltas = {e.id: 10 * (i + 1) for i, e in enumerate(others)}
+        calls = []
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            calls.append((statement, executemany))
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            adjust_current_hours_many(deltas)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(calls[0][0].startswith('UPDATE workforce_employees'))
+        self.assertTrue(calls[0][1])
+        # Loaded employees pick up the new values
+        self.assertEqual([(e.current_hours, e.availability_status) for e in others[::2]],
+                         [(10, 'Bench'), (30, 'Partially Utilized'), (50, 'Fully Utilized')])
+
+    def test_full_sweep_rebuilds_counters(self):
+        db.session.add(Allocation(employee_id=self.emp.id, project_id=self.proj.id, allocated_hours=40,
+                                  start_date=self.today, end_date=self.today))
+        db.session.commit()
+        sweep_allocation_boundaries(today=self.today, full=True)
+        db.session.refresh(self.emp)
+        self.assertEqual(self.emp.current_hours, 40)
+        self.assertEqual(self.emp.availability_status, 'Fully Utilized')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import json
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, Employee, Project, Allocation
+from app.utils.timeline import timeline
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+START = date(2030, 5, 1)
+END = date(2030, 5, 31)
+
+class TimelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        admin = User(username='admin', email='a@a.com', role='Admin', is_verified=True)
+        admin.set_password('123')
+        db.session.add(admin)
+        self.ann = Employee(name='Ann', email='ann@example.com', designation='Developer')
+        self.bob = Employee(name='Bob', email='bob@example.com', designation='QA')
+        self.cat = Employee(name='Cat', email='cat@example.com', designation='QA')
+        self.alpha = Project(name='Alpha', client_name='C1')
+        self.beta = Project(name='Beta', client_name='C2')
+        db.session.add_all([self.ann, self.bob, self.cat, self.alpha, self.beta])
+        db.session.flush()
+
+        def book(employee, project, start, end, hours=40):
+            allocation = Allocation(employee_id=employee.id, project_id=project.id, allocated_hours=hours,
+                                    start_date=start, end_date=end)
+            db.session.add(allocation)
+            return allocation
+
+        self.touching_start = book(self.ann, self.alpha, date(2030, 4, 1), START)
+        self.before = book(self.ann, self.beta, date(2030, 3, 1), START - timedelta(days=1))
+        self.touching_end = book(self.ann, self.beta, END, date(2030, 7, 1), 20)
+        self.open_ended = book(self.bob, self.beta, date(2030, 5, 10), None)
+        self.after = book(self.cat, self.alpha, END + timedelta(days=1), date(2030, 8, 1))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_overlapping_bars_by_employee(self):
+        data = timeline(START, END)
+        self.assertEqual((data['days'], data['total_lanes']), (31, 3))
+        self.assertEqual(data['lanes']['label'], ['Ann', 'Bob', 'Cat'])
+        self.assertEqual(data['lanes']['detail'], ['Developer', 'QA', 'QA'])
+        bars = data['bars']
+        # Allocations touching either edge count, those entirely outside do not
+        self.assertEqual(bars['id'], [self.touching_start.id, self.touching_end.id, self.open_ended.id])
+        self.assertEqual(bars['lane'], [0, 0, 1])
+        self.assertEqual(bars['start'], [-30, 30, 9])
+        self.assertEqual(bars['end'], [0, 61, None])
+        self.assertEqual(bars['hours'], [40, 20, 40])
+        self.assertEqual(data['refs'], {self.alpha.id: 'Alpha', self.beta.id: 'Beta'})
+
+    def test_viewport_paging(self):
+        page = timeline(START, END, limit=1)
+        self.assertEqual((page['lanes']['label'], page['total_lanes']), (['Ann'], 3))
+        self.assertEqual(page['next_cursor'], ('Ann', self.ann.id))
+        page = timeline(START, END, cursor=page['next_cursor'], limit=1)
+        self.assertEqual(page['lanes']['label'], ['Bob'])
+        # Later pages skip the count
+        self.assertIsNone(page['total_lanes'])
+        self.assertEqual(page['bars']['id'], [self.open_ended.id])
+        self.assertEqual(page['bars']['lane'], [0])
+        last = timeline(START, END, cursor=page['next_cursor'], limit=5)
+        self.assertEqual((last['lanes']['label'], last['next_cursor']), (['Cat'], None))
+
+        # Lanes with the same name stay apart and in id order
+        other_bob = Employee(name='Bob', email='bob2@example.com')
+        db.session.add(other_bob)
+        db.session.commit()
+        page = timeline(START, END, cursor=('Ann', self.ann.id), limit=1)
+        self.assertEqual(page['lanes']['id'], [self.bob.id])
+        page = timeline(START, END, cursor=page['next_cursor'], limit=1)
+        self.assertEqual(page['lanes']['id'], [other_bob.id])
+
+        # Lanes asked for by id come back in the order given
+        picked = timeline(START, END, ids=[self.cat.id, self.ann.id])
+        self.assertEqual(picked['lanes']['label'], ['Cat', 'Ann'])
+        self.assertEqual(picked['bars']['lane'], [1, 1])
+
+        projects = timeline(START, END, group='project')
+        self.assertEqual(projects['lanes']['label'], ['Alpha', 'Beta'])
+        self.assertEqual(projects['bars']['id'], [self.touching_start.id, self.open_ended.id, self.touching_end.id])
+        self.assertEqual(projects['refs'], {self.ann.id: 'Ann', self.bob.id: 'Bob'})
+
+    def test_api_and_page(self):
+        client = self.app.test_client()
+        client.post('/auth/login', json={'username': 'admin', 'password': '123'})
+        resp = client.get('/api/v1/timeline?start=2030-05-01&end=2030-05-31&limit=2')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json['lanes']['label'], ['Ann', 'Bob'])
+        self.assertEqual(resp.json['next_cursor'], ['Bob', self.bob.id])
+        self.assertEqual(resp.json['refs'], {str(self.alpha.id): 'Alpha', str(self.beta.id): 'Beta'})
+        resp = client.get('/api/v1/timeline', query_string={'start': '2030-05-01', 'end': '2030-05-31',
+                                                            'cursor': json.dumps(resp.json['next_cursor'])})
+        self.assertEqual((resp.json['lanes']['label'], resp.json['total_lanes']), (['Cat'], None))
+        resp = client.get(f'/api/v1/timeline?group=project&start=2030-05-01&end=2030-05-31&ids={self.beta.id}')
+        self.assertEqual(len(resp.json['bars']['id']), 2)
+        for query in ('group=team', 'start=2030-05-31&end=2030-05-01', 'start=2030-01-01&end=2032-06-01',
+                      'ids=1,x', 'cursor=5', 'cursor=["Ann"]', 'cursor=nope'):
+            self.assertEqual(client.get(f'/api/v1/timeline?{query}').status_code, 400)
+        self.assertEqual(client.get('/allocations/timeline?group=project&weeks=8').status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()